@@ -0,0 +1,212 @@
+"""
+Batched CPU inference for chart signals.
+
+Concurrent score requests are collected into micro-batches and scored with a
+single vectorized forward pass. A batch is flushed when it reaches
+INFERENCE_MAX_BATCH_SIZE or when its oldest request has waited
+INFERENCE_MAX_LATENCY_MS. Windows are loaded in the same worker thread as the
+forward pass, so a cold candle load never runs on the event loop. Results are
+cached per (symbol, last bar time), so polling clients only trigger a new model
+call when a new bar arrives.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.data_service import data_service
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SignalResult:
+    """Model output for the latest window of one symbol"""
+    symbol: str
+    time: int
+    score: float
+    probability_up: float
+    model: str
+
+
+class LinearSignalModel:
+    """
+    Logistic model over the z-normalized log returns of the last `window` bars.
+
+    Weights are loaded from an .npz file with `weights` (window,) and `bias`;
+    without one, a decaying momentum prior is used so the service works
+    before a trained model is available.
+    """
+
+    def __init__(self, weights: np.ndarray, bias: float = 0.0, name: str = "momentum-prior"):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.name = name
+
+    @property
+    def window(self) -> int:
+        return len(self.weights)
+
+    @classmethod
+    def default(cls, window: int) -> "LinearSignalModel":
+        # Most recent returns weigh the most
+        decay = np.exp(-np.arange(window)[::-1] / (window / 4))
+        return cls(weights=decay / decay.sum() * 4.0)
+
+    @classmethod
+    def load(cls, path: Path) -> "LinearSignalModel":
+        params = np.load(path)
+        return cls(weights=params["weights"], bias=float(params.get("bias", 0.0)), name=path.stem)
+
+    def forward(self, closes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Score a batch of close windows.
+
+        Args:
+            closes: (batch, window + 1) array of close prices
+
+        Returns:
+            tuple: (scores in [-1, 1], probabilities of an up move)
+        """
+        returns = np.diff(np.log(closes), axis=1)
+        mean = returns.mean(axis=1, keepdims=True)
+        std = returns.std(axis=1, keepdims=True)
+        std[std == 0] = 1.0
+        features = (returns - mean) / std
+        logits = features @ self.weights + self.bias
+        probabilities = 1.0 / (1.0 + np.exp(-logits))
+        return 2.0 * probabilities - 1.0, probabilities
+
+
+class InferenceService:
+    """Micro-batching scorer with a per-bar result cache"""
+
+    def __init__(
+        self,
+        model: LinearSignalModel,
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
+        cache_size: int = 4096,
+    ):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        # (symbol, last bar time) -> SignalResult
+        self._cache = LRUCache(cache_size)
+        # Symbols waiting for the next batch; concurrent requests for a symbol share its future
+        self._pending: dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def _latest_window(self, symbol: str) -> tuple[int, np.ndarray]:
+        """Return (last bar time, last window + 1 closes) for a symbol"""
+        arrays = data_service.get_arrays(symbol)
+        size = self.model.window + 1
+        if len(arrays.close) < size:
+            raise ValueError(f"Not enough data for {symbol}: need {size} bars, have {len(arrays.close)}")
+        return int(arrays.time[-1]), arrays.close[-size:]
+
+    async def score(self, symbol: str) -> SignalResult:
+        """Score the latest window of a symbol"""
+        # Join an in-flight request for the symbol instead of scoring twice
+        if symbol in self._pending:
+            return await asyncio.shield(self._pending[symbol])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[symbol] = future
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_latency, self._flush)
+
+        return await asyncio.shield(future)
+
+    async def score_many(self, symbols: list[str]) -> list[SignalResult]:
+        """Score several symbols; they share micro-batches with other callers"""
+        return list(await asyncio.gather(*(self.score(symbol) for symbol in symbols)))
+
+    def _flush(self):
+        """Hand the pending batch to a worker thread for one forward pass"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch = self._pending
+        self._pending = {}
+        loop = asyncio.get_running_loop()
+        task = loop.run_in_executor(None, self._run_batch, list(batch))
+        task.add_done_callback(lambda done: self._resolve(batch, done))
+
+    def _run_batch(self, symbols: list[str]) -> dict[str, object]:
+        """
+        Load the latest window of each symbol and score the uncached ones in one forward pass.
+
+        Returns:
+            dict: symbol -> SignalResult, or the exception raised while loading it
+        """
+        outcomes: dict[str, object] = {}
+        keys = []
+        windows = []
+        for symbol in symbols:
+            try:
+                last_time, window = self._latest_window(symbol)
+            except (FileNotFoundError, ValueError) as e:
+                outcomes[symbol] = e
+                continue
+            cached = self._cache.get((symbol, last_time))
+            if cached is not None:
+                outcomes[symbol] = cached
+            else:
+                keys.append((symbol, last_time))
+                windows.append(window)
+
+        if keys:
+            scores, probabilities = self.model.forward(np.stack(windows))
+            logger.debug("Scored inference batch of %d", len(keys))
+            for (symbol, last_time), score, probability in zip(keys, scores, probabilities):
+                result = SignalResult(
+                    symbol=symbol,
+                    time=last_time,
+                    score=float(score),
+                    probability_up=float(probability),
+                    model=self.model.name,
+                )
+                self._cache.set((symbol, last_time), result)
+                outcomes[symbol] = result
+        return outcomes
+
+    def _resolve(self, batch: dict[str, asyncio.Future], done: asyncio.Future):
+        error = done.exception()
+        outcomes = None if error else done.result()
+        for symbol, future in batch.items():
+            if future.done():
+                continue
+            outcome = error or outcomes[symbol]
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+def _load_model() -> LinearSignalModel:
+    path = settings.INFERENCE_MODEL_PATH
+    if path is not None and Path(path).exists():
+        return LinearSignalModel.load(Path(path))
+    return LinearSignalModel.default(settings.INFERENCE_WINDOW)
+
+
+# Singleton instance
+inference_service = InferenceService(
+    model=_load_model(),
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    max_latency_ms=settings.INFERENCE_MAX_LATENCY_MS,
+    cache_size=settings.INFERENCE_CACHE_SIZE,
+)
@@ -16,7 +16,7 @@ from app.database.base import Base
 from app.core.config import settings
 
 # Import all models so Alembic can detect them
-from app.models import Pair, Drawing, Series, Point  # noqa: F401
+from app.models import Pair, Drawing, Series, Point, IdSequence, DrawingEvent  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
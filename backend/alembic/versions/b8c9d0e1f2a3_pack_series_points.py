@@ -0,0 +1,123 @@
+"""pack series points into series.points_packed
+
+Revision ID: b8c9d0e1f2a3
+Revises: 7a2b1c8d9e20
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = '7a2b1c8d9e20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Series converted per batch
+BATCH_SIZE = 1000
+
+points = sa.table(
+    'points',
+    sa.column('id', sa.Integer),
+    sa.column('series_id', sa.Integer),
+    sa.column('x', sa.Float),
+    sa.column('y', sa.Float),
+    sa.column('order_index', sa.Integer),
+)
+series = sa.table(
+    'series',
+    sa.column('id', sa.Integer),
+    sa.column('points_packed', sa.JSON),
+)
+id_sequences = sa.table(
+    'id_sequences',
+    sa.column('name', sa.String),
+    sa.column('next_value', sa.Integer),
+)
+
+
+def _write_packed(bind, batch: list) -> None:
+    if batch:
+        bind.execute(
+            series.update().where(series.c.id == sa.bindparam('series_id')).values(points_packed=sa.bindparam('packed')),
+            batch,
+        )
+
+
+def upgrade() -> None:
+    op.add_column('series', sa.Column('points_packed', sa.JSON(), nullable=True))
+    op.create_table('id_sequences',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('next_value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+    bind = op.get_bind()
+    next_id = bind.execute(sa.select(sa.func.coalesce(sa.func.max(points.c.id), 0) + 1)).scalar()
+    bind.execute(id_sequences.insert().values(name='points', next_value=next_id))
+
+    # Rows stay as they are in the row layout; reads handle both layouts
+    if settings.POINT_STORAGE_MODE != 'packed':
+        return
+
+    # Fold each series' rows into one [[id, x, y], ...] array, keeping point ids.
+    # Series are walked in id batches so only one batch of points is in memory.
+    last_id = 0
+    while True:
+        series_ids = bind.execute(
+            sa.select(points.c.series_id).distinct()
+            .where(points.c.series_id > last_id)
+            .order_by(points.c.series_id)
+            .limit(BATCH_SIZE)
+        ).scalars().all()
+        if not series_ids:
+            break
+        packed: dict[int, list] = {}
+        for series_id, point_id, x, y in bind.execute(
+            sa.select(points.c.series_id, points.c.id, points.c.x, points.c.y)
+            .where(points.c.series_id.in_(series_ids))
+            .order_by(points.c.series_id, points.c.order_index, points.c.id)
+        ):
+            packed.setdefault(series_id, []).append([point_id, x, y])
+        _write_packed(bind, [{'series_id': series_id, 'packed': rows} for series_id, rows in packed.items()])
+        bind.execute(points.delete().where(points.c.series_id.in_(series_ids)))
+        last_id = series_ids[-1]
+
+    # Series without points get an empty array so they read from the packed layout too
+    bind.execute(series.update().where(series.c.points_packed.is_(None)).values(points_packed=[]))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    # Series in the row layout hold JSON 'null' (not SQL NULL); only unpack actual arrays
+    last_id = 0
+    while True:
+        packed_series = bind.execute(
+            sa.select(series.c.id, series.c.points_packed)
+            .where(series.c.id > last_id, sa.func.json_type(series.c.points_packed) == 'array')
+            .order_by(series.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not packed_series:
+            break
+        series_ids = [series_id for series_id, _ in packed_series]
+        bind.execute(points.delete().where(points.c.series_id.in_(series_ids)))
+        rows = [
+            {'id': point_id, 'series_id': series_id, 'x': x, 'y': y, 'order_index': idx}
+            for series_id, packed in packed_series
+            for idx, (point_id, x, y) in enumerate(packed)
+        ]
+        if rows:
+            bind.execute(points.insert(), rows)
+        last_id = series_ids[-1]
+
+    op.drop_table('id_sequences')
+    with op.batch_alter_table('series') as batch_op:
+        batch_op.drop_column('points_packed')
@@ -0,0 +1,44 @@
+"""add drawing change log
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'drawing_events',
+        sa.Column('id', sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column('pair_id', sa.Integer(), sa.ForeignKey('pairs.id'), nullable=False),
+        sa.Column('drawing_id', sa.Integer(), nullable=True),
+        sa.Column('op', sa.String(), nullable=False),
+        sa.Column('data', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sqlite_autoincrement=True,
+    )
+    op.create_index('ix_drawing_events_pair_id_id', 'drawing_events', ['pair_id', 'id'])
+    # Existing drawings are the initial snapshot (nothing logged yet)
+    op.add_column('pairs', sa.Column('snapshot_seq', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('pairs', sa.Column('truncated_seq', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('pairs') as batch_op:
+        batch_op.drop_column('truncated_seq')
+        batch_op.drop_column('snapshot_seq')
+    op.drop_index('ix_drawing_events_pair_id_id', table_name='drawing_events')
+    op.drop_table('drawing_events')
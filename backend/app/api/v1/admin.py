@@ -0,0 +1,111 @@
+import asyncio
+import secrets
+from collections import Counter
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.profiler import ProfileCapture, profiler
+from app.schemas.admin import MaintenanceReport, ProfileSummary, ProfilesResponse
+from app.services.maintenance_service import maintenance_service
+
+
+def _require_admin_token(authorization: Optional[str] = Header(None)):
+    """Admin routes can rewrite the database and expose request internals, so they need a token"""
+    if settings.ADMIN_TOKEN is None:
+        raise HTTPException(status_code=403, detail="Admin routes are disabled (set ADMIN_TOKEN)")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(
+            status_code=401, detail="Invalid or missing admin token", headers={"WWW-Authenticate": "Bearer"}
+        )
+
+
+router = APIRouter(dependencies=[Depends(_require_admin_token)])
+
+
+def _check_enabled():
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=404, detail="Request profiling is disabled (set PROFILER_ENABLED)")
+
+
+def _summary(capture: ProfileCapture) -> ProfileSummary:
+    return ProfileSummary(
+        id=capture.id,
+        method=capture.method,
+        path=capture.path,
+        route=capture.route,
+        trigger=capture.trigger,
+        status=capture.status,
+        started_at=capture.started_at,
+        duration_ms=round(capture.duration * 1000, 3),
+        samples=capture.samples,
+    )
+
+
+def _folded_response(body: str, filename: str) -> PlainTextResponse:
+    return PlainTextResponse(body, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+@router.get("/profiles", response_model=ProfilesResponse)
+async def list_profiles(
+    route: Optional[str] = Query(None, description="Only profiles of this route template (e.g., /api/v1/pairs/{symbol}/candles)")
+):
+    """
+    List the buffered request profiles, newest first.
+    """
+    _check_enabled()
+    items = [_summary(capture) for capture in profiler.captures() if route is None or capture.route == route]
+    return ProfilesResponse(items=items, count=len(items))
+
+
+@router.get("/profiles/folded", response_class=PlainTextResponse)
+async def download_merged_profile(
+    route: Optional[str] = Query(None, description="Only profiles of this route template")
+):
+    """
+    Download the folded stacks of all buffered profiles (optionally of one
+    route) merged into one flame graph input.
+    """
+    _check_enabled()
+    stacks = Counter()
+    for capture in profiler.captures():
+        if route is None or capture.route == route:
+            stacks.update(capture.stacks)
+    body = "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+    return _folded_response(body, "profiles.folded")
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def download_profile(profile_id: int):
+    """
+    Download one profile as folded stacks (`thread;outer;...;inner count`),
+    ready for flamegraph.pl, speedscope or inferno.
+    """
+    _check_enabled()
+    capture = profiler.get(profile_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found (it may have been evicted)")
+    return _folded_response(capture.folded(), f"profile-{profile_id}.folded")
+
+
+@router.post("/maintenance", response_model=MaintenanceReport)
+async def run_maintenance(
+    full: bool = Query(False, description="Rewrite the whole file with VACUUM instead of an incremental vacuum")
+):
+    """
+    Purge orphaned drawing rows, ANALYZE and vacuum the database now, and
+    report the space reclaimed.
+    """
+    report = await asyncio.to_thread(maintenance_service.run, full)
+    return MaintenanceReport.model_validate(report)
+
+
+@router.get("/maintenance", response_model=MaintenanceReport)
+async def get_maintenance_report():
+    """
+    Report of the last maintenance run (scheduled or on demand).
+    """
+    if maintenance_service.last_report is None:
+        raise HTTPException(status_code=404, detail="Maintenance has not run since the server started")
+    return MaintenanceReport.model_validate(maintenance_service.last_report)
@@ -0,0 +1,83 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.schemas.alert import AlertEvaluateRequest, AlertEvent, AlertEventsResponse
+from app.services.alert_service import alert_service, Bar
+from app.services.data_service import data_service
+
+
+router = APIRouter()
+
+
+@router.post("/{pair}/evaluate", response_model=AlertEventsResponse)
+async def evaluate_bars(pair: str, payload: Optional[AlertEvaluateRequest] = None):
+    """
+    Evaluate new bars against all saved drawings of a pair.
+    
+    Without bars in the body, the latest stored bar of the pair is evaluated.
+    Bars at or before the last bar evaluated for the pair are skipped.
+    Triggered events are recorded and pushed to stream subscribers.
+    """
+    pair = pair.upper()
+    if payload and payload.bars:
+        bars = [Bar(**bar.model_dump()) for bar in sorted(payload.bars, key=lambda b: b.time)]
+    else:
+        try:
+            arrays = data_service.get_arrays(pair)
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        if len(arrays.time) == 0:
+            raise HTTPException(status_code=400, detail=f"No bars available for {pair}")
+        bars = [Bar(
+            time=int(arrays.time[-1]),
+            open=float(arrays.open[-1]),
+            high=float(arrays.high[-1]),
+            low=float(arrays.low[-1]),
+            close=float(arrays.close[-1]),
+        )]
+    
+    events = alert_service.evaluate_bars(pair, bars)
+    return AlertEventsResponse(
+        events=[AlertEvent.model_validate(event) for event in events],
+        count=len(events),
+    )
+
+
+@router.get("/{pair}/events", response_model=AlertEventsResponse)
+async def get_events(
+    pair: str,
+    since: Optional[int] = Query(None, description="Only return events with an id greater than this"),
+):
+    """
+    Get recently triggered alert events of a pair.
+    """
+    events = alert_service.get_events(pair, since=since)
+    return AlertEventsResponse(
+        events=[AlertEvent.model_validate(event) for event in events],
+        count=len(events),
+    )
+
+
+@router.get("/{pair}/stream")
+async def stream_events(request: Request, pair: str):
+    """
+    Stream alert events of a pair as Server-Sent Events.
+    """
+    queue = alert_service.subscribe(pair)
+    
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    # Keep-alive comment so proxies don't close idle streams
+                    yield ": keep-alive\n\n"
+                    continue
+                payload = AlertEvent.model_validate(event).model_dump_json()
+                yield f"id: {event.id}\nevent: alert\ndata: {payload}\n\n"
+        finally:
+            alert_service.unsubscribe(pair, queue)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
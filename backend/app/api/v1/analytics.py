@@ -0,0 +1,113 @@
+import asyncio
+import json
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
+from app.schemas.analytics import CorrelationMatrixResponse, RollingCorrelationResponse, ReturnsResponse
+from app.services.correlation_service import correlation_service
+from app.core.config import settings
+
+
+router = APIRouter()
+
+
+def _parse_symbols(symbols: str) -> list[str]:
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="symbols must contain at least one symbol")
+    return symbol_list
+
+
+def _nan_to_none(rows: list) -> list:
+    return [[None if value != value else value for value in row] for row in rows]
+
+
+@router.get("/correlation", response_model=CorrelationMatrixResponse)
+async def get_correlation_matrix(
+    symbols: str = Query(..., description="Comma-separated trading pairs (e.g., EURUSD,GBPUSD)"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+    window: int = Query(500, ge=2, le=settings.ANALYTICS_MAX_BARS, description="Number of most recent aligned returns"),
+):
+    """
+    Get the correlation matrix of the symbols' log returns over the last
+    `window` bars they all have in common (heatmap data).
+
+    Aligned return matrices are cached per (symbol set, timeframe, window),
+    so refreshing a heatmap doesn't re-align the raw series.
+    """
+    symbol_list = _parse_symbols(symbols)
+    try:
+        # Aligning the series and the numpy work run in a worker thread, off the event loop
+        aligned, matrix = await asyncio.to_thread(correlation_service.correlation_matrix, symbol_list, timeframe, window)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Encoded directly: validating n*n floats through the response model costs more than computing them
+    body = json.dumps({
+        "symbols": aligned.symbols,
+        "timeframe": timeframe,
+        "window": len(aligned.time),
+        "start_time": int(aligned.time[0]),
+        "end_time": int(aligned.time[-1]),
+        # Four decimals is beyond what a heatmap shows and keeps the payload small
+        "matrix": _nan_to_none(np.round(matrix, 4).tolist()),
+    }, separators=(",", ":"))
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/correlation/rolling", response_model=RollingCorrelationResponse)
+async def get_rolling_correlation(
+    symbol: str = Query(..., description="Base trading pair (e.g., EURUSD)"),
+    against: str = Query(..., description="Comma-separated trading pairs to correlate with"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+    window: int = Query(96, ge=2, description="Returns per rolling window"),
+    bars: int = Query(1000, ge=2, le=settings.ANALYTICS_MAX_BARS, description="Number of most recent aligned returns"),
+):
+    """
+    Get the rolling correlation of a symbol's returns with other symbols.
+    """
+    symbol = symbol.upper()
+    against_list = [other for other in _parse_symbols(against) if other != symbol]
+    try:
+        times, corr = await asyncio.to_thread(
+            correlation_service.rolling_correlation, symbol, against_list, timeframe, window, bars
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return RollingCorrelationResponse(
+        symbol=symbol,
+        timeframe=timeframe,
+        window=window,
+        time=times.tolist(),
+        series=dict(zip(against_list, _nan_to_none(corr.T.tolist()))),
+    )
+
+
+@router.get("/returns", response_model=ReturnsResponse)
+async def get_returns(
+    symbols: str = Query(..., description="Comma-separated trading pairs (e.g., EURUSD,GBPUSD)"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+    bars: int = Query(500, ge=2, le=settings.ANALYTICS_MAX_BARS, description="Number of most recent aligned returns"),
+):
+    """
+    Get the log returns of several symbols on the time grid they share.
+    """
+    symbol_list = _parse_symbols(symbols)
+    try:
+        aligned = await asyncio.to_thread(correlation_service.get_aligned, symbol_list, timeframe, bars)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ReturnsResponse(
+        symbols=aligned.symbols,
+        timeframe=timeframe,
+        time=aligned.time.tolist(),
+        returns=dict(zip(aligned.symbols, aligned.returns.T.tolist())),
+    )
@@ -1,9 +1,13 @@
 from fastapi import APIRouter
-from app.api.v1 import pairs, drawings
+from app.api.v1 import pairs, drawings, signals, patterns, alerts, analytics, admin
 
 api_router = APIRouter()
 
 # Include routers
 api_router.include_router(pairs.router, prefix="/pairs", tags=["pairs"])
 api_router.include_router(drawings.router, prefix="/drawings", tags=["drawings"])
-
+api_router.include_router(signals.router, prefix="/signals", tags=["signals"])
+api_router.include_router(patterns.router, prefix="/patterns", tags=["patterns"])
+api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
+api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
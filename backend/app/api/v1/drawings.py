@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from typing import Optional
 import traceback
 import logging
-from app.schemas.drawing import Drawing, DrawingCreate, DrawingUpdate, DrawingsResponse
+from app.schemas.drawing import (
+    Drawing, DrawingCreate, DrawingUpdate, DrawingsResponse, DrawingChangesResponse, LogTruncateResponse,
+    DrawingImportResponse,
+)
 from app.services.drawing_service import drawing_service
+from app.core.sampled_logging import log_sampled
+from app.core.config import settings
 
 
 router = APIRouter()
@@ -17,20 +25,147 @@ async def get_drawings(
     """
     Get all drawings, optionally filtered by trading pair.
     """
-    logger.info(f"GET /drawings/ called with pair={pair}")
     try:
         drawings = drawing_service.get_all_drawings(pair=pair)
-        logger.info(f"Successfully fetched {len(drawings)} drawings")
+        log_sampled(logger, logging.DEBUG, "GET /drawings/ pair=%s fetched %d drawings", pair, len(drawings))
         return DrawingsResponse(
             drawings=drawings,
             count=len(drawings)
         )
     except Exception as e:
-        logger.error(f"ERROR fetching drawings: {str(e)}")
+        logger.error("ERROR fetching drawings: %s", e)
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error fetching drawings: {str(e)}")
 
 
+@router.get("/changes", response_model=DrawingChangesResponse)
+async def get_drawing_changes(
+    pair: str = Query(..., description="Trading pair (e.g., EURUSD)"),
+    since: int = Query(0, ge=0, description="Return changes after this sequence number"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of changes"),
+):
+    """
+    Delta feed of a pair's drawings from the append-only change log.
+    
+    Poll with `since` set to the previous `last_seq` to follow edits made in
+    other tabs. When `resync_required` is true the events after `since` were
+    truncated; reload the drawings and continue from `last_seq`.
+    """
+    try:
+        changes, snapshot_seq, truncated_seq = drawing_service.get_changes(pair, since, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    resync_required = since < truncated_seq
+    return DrawingChangesResponse(
+        items=changes,
+        count=len(changes),
+        last_seq=changes[-1].seq if changes else max(since, truncated_seq),
+        snapshot_seq=snapshot_seq,
+        truncated_seq=truncated_seq,
+        resync_required=resync_required,
+    )
+
+
+@router.delete("/changes", response_model=LogTruncateResponse)
+async def truncate_drawing_changes(
+    pair: str = Query(..., description="Trading pair (e.g., EURUSD)"),
+    before: Optional[int] = Query(None, ge=0, description="Delete changes up to this sequence number (default: up to the snapshot)"),
+):
+    """
+    Snapshot a pair's drawings and truncate its change log. Events newer than
+    the snapshot are always kept.
+    """
+    try:
+        deleted_count, truncated_seq = drawing_service.truncate_log(pair, before)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return LogTruncateResponse(deleted_count=deleted_count, truncated_seq=truncated_seq)
+
+
+@router.get("/export")
+async def export_drawings(
+    pair: Optional[str] = Query(None, description="Filter by trading pair (e.g., EURUSD)")
+):
+    """
+    Stream drawings as newline-delimited JSON (one drawing per line, in the
+    shape of `GET /drawings/{id}`), oldest first. Memory use doesn't grow
+    with the number of drawings or points.
+    """
+    return StreamingResponse(
+        drawing_service.iter_export(pair, settings.DRAWING_EXPORT_BATCH_SIZE),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="drawings{"-" + pair.upper() if pair else ""}.ndjson"'},
+    )
+
+
+@router.post("/import", response_model=DrawingImportResponse)
+async def import_drawings(
+    request: Request,
+    pair: Optional[str] = Query(None, description="Import every drawing into this pair instead of its own"),
+):
+    """
+    Create drawings from a newline-delimited JSON body (the export format;
+    ids are ignored and new ones assigned).
+    
+    The body is read as it arrives and committed in transactions of about
+    DRAWING_IMPORT_BATCH_POINTS points. A malformed line fails the request
+    with 400; batches committed before it are kept.
+    """
+    imported = 0
+    points = 0
+    batches = 0
+    batch: list[DrawingCreate] = []
+    batch_points = 0
+    
+    async def commit_batch():
+        nonlocal imported, points, batches, batch, batch_points
+        try:
+            points += await asyncio.to_thread(drawing_service.import_drawings, batch, pair)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"{e} ({imported} drawing(s) imported before the error)")
+        imported += len(batch)
+        batches += 1
+        batch = []
+        batch_points = 0
+    
+    def parse(line: bytes) -> DrawingCreate:
+        try:
+            return DrawingCreate.model_validate_json(line)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Line {line_number}: {e.errors()[0]['msg']} ({imported} drawing(s) imported before the error)",
+            )
+    
+    line_number = 0
+    buffer = bytearray()  # Appended in place: a single drawing's line can be many megabytes
+    async for chunk in request.stream():
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            line = bytes(buffer[start:end])
+            start = end + 1
+            line_number += 1
+            if not line.strip():
+                continue
+            drawing = parse(line)
+            batch.append(drawing)
+            batch_points += max(1, sum(len(series.points) for series in drawing.series))
+            if batch_points >= settings.DRAWING_IMPORT_BATCH_POINTS:
+                await commit_batch()
+        del buffer[:start]
+    if buffer.strip():
+        # The last line needn't be newline-terminated
+        line_number += 1
+        batch.append(parse(bytes(buffer)))
+    if batch:
+        await commit_batch()
+    
+    logger.info("Imported %d drawing(s) with %d point(s) in %d batch(es)", imported, points, batches)
+    return DrawingImportResponse(imported=imported, points=points, batches=batches)
+
+
 @router.get("/{drawing_id}", response_model=Drawing)
 async def get_drawing(drawing_id: int):
     """
@@ -49,25 +184,20 @@ async def create_drawing(drawing: DrawingCreate):
     """
     Create a new drawing.
     """
-    logger.info(f"POST /drawings/ called")
-    logger.info(f"Received drawing data: {drawing.model_dump()}")
-    logger.info(f"Drawing name: {drawing.name}, type: {drawing.type}, color: {drawing.color}, pair: {drawing.pair}")
-    logger.info(f"Number of series: {len(drawing.series)}")
-    for i, series in enumerate(drawing.series):
-        logger.info(f"Series {i}: id={series.id}, points count={len(series.points)}")
-        for j, point in enumerate(series.points):
-            logger.info(f"  Point {j}: id={point.id}, x={point.x}, y={point.y}")
-    
     try:
         created_drawing = drawing_service.create_drawing(drawing)
-        logger.info(f"Successfully created drawing with id={created_drawing.id}")
+        log_sampled(
+            logger, logging.DEBUG,
+            "POST /drawings/ created id=%s type=%s pair=%s series=%d points=%d",
+            created_drawing.id, drawing.type, drawing.pair, len(drawing.series),
+            sum(len(series.points) for series in drawing.series),
+        )
         return created_drawing
     except ValueError as e:
-        logger.error(f"ValueError creating drawing: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.warning("ValueError creating drawing: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"ERROR creating drawing: {str(e)}")
+        logger.error("ERROR creating drawing: %s", e)
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error creating drawing: {str(e)}")
 
@@ -84,6 +214,10 @@ async def update_drawing(drawing_id: int, updates: DrawingUpdate):
             raise HTTPException(status_code=404, detail=f"Drawing with id {drawing_id} not found")
         
         return updated_drawing
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating drawing: {str(e)}")
 
@@ -1,12 +1,193 @@
+import asyncio
+import hashlib
+import json
+import numpy as np
+from functools import partial
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
 from typing import Optional
-from app.schemas.pair import PaginatedCandleResponse, CandleData
+from app.schemas.pair import (
+    PaginatedCandleResponse, CandleData, RangeStats, RangeStatsRequest, RangeStatsResponse,
+    VolumeProfileBin, VolumeProfileResponse, BatchCandlesResponse,
+)
 from app.services.data_service import data_service
+from app.services.derived_bars import CHART_TYPES, ChartSpec
+from app.services.drawing_service import drawing_service
+from app.services.volume_profile_service import volume_profile_service
+from app.services.prefetch_service import prefetch_service
+from app.core.cache import LRUCache
+from app.core.metrics import record_cache
 from app.core.config import settings
 
 
 router = APIRouter()
 
+# Encoded candle pages keyed on the full request identity and data version
+_page_cache = LRUCache(settings.CANDLE_RESPONSE_CACHE_SIZE)
+
+
+def _chart_spec(
+    chart_type: str,
+    brick_size: Optional[float],
+    atr_period: int,
+    range_size: Optional[float],
+) -> Optional[ChartSpec]:
+    """Validate chart type parameters; keep only the ones the type uses so equal charts share cache entries"""
+    if chart_type not in CHART_TYPES:
+        raise HTTPException(status_code=400, detail=f"chart_type must be one of {', '.join(CHART_TYPES)}")
+    if chart_type == "candles":
+        return None
+    if chart_type == "renko":
+        return ChartSpec("renko", brick_size=brick_size, atr_period=atr_period if brick_size is None else 14)
+    if chart_type == "range":
+        if range_size is None:
+            raise HTTPException(status_code=400, detail="range_size is required for range bars")
+        return ChartSpec("range", range_size=range_size)
+    return ChartSpec(chart_type)
+
+
+def _chart_params(chart: Optional[ChartSpec]) -> str:
+    """Query string suffix that reproduces a chart type in pagination links"""
+    if chart is None:
+        return ""
+    params = f"&chart_type={chart.chart_type}"
+    if chart.chart_type == "renko":
+        params += f"&brick_size={chart.brick_size}" if chart.brick_size is not None else f"&atr_period={chart.atr_period}"
+    if chart.range_size is not None:
+        params += f"&range_size={chart.range_size}"
+    return params
+
+
+def _render_candles_page(
+    base_url: str,
+    symbol: str,
+    timeframe: str,
+    cursor: Optional[int],
+    direction: str,
+    limit: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    chart: Optional[ChartSpec] = None,
+) -> tuple[bytes, bool, Optional[int], Optional[int]]:
+    """
+    Build and JSON-encode a candle page.
+    
+    Returns:
+        tuple: (encoded body, whether the page is fully historical,
+                next page cursor, previous page cursor)
+    """
+    candles, total_count, next_cursor, prev_cursor = data_service.get_candles(
+        symbol=symbol,
+        cursor=cursor,
+        direction=direction,
+        limit=limit,
+        start_date=start_date,
+        end_date=end_date,
+        timeframe=timeframe,
+        chart=chart,
+    )
+    
+    # Build next and previous URLs
+    next_url = None
+    prev_url = None
+    timeframe_param = f"&timeframe={timeframe}" if timeframe != settings.DEFAULT_TIMEFRAME else ""
+    timeframe_param += _chart_params(chart)
+    
+    if next_cursor and len(candles) == limit:
+        # Only provide next URL if we got a full page (might be more data)
+        next_url = f"{base_url}?cursor={next_cursor}&limit={limit}&direction=next{timeframe_param}"
+    else:
+        next_cursor = None
+    
+    if prev_cursor:
+        # Provide previous URL if we have a previous cursor (there's older data available)
+        prev_url = f"{base_url}?cursor={prev_cursor}&limit={limit}&direction=prev{timeframe_param}"
+    
+    body = PaginatedCandleResponse(
+        count=total_count,
+        next=next_url,
+        previous=prev_url,
+        results=candles
+    ).model_dump_json().encode()
+    
+    # A page that ends before the latest bar can't change until the data is replaced
+    # (except ATR-sized Renko, whose brick size moves with every new candle)
+    latest_time = data_service.get_latest_time(symbol, timeframe, chart)
+    historical = len(candles) == limit and latest_time is not None and candles[-1].time < latest_time
+    if chart is not None and chart.chart_type == "renko" and chart.brick_size is None:
+        historical = False
+    return body, historical, next_cursor, prev_cursor
+
+
+def _build_page(cache_key: tuple) -> tuple:
+    """Render the page identified by a page cache key into its cached form"""
+    base_url, symbol, timeframe, cursor, direction, limit, start_date, end_date, chart, _ = cache_key
+    body, historical, next_cursor, prev_cursor = _render_candles_page(
+        base_url, symbol, timeframe, cursor, direction, limit, start_date, end_date, chart
+    )
+    etag = '"' + hashlib.blake2b(repr(cache_key).encode(), digest_size=16).hexdigest() + '"'
+    return body, historical, etag, next_cursor, prev_cursor
+
+
+@router.get("/candles", response_model=BatchCandlesResponse)
+async def get_batch_candles(
+    symbols: str = Query(..., description="Comma-separated trading pairs (e.g., EURUSD,GBPUSD)"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+    limit: int = Query(settings.DEFAULT_PAGE_LIMIT, ge=1, le=settings.MAX_PAGE_LIMIT, description="Most recent candles per symbol"),
+    start_date: Optional[str] = Query(None, description="ISO format start date"),
+    end_date: Optional[str] = Query(None, description="ISO format end date"),
+):
+    """
+    Get the most recent `limit` candles (within the optional date range) of
+    many symbols in one round-trip.
+    
+    Symbols are loaded in parallel worker threads and returned as parallel
+    arrays per symbol. Symbols without data are listed in `errors` instead of
+    failing the whole batch.
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="symbols must contain at least one symbol")
+    if len(symbol_list) > settings.BATCH_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BATCH_MAX_SYMBOLS} symbols per batch")
+    
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    
+    async def load(symbol: str):
+        async with semaphore:
+            return await asyncio.to_thread(
+                data_service.get_candle_arrays,
+                symbol,
+                timeframe=timeframe,
+                direction="prev",
+                limit=limit,
+                start_date=start_date,
+                end_date=end_date,
+            )
+    
+    results = await asyncio.gather(*(load(symbol) for symbol in symbol_list), return_exceptions=True)
+    
+    series = {}
+    errors = {}
+    for symbol, result in zip(symbol_list, results):
+        if isinstance(result, FileNotFoundError):
+            errors[symbol] = str(result)
+        elif isinstance(result, ValueError):
+            raise HTTPException(status_code=400, detail=str(result))
+        elif isinstance(result, BaseException):
+            raise HTTPException(status_code=500, detail=f"Internal server error: {str(result)}")
+        else:
+            arrays, total_count = result
+            series[symbol] = {
+                "count": len(arrays),
+                "total": total_count,
+                **{name: column.tolist() for name, column in arrays._asdict().items()},
+            }
+    
+    # Encoded directly: validating ~100k floats through the response model would dominate the request
+    body = json.dumps({"timeframe": timeframe, "symbols": series, "errors": errors}, separators=(",", ":"))
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("/{symbol}/candles", response_model=PaginatedCandleResponse)
 async def get_candles(
@@ -17,6 +198,11 @@ async def get_candles(
     limit: int = Query(settings.DEFAULT_PAGE_LIMIT, ge=1, le=settings.MAX_PAGE_LIMIT),
     start_date: Optional[str] = Query(None, description="ISO format start date"),
     end_date: Optional[str] = Query(None, description="ISO format end date"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+    chart_type: str = Query("candles", description="candles, heikin_ashi, renko or range"),
+    brick_size: Optional[float] = Query(None, gt=0, description="Renko brick size (default: ATR-sized)"),
+    atr_period: int = Query(14, ge=1, le=1000, description="ATR period for Renko bricks without brick_size"),
+    range_size: Optional[float] = Query(None, gt=0, description="Range bar size (required for range bars)"),
 ):
     """
     Get paginated candlestick data with cursor-based pagination.
@@ -27,53 +213,189 @@ async def get_candles(
     - **limit**: Number of candles to return (default 1000, max 5000)
     - **start_date**: Optional ISO format date for initial load
     - **end_date**: Optional ISO format date for initial load
+    - **timeframe**: Candle timeframe stored for the symbol (default 15m)
+    - **chart_type**: Derived bars built from the timeframe's candles:
+      Heikin-Ashi, Renko (`brick_size`, or ATR(`atr_period`) of the latest
+      bar) or range bars (`range_size`). Renko and range series contain
+      completed bars only, stamped with the time of the candle that
+      completed them (plus a second per extra bar completed by the same
+      candle, within its interval), and page with the same cursors. Sizes
+      that would build more than DERIVED_CHART_MAX_BARS_RATIO bars per
+      candle are rejected with 400.
+    
+    Pages carry a strong ETag; fully historical pages are also served with a
+    long-lived Cache-Control header. The page a scrolling chart will most
+    likely request next is rendered in the background after each request.
     """
     try:
         # Validate direction
         if direction not in ["next", "prev"]:
             raise HTTPException(status_code=400, detail="direction must be 'next' or 'prev'")
         
-        # Get candle data
-        candles, total_count, next_cursor, prev_cursor = data_service.get_candles(
-            symbol=symbol.upper(),
-            cursor=cursor,
-            direction=direction,
-            limit=limit,
-            start_date=start_date,
-            end_date=end_date
-        )
-        
-        # Build base URL
+        symbol = symbol.upper()
+        chart = _chart_spec(chart_type, brick_size, atr_period, range_size)
         base_url = str(request.url).split('?')[0]
+        version = data_service.get_data_version(symbol, timeframe)
+        cache_key = (
+            base_url, symbol, timeframe, cursor, direction, limit, start_date, end_date, chart, version
+        )
         
-        # Build next and previous URLs
-        next_url = None
-        prev_url = None
+        cached = _page_cache.get(cache_key)
+        if cached is None and settings.CANDLE_PREFETCH_ENABLED:
+            cached = prefetch_service.take(cache_key)
+            if cached is not None:
+                _page_cache.set(cache_key, cached)
+        record_cache("candle_pages", hit=cached is not None)
+        if cached is None:
+            # Derived series are built from the whole history on first use; keep that off the event loop
+            cached = await asyncio.to_thread(_build_page, cache_key) if chart is not None else _build_page(cache_key)
+            _page_cache.set(cache_key, cached)
+        body, historical, etag, next_cursor, prev_cursor = cached
         
-        if next_cursor and len(candles) == limit:
-            # Only provide next URL if we got a full page (might be more data)
-            next_url = f"{base_url}?cursor={next_cursor}&limit={limit}&direction=next"
+        if settings.CANDLE_PREFETCH_ENABLED:
+            pattern_key = (symbol, timeframe)
+            prefetch_service.record(pattern_key, cache_key)
+            # Follow-up pages come from the page's own links, which drop the date range
+            next_direction = prefetch_service.predict_direction(cursor, direction)
+            follow_cursor = prev_cursor if next_direction == "prev" else next_cursor
+            if follow_cursor is not None:
+                next_key = (base_url, symbol, timeframe, follow_cursor, next_direction, limit, None, None, chart, version)
+                prefetch_service.expect(
+                    pattern_key, next_key, partial(_build_page, next_key), cached=next_key in _page_cache
+                )
         
-        if prev_cursor:
-            # Provide previous URL if we have a previous cursor (there's older data available)
-            prev_url = f"{base_url}?cursor={prev_cursor}&limit={limit}&direction=prev"
+        headers = {
+            "ETag": etag,
+            "Cache-Control": (
+                f"public, max-age={settings.CANDLE_HISTORICAL_MAX_AGE}, immutable"
+                if historical else "no-cache"
+            ),
+        }
+        if_none_match = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+        if etag in if_none_match or "*" in if_none_match:
+            return Response(status_code=304, headers=headers)
         
-        return PaginatedCandleResponse(
-            count=total_count,
-            next=next_url,
-            previous=prev_url,
-            results=candles
-        )
+        return Response(content=body, media_type="application/json", headers=headers)
         
+    except HTTPException:
+        raise
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.get("/{symbol}/range-stats", response_model=RangeStats)
+async def get_range_stats(
+    symbol: str,
+    start_time: int = Query(..., description="Unix timestamp (inclusive)"),
+    end_time: int = Query(..., description="Unix timestamp (inclusive)"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+):
+    """
+    Get the highest high, lowest low, total volume and open/close of the
+    candles between two timestamps. Answered in constant time from a
+    per-symbol index built on first use (in a worker thread, so a cold
+    build doesn't stall other requests).
+    """
+    try:
+        stats = await asyncio.to_thread(data_service.get_range_stats, symbol.upper(), [(start_time, end_time)], timeframe)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RangeStats.model_validate(stats[0])
+
+
+@router.post("/{symbol}/range-stats", response_model=RangeStatsResponse)
+async def get_range_stats_batch(
+    symbol: str,
+    payload: RangeStatsRequest,
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+):
+    """
+    Get range stats for many ranges in one call.
+    
+    Explicit `ranges` come first, followed by one range per drawing (the span
+    of its points) for `drawing_ids` or, with `all_drawings`, every drawing
+    of the pair.
+    """
+    symbol = symbol.upper()
+    ranges = [(r.start_time, r.end_time) for r in payload.ranges]
+    drawing_ids = [None] * len(ranges)
+    if payload.all_drawings or payload.drawing_ids:
+        spans = drawing_service.get_time_ranges(symbol, None if payload.all_drawings else payload.drawing_ids)
+        for drawing_id, (x_min, x_max) in spans.items():
+            ranges.append((int(x_min), int(x_max)))
+            drawing_ids.append(drawing_id)
+    
+    try:
+        stats = await asyncio.to_thread(data_service.get_range_stats, symbol, ranges, timeframe)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    items = [
+        RangeStats.model_validate(item).model_copy(update={"drawing_id": drawing_id})
+        for item, drawing_id in zip(stats, drawing_ids)
+    ]
+    return RangeStatsResponse(items=items, count=len(items))
+
+
+@router.get("/{symbol}/volume-profile", response_model=VolumeProfileResponse)
+async def get_volume_profile(
+    symbol: str,
+    start_time: int = Query(..., description="Unix timestamp (inclusive)"),
+    end_time: int = Query(..., description="Unix timestamp (inclusive)"),
+    bin_size: float = Query(..., gt=0, description="Price bin height (e.g., 0.0001 for 1 pip)"),
+    value_area: float = Query(0.7, gt=0, le=1, description="Share of volume in the value area"),
+    timeframe: str = Query(settings.DEFAULT_TIMEFRAME, description="Candle timeframe (e.g., 1m, 15m)"),
+):
+    """
+    Get the volume profile of the candles between two timestamps.
+    
+    Each bar's volume is spread evenly over its high-low range. Profiles come
+    from cumulative per-bin checkpoints cached per (symbol, bin size), so
+    panning the visible window only re-bins the bars at its edges. Checkpoints
+    are built in a worker thread.
+    """
+    symbol = symbol.upper()
+    try:
+        profile = await asyncio.to_thread(
+            volume_profile_service.get_profile,
+            symbol, start_time, end_time, bin_size, timeframe=timeframe, value_area=value_area,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    bins = []
+    if profile.volumes is not None:
+        edges = np.round(profile.price_low + np.arange(len(profile.volumes) + 1) * bin_size, 10)
+        bins = [
+            VolumeProfileBin(price_low=low, price_high=high, volume=volume)
+            for low, high, volume in zip(edges[:-1].tolist(), edges[1:].tolist(), profile.volumes.tolist())
+        ]
+    return VolumeProfileResponse(
+        symbol=symbol,
+        start_time=profile.start_time,
+        end_time=profile.end_time,
+        bars=profile.bars,
+        bin_size=bin_size,
+        total_volume=profile.total_volume,
+        poc_price=profile.poc_price,
+        value_area_low=profile.value_area_low,
+        value_area_high=profile.value_area_high,
+        bins=bins,
+        count=len(bins),
+    )
+
+
 @router.get("/", response_model=list[str])
 async def get_available_pairs():
     """Get list of available trading pairs"""
-    # For now, we only have EURUSD
-    return ["EURUSD"]
-
+    return data_service.list_symbols()
@@ -0,0 +1,67 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.schemas.pattern import PatternMatch, PatternSearchResponse
+from app.services.pattern_service import pattern_service
+from app.services.drawing_service import drawing_service
+from app.core.config import settings
+
+
+router = APIRouter()
+
+
+@router.get("/similar", response_model=PatternSearchResponse)
+async def find_similar_patterns(
+    symbol: Optional[str] = Query(None, description="Trading pair of the query window (e.g., EURUSD)"),
+    start_time: Optional[int] = Query(None, description="Unix timestamp of the first candle in the query window"),
+    end_time: Optional[int] = Query(None, description="Unix timestamp of the last candle in the query window"),
+    drawing_id: Optional[int] = Query(None, description="Use the time range and pair of this drawing as the query"),
+    k: int = Query(10, ge=1, le=settings.PATTERN_MAX_RESULTS, description="Number of matches to return"),
+    symbols: Optional[str] = Query(None, description="Comma-separated symbols to search (default: whole catalog)"),
+):
+    """
+    Find the K historical windows most similar in shape to a selected window.
+    
+    The query window is either `symbol` + `start_time`/`end_time` or the time
+    range covered by a drawing's points. Windows are compared by z-normalized
+    Euclidean distance, so matches have the same shape regardless of price level.
+    """
+    if drawing_id is not None:
+        drawing = drawing_service.get_drawing_by_id(drawing_id)
+        if not drawing:
+            raise HTTPException(status_code=404, detail=f"Drawing with id {drawing_id} not found")
+        xs = [point.x for series in drawing.series for point in series.points]
+        if not xs:
+            raise HTTPException(status_code=400, detail=f"Drawing {drawing_id} has no points")
+        symbol = drawing.pair
+        start_time, end_time = int(min(xs)), int(max(xs))
+    elif symbol is None or start_time is None or end_time is None:
+        raise HTTPException(status_code=400, detail="Provide drawing_id or symbol, start_time and end_time")
+    
+    symbol = symbol.upper()
+    symbol_list = [s.strip().upper() for s in symbols.split(",") if s.strip()] if symbols else None
+    
+    try:
+        query, _, _ = pattern_service.get_query_window(symbol, start_time, end_time)
+        # A catalog-wide scan (and cold index builds) would otherwise block the event loop
+        matches = await asyncio.to_thread(
+            pattern_service.search,
+            symbol=symbol,
+            start_time=start_time,
+            end_time=end_time,
+            k=k,
+            symbols=symbol_list,
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return PatternSearchResponse(
+        symbol=symbol,
+        start_time=start_time,
+        end_time=end_time,
+        window=len(query),
+        matches=[PatternMatch.model_validate(match) for match in matches],
+        count=len(matches),
+    )
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Query
+from ai.inference import inference_service
+from app.schemas.signal import Signal, SignalsResponse
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=SignalsResponse)
+async def get_signals(
+    symbols: str = Query(..., description="Comma-separated trading pairs (e.g., EURUSD,GBPUSD)")
+):
+    """
+    Get model signals for the latest bar of several symbols.
+    
+    Requests are micro-batched with other concurrent callers and cached per
+    (symbol, last bar time).
+    """
+    symbol_list = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="symbols must contain at least one symbol")
+    
+    try:
+        results = await inference_service.score_many(symbol_list)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    signals = [Signal.model_validate(result) for result in results]
+    return SignalsResponse(signals=signals, count=len(signals))
+
+
+@router.get("/{symbol}", response_model=Signal)
+async def get_signal(symbol: str):
+    """
+    Get the model signal for the latest bar of a symbol.
+    """
+    try:
+        result = await inference_service.score(symbol.upper())
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Signal.model_validate(result)
@@ -0,0 +1,237 @@
+"""
+Cost-aware admission control.
+
+Every controlled request is classified by path and query into a class and a
+cost (roughly: 500-candle pages' worth of work):
+
+- "light": chart pans (candle pages up to ADMISSION_LIGHT_MAX_BARS) and
+  drawing reads/writes. Never queued.
+- "heavy": large candle pages, multi-symbol batches, range stats, volume
+  profiles, analytics, pattern search and signals. Each route template has
+  its own limiter, so a slow analytics query can't take the slots of candle
+  pages: at most ADMISSION_HEAVY_CONCURRENCY requests of a route run at once
+  (ADMISSION_ROUTE_CONCURRENCY overrides it per route) and up to
+  ADMISSION_HEAVY_QUEUE more wait until their deadline
+  (ADMISSION_QUEUE_TIMEOUT_MS, or ADMISSION_ROUTE_QUEUE_TIMEOUT_MS per route).
+
+Each client (ADMISSION_CLIENT_HEADER or the peer address) has a token bucket
+refilled at ADMISSION_RATE cost units per second up to ADMISSION_BURST.
+Requests over budget get 429; heavy requests that cannot start before their
+deadline (full queue, or the expected wait is already past it) get 503 at
+once instead of piling up. Both carry Retry-After.
+
+Heavy handlers hold the event loop or a worker thread while they run, so
+shedding heavy work before it starts is what keeps cheap pans fast while the
+process is saturated.
+"""
+import asyncio
+import json
+import math
+import re
+import time
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import Counter, registry
+
+
+admission_decisions = registry.register(Counter(
+    "admission_decisions_total", "Admission decisions by route, request class and result",
+    ("route", "request_class", "result")
+))
+
+
+def _int_param(query: dict, name: str, default: int) -> int:
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        return default
+
+
+def _pages(query: dict) -> float:
+    """Candle pages' worth of work (validation of the values is left to the route)"""
+    limit = _int_param(query, "limit", settings.DEFAULT_PAGE_LIMIT)
+    return max(1.0, min(limit, settings.MAX_PAGE_LIMIT) / 500)
+
+
+def _candles(method: str, query: dict) -> tuple[str, float]:
+    limit = _int_param(query, "limit", settings.DEFAULT_PAGE_LIMIT)
+    return ("light" if limit <= settings.ADMISSION_LIGHT_MAX_BARS else "heavy"), _pages(query)
+
+
+def _batch_candles(method: str, query: dict) -> tuple[str, float]:
+    symbols = [s for s in query.get("symbols", [""])[0].split(",") if s.strip()]
+    return "heavy", max(1, len(symbols)) * _pages(query)
+
+
+def _drawings(method: str, query: dict) -> tuple[str, float]:
+    # Drag edits fire per mouse move and are coalesced server-side; keep them nearly free
+    return "light", 0.1 if method == "PUT" else 1.0
+
+
+def _heavy(cost: float) -> Callable[[str, dict], tuple[str, float]]:
+    return lambda method, query: ("heavy", cost)
+
+
+# (path pattern, route template, classifier) - first match wins; unmatched paths are not controlled.
+# Heavy requests are limited per route template.
+_RULES: list[tuple[re.Pattern, str, Callable[[str, dict], tuple[str, float]]]] = [
+    (re.compile(r"^/api/v1/pairs/candles/?$"), "/api/v1/pairs/candles", _batch_candles),
+    (re.compile(r"^/api/v1/pairs/[^/]+/candles/?$"), "/api/v1/pairs/{symbol}/candles", _candles),
+    (re.compile(r"^/api/v1/pairs/[^/]+/range-stats/?$"), "/api/v1/pairs/{symbol}/range-stats", _heavy(2.0)),
+    (re.compile(r"^/api/v1/pairs/[^/]+/volume-profile/?$"), "/api/v1/pairs/{symbol}/volume-profile", _heavy(2.0)),
+    (re.compile(r"^/api/v1/analytics/correlation/?$"), "/api/v1/analytics/correlation", _heavy(4.0)),
+    (re.compile(r"^/api/v1/analytics/correlation/rolling/?$"), "/api/v1/analytics/correlation/rolling", _heavy(4.0)),
+    (re.compile(r"^/api/v1/analytics/returns/?$"), "/api/v1/analytics/returns", _heavy(4.0)),
+    (re.compile(r"^/api/v1/patterns/similar/?$"), "/api/v1/patterns/similar", _heavy(4.0)),
+    (re.compile(r"^/api/v1/signals/?$"), "/api/v1/signals/", _heavy(4.0)),
+    (re.compile(r"^/api/v1/signals/[^/]+/?$"), "/api/v1/signals/{symbol}", _heavy(4.0)),
+    (re.compile(r"^/api/v1/drawings/export/?$"), "/api/v1/drawings/export", _heavy(4.0)),
+    (re.compile(r"^/api/v1/drawings/import/?$"), "/api/v1/drawings/import", _heavy(4.0)),
+    (re.compile(r"^/api/v1/drawings(/|$)"), "/api/v1/drawings", _drawings),
+]
+
+
+class TokenBucket:
+    """Cost tokens refilled continuously at `rate` per second up to `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, cost: float) -> float:
+        """Take `cost` tokens; returns 0 on success, else seconds until they are available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # A request costlier than the burst only has to wait for a full bucket
+        cost = min(cost, self.burst)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests at once, with a bounded queue of waiters"""
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.service_time: Optional[float] = None  # Moving average of seconds per request
+        self._semaphore = asyncio.Semaphore(limit)
+
+    def expected_wait(self) -> float:
+        """Rough time until a new request would start"""
+        if self.active < self.limit or self.service_time is None:
+            return 0.0
+        return (self.waiting + 1) / self.limit * self.service_time
+
+    async def acquire(self, timeout: float) -> bool:
+        if self.active >= self.limit and (self.waiting >= self.max_queue or self.expected_wait() > timeout):
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self, elapsed: float):
+        self.active -= 1
+        self._semaphore.release()
+        self.service_time = elapsed if self.service_time is None else 0.8 * self.service_time + 0.2 * elapsed
+
+
+class AdmissionMiddleware:
+    """Apply per-client token buckets and per-route concurrency limits to controlled routes"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # Route template -> limiter of its heavy requests, created on first use
+        self._limiters: dict[str, ConcurrencyLimiter] = {}
+        self._buckets = LRUCache(settings.ADMISSION_MAX_CLIENTS)
+        self.client_header = settings.ADMISSION_CLIENT_HEADER.lower().encode() if settings.ADMISSION_CLIENT_HEADER else None
+
+    def _limiter(self, route: str) -> ConcurrencyLimiter:
+        limiter = self._limiters.get(route)
+        if limiter is None:
+            limit = settings.ADMISSION_ROUTE_CONCURRENCY.get(route, settings.ADMISSION_HEAVY_CONCURRENCY)
+            limiter = ConcurrencyLimiter(limit, settings.ADMISSION_HEAVY_QUEUE)
+            self._limiters[route] = limiter
+        return limiter
+
+    def _client(self, scope: Scope) -> str:
+        if self.client_header is not None:
+            for name, value in scope.get("headers", ()):
+                if name == self.client_header:
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def _reject(self, send: Send, status: int, detail: str, retry_after: float):
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        rule = next(((route, classify) for pattern, route, classify in _RULES if pattern.match(path)), None)
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, classify = rule
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        request_class, cost = classify(scope["method"], query)
+
+        client = self._client(scope)
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(settings.ADMISSION_RATE, settings.ADMISSION_BURST)
+            self._buckets.set(client, bucket)
+        wait = bucket.take(cost)
+        if wait > 0:
+            admission_decisions.inc(route=route, request_class=request_class, result="rate_limited")
+            await self._reject(send, 429, "Rate limit exceeded", wait)
+            return
+
+        if request_class != "heavy":
+            admission_decisions.inc(route=route, request_class=request_class, result="admitted")
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self._limiter(route)
+        deadline = settings.ADMISSION_ROUTE_QUEUE_TIMEOUT_MS.get(route, settings.ADMISSION_QUEUE_TIMEOUT_MS) / 1000.0
+        if not await limiter.acquire(deadline):
+            # Give the tokens back: the request did no work
+            bucket.tokens = min(bucket.burst, bucket.tokens + min(cost, bucket.burst))
+            admission_decisions.inc(route=route, request_class=request_class, result="shed")
+            await self._reject(send, 503, "Server busy, retry later", limiter.expected_wait() or deadline)
+            return
+        admission_decisions.inc(route=route, request_class=request_class, result="admitted")
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - start)
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -14,16 +15,120 @@ class Settings(BaseSettings):
         "http://127.0.0.1:3000",
     ]
     
+    # Observability
+    METRICS_ENABLED: bool = True  # Expose /metrics and record per-request metrics
+    LOG_SAMPLE_RATE: float = 0.01  # Fraction of hot-path debug messages that are emitted
+    # Admin routes (/api/v1/admin: profiles, maintenance) need "Authorization: Bearer <ADMIN_TOKEN>"
+    ADMIN_TOKEN: Optional[str] = None  # Unset disables the admin routes
+    # Request profiler (folded stacks downloadable from /api/v1/admin/profiles)
+    PROFILER_ENABLED: bool = False  # Install the profiling middleware at all
+    PROFILER_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled (requests with PROFILER_HEADER always are)
+    PROFILER_HEADER: str = "X-Profile"
+    PROFILER_TOKEN: Optional[str] = None  # When set, PROFILER_HEADER must carry this value
+    PROFILER_INTERVAL_MS: float = 5.0  # Stack sampling interval
+    PROFILER_BUFFER_SIZE: int = 50  # Captures kept (oldest dropped first)
+    PROFILER_MAX_DEPTH: int = 128  # Frames kept per stack
+    
+    # Admission control for data/drawing routes (costs are in 500-candle pages)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_HEAVY_CONCURRENCY: int = 2  # Expensive requests (large pages, batches, analytics) of one route running at once
+    ADMISSION_HEAVY_QUEUE: int = 8  # Expensive requests of one route allowed to wait for a slot
+    ADMISSION_QUEUE_TIMEOUT_MS: int = 2000  # Longest wait for a slot before answering 503
+    # Per route template overrides, e.g. {"/api/v1/analytics/correlation": 1}
+    ADMISSION_ROUTE_CONCURRENCY: dict[str, int] = {}
+    ADMISSION_ROUTE_QUEUE_TIMEOUT_MS: dict[str, int] = {}
+    ADMISSION_LIGHT_MAX_BARS: int = 1000  # Candle pages up to this size are never queued
+    ADMISSION_RATE: float = 50.0  # Cost refilled per client per second (a scrolling chart uses ~5-15)
+    ADMISSION_BURST: float = 300.0  # Cost a client can spend at once (a page load with several charts)
+    ADMISSION_CLIENT_HEADER: Optional[str] = None  # e.g. "X-Forwarded-For" behind a proxy (default: peer address)
+    ADMISSION_MAX_CLIENTS: int = 10000  # Token buckets kept (least recently seen dropped first)
+    
     # Database configuration
     DATABASE_URL: str = "sqlite:///./charting_app.db"
+    # How drawing points are written: "rows" (one row per point) or "packed" (one JSON array per series)
+    POINT_STORAGE_MODE: str = "rows"
+    # PUT edits to one drawing within this window are merged and written together (0 = write through)
+    DRAWING_WRITE_COALESCE_MS: int = 250
+    # Change log events kept per pair; older ones the snapshot covers are truncated as it advances (0 = keep all)
+    DRAWING_LOG_RETAIN_EVENTS: int = 10_000
+    # NDJSON export/import: drawings read per cursor batch, and points inserted per import transaction
+    DRAWING_EXPORT_BATCH_SIZE: int = 100
+    DRAWING_IMPORT_BATCH_POINTS: int = 50_000
+    # Orphan purge + ANALYZE + vacuum of the drawings database (0 = only on demand via /api/v1/admin/maintenance)
+    MAINTENANCE_INTERVAL_HOURS: float = 24.0
     
-    # Data configuration (CSV only - drawings now in SQLite)
+    # Data configuration (drawings now in SQLite)
+    # Partitioned candle store: DATA_DIR/{SYMBOL}/{timeframe}/manifest.json + monthly partitions
+    DATA_DIR: Path = Path(__file__).parent.parent / "data" / "candles"
+    CANDLE_PARTITION_CACHE_SIZE: int = 48  # Hot partitions kept in memory (decoded)
+    CANDLE_ARRAY_CACHE_SIZE: int = 16  # Full symbol histories (and their range indexes) kept in memory
+    CANDLE_ENCODED_CACHE_SIZE: int = 512  # Partitions kept in memory in compact form
+    CANDLE_STORE_FORMAT: str = "compact"  # "compact" (fixed-point, delta-encoded) or "npz"
+    # Price decimals per symbol for the compact format (detected from the data when missing)
+    PRICE_DECIMALS: dict[str, int] = {}
+    # Bundled CSV, served for its symbol/timeframe when the store has no data for it
     CSV_FILE_PATH: Path = Path(__file__).parent.parent / "EURUSD_15m_1year.csv"
+    CSV_SYMBOL: str = "EURUSD"
+    CSV_TIMEFRAME: str = "15m"
+    
+    DEFAULT_TIMEFRAME: str = "15m"
+    
+    # Startup warm-up: symbols ("*" = every symbol in the catalog) x timeframes loaded before /ready passes
+    WARMUP_SYMBOLS: list[str] = ["EURUSD"]
+    WARMUP_TIMEFRAMES: list[str] = ["15m"]
     
     # Pagination defaults
     DEFAULT_PAGE_LIMIT: int = 500
     MAX_PAGE_LIMIT: int = 5000
     
+    # Multi-symbol candle batches
+    BATCH_MAX_SYMBOLS: int = 100
+    BATCH_CONCURRENCY: int = 8  # Symbols loaded in parallel per request
+    
+    # Response compression (brotli is used when the optional `brotli` package is installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes; smaller bodies are sent as-is
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_CACHE_SIZE: int = 256  # Compressed bodies cached per (ETag, encoding)
+    
+    # Candle page caching
+    CANDLE_RESPONSE_CACHE_SIZE: int = 512  # Encoded candle pages kept in memory
+    DERIVED_CHART_CACHE_SIZE: int = 64  # Heikin-Ashi/Renko/range series kept per (symbol, timeframe, parameters)
+    DERIVED_CHART_MAX_BARS_RATIO: float = 2.0  # Renko/range bars allowed per source candle (smaller sizes get 400)
+    CANDLE_HISTORICAL_MAX_AGE: int = 31536000  # Cache-Control max-age for fully historical pages
+    # Speculative rendering of the page a scrolling chart will ask for next
+    CANDLE_PREFETCH_ENABLED: bool = True
+    CANDLE_PREFETCH_CACHE_SIZE: int = 64  # Prefetched pages kept until requested
+    CANDLE_PREFETCH_CPU_BUDGET: float = 0.25  # Share of one core the prefetch thread may use
+    CANDLE_PREFETCH_MIN_ACCURACY: float = 0.5  # Stop prefetching a symbol whose readers stop following predictions
+    
+    # Signal inference (micro-batched CPU scoring)
+    INFERENCE_MODEL_PATH: Optional[Path] = None  # .npz with "weights" and "bias"
+    INFERENCE_WINDOW: int = 64  # Number of returns fed to the model
+    INFERENCE_MAX_BATCH_SIZE: int = 64
+    INFERENCE_MAX_LATENCY_MS: float = 5.0  # Max time a request waits for its batch to fill
+    INFERENCE_CACHE_SIZE: int = 4096  # Cached results keyed on (symbol, last bar time)
+    
+    # Pattern similarity search
+    PATTERN_MIN_WINDOW: int = 8
+    PATTERN_MAX_WINDOW: int = 1024
+    PATTERN_MAX_RESULTS: int = 100
+    PATTERN_INDEX_CACHE_SIZE: int = 32  # Cached per-symbol indexes (shared by every window length)
+    
+    # Volume profile
+    VOLUME_PROFILE_MAX_BINS: int = 5000  # Bins over a symbol's whole price history
+    VOLUME_PROFILE_MAX_CELLS: int = 4_000_000  # Checkpoint rows x bins kept per cached index
+    VOLUME_PROFILE_CACHE_SIZE: int = 16  # Cached (symbol, timeframe, bin size) indexes
+    
+    # Cross-symbol analytics
+    ANALYTICS_MAX_SYMBOLS: int = 200
+    ANALYTICS_MAX_BARS: int = 100_000
+    ANALYTICS_CACHE_SIZE: int = 32  # Cached aligned returns matrices
+    
+    # Drawing alerts
+    ALERT_EVENT_BUFFER_SIZE: int = 1000  # Recent events kept per pair (and per stream subscriber)
+    
     class Config:
         case_sensitive = True
 
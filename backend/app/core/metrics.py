@@ -0,0 +1,256 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Covers per-route request latency and payload sizes, SQL query counts and
+timings (recorded per request through SQLAlchemy cursor events) and cache
+hit/miss counters of the data layer. Rendered at GET /metrics.
+"""
+import bisect
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(name, "") for name in self.labels), 0.0)
+
+    def label_sets(self) -> list[tuple]:
+        with self._lock:
+            return list(self._values.keys())
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        # key -> [bucket counts..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+        self._lock = Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                state[idx] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative:g}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {state[-1]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {state[-2]:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {state[-1]:g}")
+        return lines
+
+
+class Gauge:
+    """Gauge whose labeled values are computed when metrics are rendered"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...], collect: Callable[[], dict[tuple, float]]):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.collect = collect
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in self.collect().items()]
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size (after compression)", ("method", "route"), SIZE_BUCKETS
+))
+http_request_size = registry.register(Histogram(
+    "http_request_size_bytes", "HTTP request body size", ("method", "route"), SIZE_BUCKETS
+))
+db_queries_per_request = registry.register(Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"), COUNT_BUCKETS
+))
+db_time_per_request = registry.register(Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request", ("method", "route")
+))
+db_query_duration = registry.register(Histogram(
+    "db_query_duration_seconds", "SQL statement latency", ("operation",)
+))
+cache_requests = registry.register(Counter(
+    "cache_requests_total", "Cache lookups by cache and result", ("cache", "result")
+))
+drawing_edits = registry.register(Counter(
+    "drawing_edits_total", "Drawing updates by how they were written", ("result",)
+))
+drawing_edit_flushes = registry.register(Counter(
+    "drawing_edit_flushes_total", "Transactions writing buffered drawing edits"
+))
+
+
+def _cache_hit_ratios() -> dict[tuple, float]:
+    caches = {key[0] for key in cache_requests.label_sets()}
+    ratios = {}
+    for cache in caches:
+        hits = cache_requests.value(cache=cache, result="hit")
+        misses = cache_requests.value(cache=cache, result="miss")
+        if hits + misses:
+            ratios[(cache,)] = hits / (hits + misses)
+    return ratios
+
+
+registry.register(Gauge("cache_hit_ratio", "Cache hit ratio since startup", ("cache",), _cache_hit_ratios))
+
+
+def record_cache(cache: str, hit: bool):
+    """Count one lookup of a named cache"""
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# Per-request SQL statistics: [query count, total seconds]
+_request_db_stats: ContextVar[Optional[list]] = ContextVar("request_db_stats", default=None)
+
+
+def instrument_engine(engine: Engine):
+    """Record timings of every SQL statement executed on `engine`"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_times"].pop()
+        operation = statement.split(None, 1)[0].upper() if statement.strip() else ""
+        db_query_duration.observe(elapsed, operation=operation)
+        stats = _request_db_stats.get()
+        if stats is not None:
+            stats[0] += 1
+            stats[1] += elapsed
+
+
+class MetricsMiddleware:
+    """Record latency, payload sizes and SQL usage of every HTTP request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+        response_size = 0
+        db_stats = [0, 0.0]
+        token = _request_db_stats.set(db_stats)
+
+        async def send_wrapper(message: Message):
+            nonlocal status, response_size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_db_stats.reset(token)
+            elapsed = time.perf_counter() - start
+            method = scope["method"]
+            route = scope.get("route")
+            # Use the route template so path parameters don't explode cardinality
+            route_name = getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+            request_size = 0
+            for name, value in scope.get("headers", ()):
+                if name == b"content-length":
+                    request_size = int(value or 0)
+
+            http_requests.inc(method=method, route=route_name, status=status)
+            http_request_duration.observe(elapsed, method=method, route=route_name)
+            http_response_size.observe(response_size, method=method, route=route_name)
+            http_request_size.observe(request_size, method=method, route=route_name)
+            db_queries_per_request.observe(db_stats[0], method=method, route=route_name)
+            db_time_per_request.observe(db_stats[1], method=method, route=route_name)
@@ -0,0 +1,103 @@
+import gzip
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # Optional dependency
+    brotli = None
+
+
+class CompressionMiddleware:
+    """
+    Compress complete response bodies with brotli or gzip.
+
+    Only single-message bodies at or above `minimum_size` are compressed;
+    streaming responses (SSE, exports) pass through untouched. Bodies that
+    carry a strong ETag are immutable for that tag, so their compressed form
+    is cached per (ETag, encoding) and reused without recompressing.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_size: int = 256,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._cache = LRUCache(cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Message = {}
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the start message until we know whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or not start_message:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+            ):
+                await send(start_message)
+                start_message = {}
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding, headers.get("etag"))
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            start_message = {}
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _negotiate(self, accept_encoding: str):
+        accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+
+    def _compress(self, body: bytes, encoding: str, etag) -> bytes:
+        # Weak ETags don't promise byte-identical bodies, so only cache strong ones
+        cache_key = (etag, encoding) if etag and not etag.startswith("W/") else None
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level)
+
+        if cache_key is not None:
+            self._cache.set(cache_key, compressed)
+        return compressed
@@ -0,0 +1,185 @@
+"""
+On-demand sampling profiler for live requests.
+
+While at least one request is being profiled, a background thread wakes every
+PROFILER_INTERVAL_MS, snapshots every thread's stack with
+sys._current_frames() and counts it in each active capture as a folded stack
+("thread;outer (file:line);...;inner (file:line) count"), the text format read
+by flamegraph.pl, speedscope and inferno. No thread runs and no hook is
+installed while nothing is being profiled, and ProfilerMiddleware is only
+added when PROFILER_ENABLED is set.
+
+Requests handled on the event loop share its thread, so samples taken while
+several profiled requests overlap are counted in each of them.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Optional
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+
+# Leaf frames of threads that are parked, not working (event loop select, idle pool workers)
+_IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+}
+
+
+@dataclass
+class ProfileCapture:
+    """Sampled stacks of one request"""
+    id: int
+    method: str
+    path: str
+    trigger: str  # "header" or "sampled"
+    started_at: float  # Unix time
+    route: str = ""
+    status: int = 0
+    duration: float = 0.0
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """Samples all thread stacks while requests are being profiled; keeps the last captures in a ring buffer"""
+
+    def __init__(self, interval: float, buffer_size: int, max_depth: int):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._captures: deque[ProfileCapture] = deque(maxlen=buffer_size)
+        self._active: list[ProfileCapture] = []
+        self._labels: dict = {}  # code object -> frame label
+        self._next_id = 1
+        self._thread: Optional[threading.Thread] = None
+        self._lock = Lock()
+
+    def start(self, method: str, path: str, trigger: str) -> ProfileCapture:
+        with self._lock:
+            capture = ProfileCapture(
+                id=self._next_id, method=method, path=path, trigger=trigger, started_at=time.time()
+            )
+            self._next_id += 1
+            self._active.append(capture)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return capture
+
+    def stop(self, capture: ProfileCapture):
+        capture.duration = time.time() - capture.started_at
+        with self._lock:
+            self._active.remove(capture)
+            self._captures.append(capture)
+
+    def captures(self) -> list[ProfileCapture]:
+        """Buffered captures, newest first"""
+        with self._lock:
+            return list(reversed(self._captures))
+
+    def get(self, capture_id: int) -> Optional[ProfileCapture]:
+        with self._lock:
+            return next((capture for capture in self._captures if capture.id == capture_id), None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    # Exit with the lock held so start() sees the thread is gone
+                    self._thread = None
+                    return
+            self._sample()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in sys.path:
+                if prefix and filename.startswith(prefix):
+                    filename = filename[len(prefix):].lstrip(os.sep)
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            labels.append(names.get(ident, str(ident)))
+            stacks.append(";".join(reversed(labels)))
+
+        with self._lock:
+            for capture in self._active:
+                capture.samples += 1
+                capture.stacks.update(stacks)
+
+
+profiler = SamplingProfiler(
+    interval=settings.PROFILER_INTERVAL_MS / 1000.0,
+    buffer_size=settings.PROFILER_BUFFER_SIZE,
+    max_depth=settings.PROFILER_MAX_DEPTH,
+)
+
+
+class ProfilerMiddleware:
+    """Profile requests carrying PROFILER_HEADER, plus a PROFILER_SAMPLE_RATE fraction of all requests"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.header = settings.PROFILER_HEADER.lower().encode()
+
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                # With a token configured, only requests presenting it are profiled on demand
+                if settings.PROFILER_TOKEN is None or value.decode() == settings.PROFILER_TOKEN:
+                    return "header"
+        if settings.PROFILER_SAMPLE_RATE > 0 and random.random() < settings.PROFILER_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        capture = profiler.start(scope["method"], scope["path"], trigger)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                capture.status = message["status"]
+                # Tell the caller which capture to download
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", str(capture.id).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            capture.route = getattr(route, "path_format", None) or getattr(route, "path", None) or ""
+            profiler.stop(capture)
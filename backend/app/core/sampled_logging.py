@@ -0,0 +1,17 @@
+import logging
+import random
+from app.core.config import settings
+
+
+def log_sampled(logger: logging.Logger, level: int, msg: str, *args, rate: float = None):
+    """
+    Log a hot-path message lazily and only for a sample of calls.
+    
+    Arguments are only formatted when the level is enabled and the call is
+    sampled (LOG_SAMPLE_RATE by default), so disabled debug logging costs a
+    level check.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    if random.random() < (settings.LOG_SAMPLE_RATE if rate is None else rate):
+        logger.log(level, msg, *args)
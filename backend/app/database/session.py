@@ -1,12 +1,22 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import instrument_engine
 
 # Create SQLAlchemy engine
 engine = create_engine(
     settings.DATABASE_URL, 
     connect_args={"check_same_thread": False}  # Needed for SQLite
 )
+instrument_engine(engine)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        """SQLite ignores foreign keys (and ON DELETE CASCADE) unless enabled per connection"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
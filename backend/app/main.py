@@ -1,15 +1,49 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.core.admission import AdmissionMiddleware
 from app.core.config import settings
+from app.core.middleware import CompressionMiddleware
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.profiler import ProfilerMiddleware
 from app.api.v1.api_router import api_router
+from app.services.drawing_service import drawing_service
+from app.services.warmup_service import warmup_service
+from app.services.maintenance_service import maintenance_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Drawing edits are buffered per process: refuse to share the database with another worker
+    drawing_service.claim_database()
+    # Edits logged but not yet snapshotted when the process last stopped
+    drawing_service.recover_from_log()
+    # Preload configured symbols in the background; /ready reports when done
+    tasks = [asyncio.create_task(warmup_service.run())]
+    # Purge orphaned drawing rows and compact the database on a schedule
+    if settings.MAINTENANCE_INTERVAL_HOURS > 0:
+        tasks.append(asyncio.create_task(maintenance_service.run_periodically()))
+    yield
+    for task in tasks:
+        task.cancel()
+    # Buffered drawing edits must reach the database before the process exits
+    drawing_service.flush_pending()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
 )
 
+# Shed expensive or over-budget requests before they reach a handler; added
+# first so CORS and metrics still see the 429/503 responses
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
 # Set up CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +53,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (candle pages)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        cache_size=settings.COMPRESSION_CACHE_SIZE,
+    )
+
+# Sample stacks of selected requests; not installed at all unless enabled
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Record per-route latency, payload and SQL metrics; added last so it wraps
+# everything and measures compressed sizes and total time
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -32,12 +85,24 @@ async def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Liveness endpoint (the process is up; see /ready for data availability)"""
     return {"status": "healthy"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 with warm-up progress until preloading has finished"""
+    return JSONResponse(warmup_service.status(), status_code=200 if warmup_service.ready else 503)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
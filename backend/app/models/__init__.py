@@ -2,6 +2,8 @@ from app.models.pair import Pair
 from app.models.drawing import Drawing
 from app.models.series import Series
 from app.models.point import Point
+from app.models.id_sequence import IdSequence
+from app.models.drawing_event import DrawingEvent
 
-__all__ = ["Pair", "Drawing", "Series", "Point"]
+__all__ = ["Pair", "Drawing", "Series", "Point", "IdSequence", "DrawingEvent"]
 
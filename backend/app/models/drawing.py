@@ -19,5 +19,5 @@ class Drawing(Base):
 
     # Relationships
     pair = relationship("Pair", back_populates="drawings")
-    series = relationship("Series", back_populates="drawing", cascade="all, delete-orphan", order_by="Series.order_index")
+    series = relationship("Series", back_populates="drawing", cascade="all, delete-orphan", passive_deletes=True, order_by="[Series.order_index, Series.id]")
 
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.database.base import Base
+
+
+class DrawingEvent(Base):
+    """
+    One entry of a pair's append-only drawing change log.
+    
+    `id` is the log sequence number. The drawings/series tables are the
+    compacted snapshot: they reflect every event up to Pair.snapshot_seq.
+    """
+    __tablename__ = "drawing_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    pair_id = Column(Integer, ForeignKey("pairs.id"), nullable=False)
+    drawing_id = Column(Integer, nullable=True)  # None for pair-wide events; kept after the drawing is deleted
+    op = Column(String, nullable=False)  # create, update, delete, clear
+    data = Column(JSON, nullable=True)  # create: full drawing, update: the fields sent
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_drawing_events_pair_id_id", "pair_id", "id"),
+        # Never reuse sequence numbers, even after the log is truncated
+        {"sqlite_autoincrement": True},
+    )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String
+from app.database.base import Base
+
+
+class IdSequence(Base):
+    """Named id counters for rows without their own table (e.g. packed point ids)"""
+    __tablename__ = "id_sequences"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
@@ -11,6 +11,10 @@ class Pair(Base):
     timeframe = Column(String, nullable=False)
     description = Column(String, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Drawing change log: last sequence number applied to the drawing tables,
+    # and last one removed by truncation
+    snapshot_seq = Column(Integer, default=0, server_default="0", nullable=False)
+    truncated_seq = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Relationships
     drawings = relationship("Drawing", back_populates="pair", cascade="all, delete-orphan")
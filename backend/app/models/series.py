@@ -11,8 +11,10 @@ class Series(Base):
     order_index = Column(Integer, nullable=False, default=0)
     name = Column(String, nullable=True)
     style = Column(JSON, nullable=True)
+    # [[point id, x, y], ...] in order; when set it replaces the series' rows in `points`
+    points_packed = Column(JSON, nullable=True)
 
     # Relationships
     drawing = relationship("Drawing", back_populates="series")
-    points = relationship("Point", back_populates="series", cascade="all, delete-orphan", order_by="Point.order_index")
+    points = relationship("Point", back_populates="series", cascade="all, delete-orphan", passive_deletes=True, order_by="[Point.order_index, Point.id]")
 
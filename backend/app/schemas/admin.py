@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class ProfileSummary(BaseModel):
+    """One buffered request profile"""
+    id: int
+    method: str
+    path: str
+    route: str = Field(..., description="Matched route template (empty when no route matched)")
+    trigger: str = Field(..., description="'header' (requested) or 'sampled'")
+    status: int
+    started_at: float = Field(..., description="Unix time the request started")
+    duration_ms: float
+    samples: int = Field(..., description="Stack samples taken while the request ran")
+
+
+class ProfilesResponse(BaseModel):
+    """Buffered request profiles, newest first"""
+    items: list[ProfileSummary]
+    count: int
+
+
+class MaintenanceReport(BaseModel):
+    """Result of a database maintenance run"""
+    purged: dict[str, int] = Field(..., description="Orphaned rows deleted per table")
+    vacuum: str = Field(..., description="'full', 'incremental' or 'none' (not SQLite)")
+    size_before: Optional[int] = Field(None, description="Database file size in bytes before the run")
+    size_after: Optional[int] = None
+    free_before: Optional[int] = Field(None, description="Bytes of free pages inside the file before the run")
+    free_after: Optional[int] = None
+    reclaimed_bytes: int = 0
+    duration_seconds: float
+    finished_at: float = Field(..., description="Unix time the run finished")
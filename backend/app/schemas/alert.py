@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class AlertBar(BaseModel):
+    """OHLC bar to evaluate against saved drawings"""
+    time: int = Field(..., description="Unix timestamp")
+    open: float
+    high: float
+    low: float
+    close: float
+
+    class Config:
+        from_attributes = True
+
+
+class AlertEvaluateRequest(BaseModel):
+    """Request model for evaluating new bars"""
+    bars: Optional[list[AlertBar]] = Field(None, description="Bars in ascending time order (default: latest stored bar)")
+
+
+class AlertEvent(BaseModel):
+    """A drawing crossed by a bar"""
+    id: int = Field(..., description="Monotonic event id, usable as `since` cursor")
+    pair: str
+    drawing_id: int
+    series_id: int
+    time: int = Field(..., description="Unix timestamp of the bar that crossed the drawing")
+    price: float = Field(..., description="Price of the drawing at the bar time")
+    direction: str = Field(..., description="'up' or 'down'")
+
+    class Config:
+        from_attributes = True
+
+
+class AlertEventsResponse(BaseModel):
+    """Response with alert events"""
+    events: list[AlertEvent]
+    count: int
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class CorrelationMatrixResponse(BaseModel):
+    """Pairwise correlation of returns over a common window"""
+    symbols: list[str]
+    timeframe: str
+    window: int = Field(..., description="Number of aligned returns used")
+    start_time: int = Field(..., description="Unix timestamp of the first return in the window")
+    end_time: int = Field(..., description="Unix timestamp of the last return in the window")
+    matrix: list[list[Optional[float]]] = Field(..., description="Correlations in `symbols` order, 4 decimals (null for flat series)")
+
+
+class RollingCorrelationResponse(BaseModel):
+    """Rolling correlation of one symbol with others"""
+    symbol: str
+    timeframe: str
+    window: int
+    time: list[int] = Field(..., description="Unix timestamp of each window's last return")
+    series: dict[str, list[Optional[float]]] = Field(..., description="Correlation with each symbol, aligned to `time`")
+
+
+class ReturnsResponse(BaseModel):
+    """Log returns on the common time grid of several symbols"""
+    symbols: list[str]
+    timeframe: str
+    time: list[int]
+    returns: dict[str, list[float]]
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, Any
 
@@ -54,3 +55,34 @@ class DrawingsResponse(BaseModel):
     drawings: list[Drawing]
     count: int
 
+
+class DrawingImportResponse(BaseModel):
+    """Result of an NDJSON drawing import"""
+    imported: int = Field(..., description="Drawings created")
+    points: int = Field(..., description="Points created")
+    batches: int = Field(..., description="Transactions committed")
+
+
+class DrawingChange(BaseModel):
+    """One entry of a pair's drawing change log"""
+    seq: int = Field(..., description="Log sequence number (increasing, never reused)")
+    drawing_id: Optional[int] = Field(None, description="Drawing changed (None for pair-wide events)")
+    op: str = Field(..., description="create, update, delete or clear (all drawings of the pair)")
+    data: Optional[dict[str, Any]] = Field(None, description="create: the drawing; update: the fields changed")
+    created_at: Optional[datetime] = None
+
+
+class DrawingChangesResponse(BaseModel):
+    """Delta feed of a pair's drawings"""
+    items: list[DrawingChange]
+    count: int
+    last_seq: int = Field(..., description="Pass as `since` to continue the feed")
+    snapshot_seq: int = Field(..., description="Drawing tables reflect the log up to here")
+    truncated_seq: int = Field(..., description="Events up to here have been truncated")
+    resync_required: bool = Field(..., description="`since` is behind the truncation point; reload all drawings")
+
+
+class LogTruncateResponse(BaseModel):
+    """Result of truncating a pair's change log"""
+    deleted_count: int
+    truncated_seq: int
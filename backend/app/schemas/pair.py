@@ -31,3 +31,78 @@ class CandleQueryParams(BaseModel):
     start_date: Optional[str] = Field(None, description="ISO format start date for initial load")
     end_date: Optional[str] = Field(None, description="ISO format end date for initial load")
 
+
+
+class RangeStats(BaseModel):
+    """Aggregates of the candles with start_time <= time <= end_time"""
+    start_time: int
+    end_time: int
+    drawing_id: Optional[int] = Field(None, description="Drawing the range was taken from")
+    bars: int = Field(..., description="Number of candles in the range")
+    high: Optional[float] = Field(None, description="Highest high (null when the range holds no candles)")
+    high_time: Optional[int] = Field(None, description="Unix timestamp of the highest high")
+    low: Optional[float] = Field(None, description="Lowest low")
+    low_time: Optional[int] = Field(None, description="Unix timestamp of the lowest low")
+    volume: int = Field(0, description="Total tick volume")
+    open: Optional[float] = Field(None, description="Open of the first candle")
+    close: Optional[float] = Field(None, description="Close of the last candle")
+
+    class Config:
+        from_attributes = True
+
+
+class TimeRange(BaseModel):
+    start_time: int = Field(..., description="Unix timestamp (inclusive)")
+    end_time: int = Field(..., description="Unix timestamp (inclusive)")
+
+
+class RangeStatsRequest(BaseModel):
+    """Batch of ranges; drawings contribute the span of their points"""
+    ranges: list[TimeRange] = Field(default_factory=list)
+    drawing_ids: Optional[list[int]] = Field(None, description="Drawings of the pair to add ranges for")
+    all_drawings: bool = Field(False, description="Add a range for every drawing of the pair")
+
+
+class RangeStatsResponse(BaseModel):
+    items: list[RangeStats]
+    count: int
+
+
+class VolumeProfileBin(BaseModel):
+    price_low: float = Field(..., description="Lower edge of the bin")
+    price_high: float = Field(..., description="Upper edge of the bin")
+    volume: float = Field(..., description="Volume traded in the bin (bar volume spread over its high-low range)")
+
+
+class VolumeProfileResponse(BaseModel):
+    """Price-binned volume histogram of a time range"""
+    symbol: str
+    start_time: int
+    end_time: int
+    bars: int = Field(..., description="Number of candles in the range")
+    bin_size: float
+    total_volume: float
+    poc_price: Optional[float] = Field(None, description="Midpoint of the bin with the most volume (point of control)")
+    value_area_low: Optional[float] = Field(None, description="Lower edge of the value area around the POC")
+    value_area_high: Optional[float] = Field(None, description="Upper edge of the value area around the POC")
+    bins: list[VolumeProfileBin]
+    count: int
+
+
+class CandleColumns(BaseModel):
+    """Candles of one symbol as parallel arrays"""
+    count: int = Field(..., description="Number of candles returned")
+    total: int = Field(..., description="Candles in the date range")
+    time: list[int]
+    open: list[float]
+    high: list[float]
+    low: list[float]
+    close: list[float]
+    volume: list[int]
+
+
+class BatchCandlesResponse(BaseModel):
+    """Candles of several symbols in one response"""
+    timeframe: str
+    symbols: dict[str, CandleColumns] = Field(..., description="Columnar candles keyed by symbol")
+    errors: dict[str, str] = Field(default_factory=dict, description="Symbols that could not be loaded")
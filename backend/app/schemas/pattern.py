@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+
+class PatternMatch(BaseModel):
+    """Historical window similar to the query window"""
+    symbol: str
+    start_time: int = Field(..., description="Unix timestamp of the first candle in the window")
+    end_time: int = Field(..., description="Unix timestamp of the last candle in the window")
+    distance: float = Field(..., description="Z-normalized Euclidean distance (0 is identical shape)")
+
+    class Config:
+        from_attributes = True
+
+
+class PatternSearchResponse(BaseModel):
+    """Response with the most similar historical windows"""
+    symbol: str
+    start_time: int
+    end_time: int
+    window: int = Field(..., description="Number of candles in the query window")
+    matches: list[PatternMatch]
+    count: int
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+
+
+class Signal(BaseModel):
+    """Model signal for the latest bar of a symbol"""
+    symbol: str
+    time: int = Field(..., description="Unix timestamp of the last bar scored")
+    score: float = Field(..., description="Signal strength in [-1, 1], positive is bullish")
+    probability_up: float = Field(..., description="Model probability of an up move")
+    model: str = Field(..., description="Name of the model that produced the signal")
+
+    class Config:
+        from_attributes = True
+
+
+class SignalsResponse(BaseModel):
+    """Response with signals for several symbols"""
+    signals: list[Signal]
+    count: int
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from threading import Lock
+from typing import Optional
+from app.core.config import settings
+from app.services.drawing_service import drawing_service
+
+
+logger = logging.getLogger(__name__)
+
+# Drawing types that produce price levels (single point, extends across the chart)
+LEVEL_TYPES = {"hline"}
+# Drawing types whose consecutive points form alertable line segments
+SEGMENT_TYPES = {"line", "trendline", "channel"}
+# Segments longer than this many median durations are checked for every bar
+LONG_SEGMENT_FACTOR = 8
+
+
+@dataclass(frozen=True)
+class Bar:
+    """OHLC bar evaluated against the alert index"""
+    time: int
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    """A drawing crossed by a bar"""
+    id: int
+    pair: str
+    drawing_id: int
+    series_id: int
+    time: int
+    price: float
+    direction: str  # "up" or "down"
+
+
+class AlertIndex:
+    """
+    Compiled, read-only alert index for one pair.
+
+    Horizontal levels are kept in a sorted array so the levels inside a bar's
+    price range are found with two binary searches. Sloped segments are stored
+    as parameter arrays (x0, x1, y0, slope) sorted by start time, so a bar is
+    only tested against segments starting shortly before its timestamp plus
+    the few segments much longer than typical. Memory stays linear in the
+    number of segments whatever their lengths.
+    """
+
+    def __init__(self, levels: list[tuple[float, int, int]], segments: list[tuple[float, float, float, float, int, int]]):
+        levels.sort(key=lambda level: level[0])
+        self.level_prices = np.array([level[0] for level in levels], dtype=np.float64)
+        self.level_drawing_ids = np.array([level[1] for level in levels], dtype=np.int64)
+        self.level_series_ids = np.array([level[2] for level in levels], dtype=np.int64)
+
+        seg = np.array(segments, dtype=np.float64).reshape(-1, 6)
+        self.seg_x0 = seg[:, 0]
+        self.seg_x1 = seg[:, 1]
+        self.seg_y0 = seg[:, 2]
+        self.seg_slope = seg[:, 3]
+        self.seg_drawing_ids = seg[:, 4].astype(np.int64)
+        self.seg_series_ids = seg[:, 5].astype(np.int64)
+        self._build_segment_lookup()
+
+    def _build_segment_lookup(self):
+        """Sort short segments by start time and set long ones aside"""
+        durations = self.seg_x1 - self.seg_x0
+        threshold = float(np.median(durations)) * LONG_SEGMENT_FACTOR if len(durations) else 0.0
+        is_long = durations > threshold
+        # A few far-reaching trendlines would otherwise widen the window searched for every bar
+        self.long_segments = np.flatnonzero(is_long)
+        short = np.flatnonzero(~is_long)
+        self.short_segments = short[np.argsort(self.seg_x0[short], kind="stable")]
+        self.short_x0 = self.seg_x0[self.short_segments]
+        self.max_short_duration = float(durations[short].max()) if len(short) else 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.level_prices) + len(self.seg_x0)
+
+    def _segments_at(self, t: float) -> np.ndarray:
+        # Short segments active at t start at most max_short_duration before it
+        lo = np.searchsorted(self.short_x0, t - self.max_short_duration, side="left")
+        hi = np.searchsorted(self.short_x0, t, side="right")
+        candidates = np.concatenate((self.short_segments[lo:hi], self.long_segments))
+        active = (self.seg_x0[candidates] <= t) & (self.seg_x1[candidates] >= t)
+        return candidates[active]
+
+    def evaluate(self, bar: Bar, reference: float) -> list[tuple[int, int, float, str]]:
+        """
+        Find drawings crossed by a bar.
+
+        `reference` is the previous close (or the bar's open), so gaps between
+        bars count as crossings too.
+
+        Returns:
+            list: (drawing_id, series_id, price, direction) tuples
+        """
+        low = min(bar.low, reference)
+        high = max(bar.high, reference)
+        hits = []
+
+        lo = np.searchsorted(self.level_prices, low, side="left")
+        hi = np.searchsorted(self.level_prices, high, side="right")
+        for i in range(lo, hi):
+            price = float(self.level_prices[i])
+            if price == reference:
+                continue
+            direction = "up" if price > reference else "down"
+            hits.append((int(self.level_drawing_ids[i]), int(self.level_series_ids[i]), price, direction))
+
+        candidates = self._segments_at(bar.time)
+        if len(candidates):
+            prices = self.seg_y0[candidates] + self.seg_slope[candidates] * (bar.time - self.seg_x0[candidates])
+            crossed = (prices >= low) & (prices <= high) & (prices != reference)
+            for i, price in zip(candidates[crossed], prices[crossed]):
+                direction = "up" if price > reference else "down"
+                hits.append((int(self.seg_drawing_ids[i]), int(self.seg_series_ids[i]), float(price), direction))
+
+        return hits
+
+
+class AlertService:
+    """Service for evaluating bars against the saved drawings of each pair"""
+
+    def __init__(self):
+        self._indexes: dict[str, AlertIndex] = {}
+        self._generation = 0
+        self._events: dict[str, deque] = {}
+        # Evaluation cursor per pair: (time, close) of the last bar evaluated
+        self._cursors: dict[str, tuple[int, float]] = {}
+        self._next_event_id = 1
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = Lock()
+        drawing_service.add_change_listener(self.invalidate)
+
+    def invalidate(self, pair: Optional[str] = None):
+        """Drop compiled indexes so they are rebuilt from the database on next use"""
+        with self._lock:
+            self._generation += 1
+            if pair is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(pair.upper(), None)
+
+    def compile_index(self, pair: str) -> AlertIndex:
+        """Compile the alert index of a pair from a lean read of its series points"""
+        series_points = drawing_service.get_series_points(
+            pair, types=LEVEL_TYPES | SEGMENT_TYPES, complete_only=True
+        )
+
+        levels = []
+        segments = []
+        for drawing_id, drawing_type, series_id, points in series_points:
+            if drawing_type in LEVEL_TYPES:
+                levels.extend((y, drawing_id, series_id) for _, y in points)
+                continue
+            for (xa, ya), (xb, yb) in zip(points, points[1:]):
+                if xa == xb:
+                    continue
+                (x0, y0), (x1, y1) = sorted([(xa, ya), (xb, yb)])
+                segments.append((x0, x1, y0, (y1 - y0) / (x1 - x0), drawing_id, series_id))
+
+        return AlertIndex(levels, segments)
+
+    def get_index(self, pair: str) -> AlertIndex:
+        pair = pair.upper()
+        index = self._indexes.get(pair)
+        if index is None:
+            generation = self._generation
+            index = self.compile_index(pair)
+            with self._lock:
+                # Don't cache an index that an invalidation raced with
+                if generation == self._generation:
+                    self._indexes[pair] = index
+        return index
+
+    def evaluate_bars(self, pair: str, bars: list[Bar]) -> list[AlertEvent]:
+        """
+        Evaluate new bars (ascending by time) and record triggered events.
+        
+        Bars at or before the pair's last evaluated bar are skipped, so
+        evaluating the same bar again fires nothing. Each bar's crossings are
+        measured from the previous evaluated close.
+        """
+        pair = pair.upper()
+        with self._lock:
+            # Claim the bars before evaluating them, so concurrent calls can't both fire them
+            cursor = self._cursors.get(pair)
+            new_bars = []
+            for bar in bars:
+                if cursor is None or bar.time > cursor[0]:
+                    new_bars.append((bar, bar.open if cursor is None else cursor[1]))
+                    cursor = (bar.time, bar.close)
+            if not new_bars:
+                return []
+            self._cursors[pair] = cursor
+        
+        index = self.get_index(pair)
+        events = []
+        for bar, reference in new_bars:
+            for drawing_id, series_id, price, direction in index.evaluate(bar, reference):
+                with self._lock:
+                    event_id = self._next_event_id
+                    self._next_event_id += 1
+                events.append(AlertEvent(
+                    id=event_id,
+                    pair=pair,
+                    drawing_id=drawing_id,
+                    series_id=series_id,
+                    time=bar.time,
+                    price=price,
+                    direction=direction,
+                ))
+
+        if events:
+            self._record(pair, events)
+        return events
+
+    def get_events(self, pair: str, since: Optional[int] = None) -> list[AlertEvent]:
+        """Get buffered events of a pair, optionally only those after an event id"""
+        buffer = self._events.get(pair.upper(), ())
+        return [event for event in buffer if since is None or event.id > since]
+
+    def subscribe(self, pair: str) -> asyncio.Queue:
+        """Subscribe the running event loop to new events of a pair"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.ALERT_EVENT_BUFFER_SIZE)
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(pair.upper(), set()).add(entry)
+        return queue
+
+    def unsubscribe(self, pair: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(pair.upper(), set())
+            for entry in [entry for entry in subscribers if entry[1] is queue]:
+                subscribers.discard(entry)
+
+    def _record(self, pair: str, events: list[AlertEvent]):
+        with self._lock:
+            buffer = self._events.setdefault(pair, deque(maxlen=settings.ALERT_EVENT_BUFFER_SIZE))
+            buffer.extend(events)
+            subscribers = list(self._subscribers.get(pair, ()))
+        for loop, queue in subscribers:
+            for event in events:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+        logger.debug("Recorded %d alert events for %s", len(events), pair)
+
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: AlertEvent):
+        # Slow consumers drop events rather than growing without bound
+        if not queue.full():
+            queue.put_nowait(event)
+
+
+# Singleton instance
+alert_service = AlertService()
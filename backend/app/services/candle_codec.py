@@ -0,0 +1,296 @@
+"""
+Compact block format for candle and tick history.
+
+Prices are quantized to integers at a per-symbol number of decimals (e.g.
+1.10761 -> 110761 at 5 decimals) and stored as small deltas:
+
+- candles: close as deltas to the previous close, open relative to the
+  previous close, high/low relative to max/min(open, close)
+- ticks: each price column as deltas to its previous value
+
+Timestamps on a fixed interval are stored as (start, step) only, otherwise as
+deltas. Integer streams are zigzag-mapped to unsigned (small magnitudes ->
+small values), narrowed to the smallest dtype that holds them and
+byte-shuffled (all low bytes, then all high bytes) before each block is
+zlib-compressed, so decoding is one decompress plus a few cumsums into
+NumPy arrays.
+
+File layout: b"CNDL" | u8 format version | u32 block count | blocks,
+where each block is u32 meta length | JSON meta | u32 payload length | payload.
+"""
+import json
+import logging
+import struct
+import zlib
+import numpy as np
+from typing import Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CNDL"
+FORMAT_VERSION = 1
+BLOCK_ROWS = 65536
+MAX_DECIMALS = 8
+
+_UINT_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+_PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+def _fits(decimals: int, columns: Sequence[np.ndarray]) -> bool:
+    scale = 10.0 ** decimals
+    return all(np.array_equal(np.round(column * scale) / scale, column) for column in columns)
+
+
+def detect_decimals(*columns: np.ndarray) -> Optional[int]:
+    """Smallest number of decimals at which all prices round-trip exactly (None if none do)"""
+    for decimals in range(MAX_DECIMALS + 1):
+        if _fits(decimals, columns):
+            return decimals
+    return None
+
+
+def _lossless_decimals(decimals: Optional[int], *columns: np.ndarray) -> Optional[int]:
+    """
+    `decimals` when every price round-trips at it, otherwise the detected
+    precision (None = raw float64): a configured precision never drops digits.
+    """
+    if decimals is None:
+        return detect_decimals(*columns)
+    if _fits(decimals, columns):
+        return decimals
+    detected = detect_decimals(*columns)
+    logger.warning(
+        "Prices have more than %d decimals; encoding them with %s instead",
+        decimals, "raw floats" if detected is None else f"{detected} decimals"
+    )
+    return detected
+
+
+def _narrow(values: np.ndarray) -> np.ndarray:
+    """Zigzag-map integers to unsigned and cast to the smallest dtype holding them"""
+    values = values.astype(np.int64)
+    zigzag = ((values << 1) ^ (values >> 63)).view(np.uint64)
+    top = int(zigzag.max()) if len(zigzag) else 0
+    for dtype in _UINT_DTYPES:
+        if top <= np.iinfo(dtype).max:
+            return zigzag.astype(dtype)
+    return zigzag
+
+
+def _widen(values: np.ndarray) -> np.ndarray:
+    """Inverse of `_narrow` (float streams pass through)"""
+    if values.dtype.kind != "u":
+        return values
+    values = values.astype(np.uint64)
+    return ((values >> np.uint64(1)).view(np.int64)) ^ -(values & np.uint64(1)).view(np.int64)
+
+
+def _shuffle(values: np.ndarray) -> bytes:
+    return values.view(np.uint8).reshape(-1, values.itemsize).T.tobytes()
+
+
+def _unshuffle(payload: bytes, dtype: np.dtype, count: int, offset: int) -> np.ndarray:
+    planes = np.frombuffer(payload, dtype=np.uint8, count=count * dtype.itemsize, offset=offset)
+    return np.ascontiguousarray(planes.reshape(dtype.itemsize, count).T).view(dtype).ravel()
+
+
+def _encode_time(time: np.ndarray, meta: dict, streams: list):
+    time = time.astype(np.int64)
+    meta["time0"] = int(time[0]) if len(time) else 0
+    diffs = np.diff(time)
+    if len(diffs) and np.all(diffs == diffs[0]):
+        meta["time_step"] = int(diffs[0])
+    else:
+        streams.append(("time", _narrow(diffs)))
+
+
+def _decode_time(meta: dict, streams: dict, n: int) -> np.ndarray:
+    if "time_step" in meta:
+        return meta["time0"] + np.arange(n, dtype=np.int64) * meta["time_step"]
+    time = np.empty(n, dtype=np.int64)
+    if n:
+        time[0] = meta["time0"]
+        np.cumsum(streams["time"], dtype=np.int64, out=time[1:])
+        time[1:] += meta["time0"]
+    return time
+
+
+def _pack_block(meta: dict, streams: list[tuple[str, np.ndarray]], level: int) -> bytes:
+    meta["streams"] = [[name, values.dtype.str, len(values)] for name, values in streams]
+    payload = zlib.compress(b"".join(_shuffle(values) for _, values in streams), level)
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+    return struct.pack("<I", len(meta_bytes)) + meta_bytes + struct.pack("<I", len(payload)) + payload
+
+
+def _unpack_block(buffer: memoryview, offset: int) -> tuple[dict, dict, int]:
+    (meta_len,) = struct.unpack_from("<I", buffer, offset)
+    offset += 4
+    meta = json.loads(bytes(buffer[offset:offset + meta_len]))
+    offset += meta_len
+    (payload_len,) = struct.unpack_from("<I", buffer, offset)
+    offset += 4
+    payload = zlib.decompress(buffer[offset:offset + payload_len])
+    offset += payload_len
+
+    streams = {}
+    position = 0
+    for name, dtype, count in meta["streams"]:
+        dtype = np.dtype(dtype)
+        streams[name] = _widen(_unshuffle(payload, dtype, count, position))
+        position += dtype.itemsize * count
+    return meta, streams, offset
+
+
+def _write_file(blocks: list[bytes]) -> bytes:
+    return MAGIC + struct.pack("<BI", FORMAT_VERSION, len(blocks)) + b"".join(blocks)
+
+
+def _read_blocks(data: bytes):
+    buffer = memoryview(data)
+    if bytes(buffer[:4]) != MAGIC:
+        raise ValueError("Not a compact candle file")
+    version, n_blocks = struct.unpack_from("<BI", buffer, 4)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact candle format version {version}")
+    offset = 9
+    for _ in range(n_blocks):
+        meta, streams, offset = _unpack_block(buffer, offset)
+        yield meta, streams
+
+
+# =============================================================================
+# CANDLES
+# =============================================================================
+
+def encode_candles(columns: Sequence[np.ndarray], decimals: Optional[int] = None, level: int = 6) -> bytes:
+    """
+    Encode candles (ascending by time) into the compact format.
+
+    `columns` are (time, open, high, low, close, volume) arrays, e.g. a
+    CandleArrays. Without `decimals` the precision is detected from the data;
+    prices that don't fit any fixed precision are stored as raw float64. A
+    `decimals` the prices don't fit in is raised the same way, so decoding
+    always returns the prices that were encoded.
+    """
+    time, o, h, l, c, volume = columns
+    decimals = _lossless_decimals(decimals, o, h, l, c)
+
+    blocks = []
+    for start in range(0, max(len(time), 1), BLOCK_ROWS):
+        end = start + BLOCK_ROWS
+        n = len(time[start:end])
+        meta = {"kind": "candles", "rows": n}
+        streams = []
+        _encode_time(time[start:end], meta, streams)
+
+        if decimals is None or n == 0:
+            meta["decimals"] = None
+            streams += [(name, values[start:end].astype(np.float64)) for name, values in zip(_PRICE_FIELDS, (o, h, l, c))]
+        else:
+            scale = 10.0 ** decimals
+            qo, qh, ql, qc = (np.round(values[start:end] * scale).astype(np.int64) for values in (o, h, l, c))
+            prev_close = np.concatenate((qc[:1], qc[:-1]))
+            meta["decimals"] = decimals
+            meta["close0"] = int(qc[0])
+            streams += [
+                ("close", _narrow(np.diff(qc))),
+                ("open", _narrow(qo - prev_close)),
+                ("high", _narrow(qh - np.maximum(qo, qc))),
+                ("low", _narrow(np.minimum(qo, qc) - ql)),
+            ]
+        streams.append(("volume", _narrow(volume[start:end].astype(np.int64))))
+        blocks.append(_pack_block(meta, streams, level))
+    return _write_file(blocks)
+
+
+def decode_candles(data: bytes) -> tuple[np.ndarray, ...]:
+    """Decode a compact candle file into (time, open, high, low, close, volume) arrays"""
+    parts = []
+    for meta, streams in _read_blocks(data):
+        n = meta["rows"]
+        time = _decode_time(meta, streams, n)
+        if meta["decimals"] is None:
+            o, h, l, c = (streams[name].astype(np.float64) for name in _PRICE_FIELDS)
+        else:
+            c = np.empty(n, dtype=np.int64)
+            if n:
+                c[0] = meta["close0"]
+                np.cumsum(streams["close"], dtype=np.int64, out=c[1:])
+                c[1:] += meta["close0"]
+            o = np.concatenate((c[:1], c[:-1])) + streams["open"]
+            h = np.maximum(o, c) + streams["high"]
+            l = np.minimum(o, c) - streams["low"]
+            scale = 10.0 ** meta["decimals"]
+            o, h, l, c = (values / scale for values in (o, h, l, c))
+        parts.append((time, o, h, l, c, streams["volume"].astype(np.int64)))
+
+    if len(parts) == 1:
+        return parts[0]
+    return tuple(np.concatenate(columns) for columns in zip(*parts))
+
+
+# =============================================================================
+# TICKS
+# =============================================================================
+
+def encode_ticks(
+    time: np.ndarray,
+    prices: dict[str, np.ndarray],
+    volume: Optional[np.ndarray] = None,
+    decimals: Optional[int] = None,
+    level: int = 6,
+) -> bytes:
+    """
+    Encode tick history (e.g. millisecond times with bid/ask columns).
+
+    Price columns are delta-coded independently; irregular timestamps are
+    delta-coded, so a tick every few milliseconds costs a byte or two.
+    Precision is chosen as for `encode_candles`.
+    """
+    decimals = _lossless_decimals(decimals, *prices.values())
+
+    blocks = []
+    for start in range(0, max(len(time), 1), BLOCK_ROWS):
+        end = start + BLOCK_ROWS
+        meta = {"kind": "ticks", "rows": len(time[start:end]), "decimals": decimals, "prices": list(prices), "first": {}}
+        streams = []
+        _encode_time(time[start:end], meta, streams)
+        for name, values in prices.items():
+            values = values[start:end]
+            if decimals is None or len(values) == 0:
+                streams.append((name, values.astype(np.float64)))
+            else:
+                q = np.round(values * 10.0 ** decimals).astype(np.int64)
+                meta["first"][name] = int(q[0])
+                streams.append((name, _narrow(np.diff(q))))
+        if volume is not None:
+            streams.append(("volume", _narrow(volume[start:end].astype(np.int64))))
+        blocks.append(_pack_block(meta, streams, level))
+    return _write_file(blocks)
+
+
+def decode_ticks(data: bytes) -> tuple[np.ndarray, dict[str, np.ndarray], Optional[np.ndarray]]:
+    """Decode a compact tick file into (time, prices, volume)"""
+    times, prices, volumes = [], {}, []
+    for meta, streams in _read_blocks(data):
+        n = meta["rows"]
+        times.append(_decode_time(meta, streams, n))
+        for name in meta["prices"]:
+            if meta["decimals"] is None or n == 0:
+                values = streams[name].astype(np.float64)
+            else:
+                q = np.empty(n, dtype=np.int64)
+                q[0] = meta["first"][name]
+                np.cumsum(streams[name], dtype=np.int64, out=q[1:])
+                q[1:] += q[0]
+                values = q / 10.0 ** meta["decimals"]
+            prices.setdefault(name, []).append(values)
+        if "volume" in streams:
+            volumes.append(streams["volume"].astype(np.int64))
+
+    return (
+        np.concatenate(times) if times else np.zeros(0, dtype=np.int64),
+        {name: np.concatenate(parts) for name, parts in prices.items()},
+        np.concatenate(volumes) if volumes else None,
+    )
@@ -0,0 +1,255 @@
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import NamedTuple, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.services import candle_codec
+
+
+class CandleArrays(NamedTuple):
+    """Columnar view of a symbol's candles (ascending by time)"""
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def slice(self, start: int, end: int) -> "CandleArrays":
+        return CandleArrays(*(column[start:end] for column in self))
+
+    @classmethod
+    def empty(cls) -> "CandleArrays":
+        return cls(
+            np.zeros(0, dtype=np.int64),
+            *(np.zeros(0, dtype=np.float64) for _ in range(4)),
+            np.zeros(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def concat(cls, parts: list["CandleArrays"]) -> "CandleArrays":
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(*(np.concatenate(columns) for columns in zip(*parts)))
+
+
+class Partition(NamedTuple):
+    """Manifest entry of one time partition"""
+    key: str
+    file: str
+    start: int
+    end: int
+    rows: int
+
+
+class Manifest(NamedTuple):
+    symbol: str
+    timeframe: str
+    version: int
+    partitions: list[Partition]
+
+    @property
+    def rows(self) -> int:
+        return sum(partition.rows for partition in self.partitions)
+
+
+def partition_keys(time: np.ndarray) -> np.ndarray:
+    """Monthly partition key (YYYY-MM, UTC) of each timestamp"""
+    return time.astype("datetime64[s]").astype("datetime64[M]").astype(str)
+
+
+class CandleStore:
+    """
+    On-disk candle store split into monthly partitions.
+
+    Layout: DATA_DIR/{SYMBOL}/{timeframe}/manifest.json plus one file per
+    month. The manifest lists each partition's time bounds and row count, so
+    readers can pick the partitions overlapping a request without opening
+    them.
+
+    Partitions are written in the compact format of `candle_codec` (.cnd);
+    .npz partitions written before it remain readable. Loaded partitions are
+    cached twice: a small LRU of decoded arrays for hot partitions and a
+    larger one of compact bytes, which are ~10x smaller and decode in a
+    fraction of a disk read.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(
+        self,
+        root: Path,
+        cache_size: int = 48,
+        encoded_cache_size: int = 512,
+        file_format: str = "compact",
+        price_decimals: Optional[dict[str, int]] = None,
+    ):
+        if file_format not in ("compact", "npz"):
+            raise ValueError(f"Unknown candle store format: {file_format}")
+        self.root = Path(root)
+        self.file_format = file_format
+        self.price_decimals = {symbol.upper(): decimals for symbol, decimals in (price_decimals or {}).items()}
+        self._partition_cache = LRUCache(cache_size)
+        self._encoded_cache = LRUCache(encoded_cache_size)
+        # (symbol, timeframe) -> ((manifest mtime_ns, inode), Manifest)
+        self._manifests: dict[tuple[str, str], tuple[tuple[int, int], Manifest]] = {}
+
+    def _dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol.upper() / timeframe
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        return (self._dir(symbol, timeframe) / self.MANIFEST).exists()
+
+    def list_symbols(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            path.name for path in self.root.iterdir()
+            if path.is_dir() and any((tf / self.MANIFEST).exists() for tf in path.iterdir() if tf.is_dir())
+        )
+
+    def list_timeframes(self, symbol: str) -> list[str]:
+        path = self.root / symbol.upper()
+        if not path.exists():
+            return []
+        return sorted(tf.name for tf in path.iterdir() if (tf / self.MANIFEST).exists())
+
+    def get_manifest(self, symbol: str, timeframe: str) -> Manifest:
+        """Read a manifest, re-reading it only when the file changed on disk"""
+        path = self._dir(symbol, timeframe) / self.MANIFEST
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No stored candles for {symbol.upper()} {timeframe}")
+        # Manifests are replaced, not rewritten, so a new inode catches writes within the mtime resolution
+        file_id = (stat.st_mtime_ns, stat.st_ino)
+
+        key = (symbol.upper(), timeframe)
+        cached = self._manifests.get(key)
+        if cached is not None and cached[0] == file_id:
+            return cached[1]
+
+        raw = json.loads(path.read_text())
+        manifest = Manifest(
+            symbol=raw["symbol"],
+            timeframe=raw["timeframe"],
+            version=int(raw["version"]),
+            partitions=[Partition(**partition) for partition in raw["partitions"]],
+        )
+        self._manifests[key] = (file_id, manifest)
+        return manifest
+
+    def load_partition(self, symbol: str, timeframe: str, partition: Partition) -> CandleArrays:
+        """Load one partition, serving hot partitions from memory"""
+        # File names change whenever a partition is rewritten
+        cache_key = (symbol.upper(), timeframe, partition.file)
+        arrays = self._partition_cache.get(cache_key)
+        record_cache("candle_partitions", hit=arrays is not None)
+        if arrays is not None:
+            return arrays
+
+        path = self._dir(symbol, timeframe) / partition.file
+        if path.suffix == ".npz":
+            with np.load(path) as data:
+                arrays = CandleArrays(*(data[name] for name in CandleArrays._fields))
+        else:
+            encoded = self._encoded_cache.get(cache_key)
+            record_cache("candle_partitions_encoded", hit=encoded is not None)
+            if encoded is None:
+                encoded = path.read_bytes()
+                self._encoded_cache.set(cache_key, encoded)
+            arrays = CandleArrays(*candle_codec.decode_candles(encoded))
+        self._partition_cache.set(cache_key, arrays)
+        return arrays
+
+    def load_range(self, symbol: str, timeframe: str, start: Optional[int] = None, end: Optional[int] = None) -> CandleArrays:
+        """Load candles with start <= time <= end from the overlapping partitions only"""
+        manifest = self.get_manifest(symbol, timeframe)
+        parts = []
+        for partition in manifest.partitions:
+            if (start is not None and partition.end < start) or (end is not None and partition.start > end):
+                continue
+            arrays = self.load_partition(symbol, timeframe, partition)
+            lo = 0 if start is None else int(np.searchsorted(arrays.time, start, side="left"))
+            hi = len(arrays) if end is None else int(np.searchsorted(arrays.time, end, side="right"))
+            parts.append(arrays.slice(lo, hi))
+        return CandleArrays.concat(parts)
+
+    def write(self, symbol: str, timeframe: str, arrays: CandleArrays) -> Optional[Manifest]:
+        """
+        Write candles (ascending, unique times) into their monthly partitions.
+
+        Every month present in `arrays` is replaced as a whole; other existing
+        partitions are kept. Partition files are written before the manifest,
+        which is swapped in atomically.
+        """
+        directory = self._dir(symbol, timeframe)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        existing = {}
+        version = 0
+        if self.has(symbol, timeframe):
+            manifest = self.get_manifest(symbol, timeframe)
+            existing = {partition.key: partition for partition in manifest.partitions}
+            version = manifest.version
+
+        version += 1
+        if len(arrays) == 0:
+            return self.get_manifest(symbol, timeframe) if existing else None
+        keys = partition_keys(arrays.time)
+        boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        for lo, hi in zip(np.concatenate(([0], boundaries)), np.concatenate((boundaries, [len(keys)]))):
+            part = arrays.slice(lo, hi)
+            key = str(keys[lo])
+            if self.file_format == "npz":
+                filename = f"{key}.v{version}.npz"
+                np.savez(directory / filename, **part._asdict())
+            else:
+                filename = f"{key}.v{version}.cnd"
+                (directory / filename).write_bytes(
+                    candle_codec.encode_candles(part, decimals=self.price_decimals.get(symbol.upper()))
+                )
+            existing[key] = Partition(
+                key=key, file=filename, start=int(part.time[0]), end=int(part.time[-1]), rows=len(part)
+            )
+
+        manifest = Manifest(
+            symbol=symbol.upper(),
+            timeframe=timeframe,
+            version=version,
+            partitions=sorted(existing.values(), key=lambda partition: partition.start),
+        )
+        tmp = directory / f"{self.MANIFEST}.tmp"
+        tmp.write_text(json.dumps({
+            "symbol": manifest.symbol,
+            "timeframe": manifest.timeframe,
+            "version": manifest.version,
+            "partitions": [partition._asdict() for partition in manifest.partitions],
+        }, indent=1))
+        os.replace(tmp, directory / self.MANIFEST)
+
+        # Remove partition files no longer referenced by the manifest
+        referenced = {partition.file for partition in manifest.partitions}
+        for path in directory.iterdir():
+            if path.name != self.MANIFEST and path.name not in referenced:
+                path.unlink()
+        return manifest
+
+
+# Singleton instance
+candle_store = CandleStore(
+    settings.DATA_DIR,
+    cache_size=settings.CANDLE_PARTITION_CACHE_SIZE,
+    encoded_cache_size=settings.CANDLE_ENCODED_CACHE_SIZE,
+    file_format=settings.CANDLE_STORE_FORMAT,
+    price_decimals=settings.PRICE_DECIMALS,
+)
@@ -0,0 +1,133 @@
+import numpy as np
+from dataclasses import dataclass
+from functools import reduce
+from typing import Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.services.data_service import data_service
+
+
+@dataclass
+class AlignedReturns:
+    """Log returns of several symbols on their common time grid"""
+    symbols: list[str]
+    time: np.ndarray  # Bar time of each return (the later bar of the pair)
+    returns: np.ndarray  # (len(time), len(symbols))
+
+
+def _rolling_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sums over each trailing `window` rows (column-wise)"""
+    cumulative = np.concatenate((np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)))
+    return cumulative[window:] - cumulative[:-window]
+
+
+class CorrelationService:
+    """Service for cross-symbol returns and correlation matrices"""
+
+    def __init__(self):
+        self._aligned_cache = LRUCache(settings.ANALYTICS_CACHE_SIZE)
+
+    def _check(self, symbols: list[str], bars: int):
+        if not symbols:
+            raise ValueError("symbols must contain at least one symbol")
+        if len(symbols) > settings.ANALYTICS_MAX_SYMBOLS:
+            raise ValueError(f"At most {settings.ANALYTICS_MAX_SYMBOLS} symbols per request")
+        if bars < 2 or bars > settings.ANALYTICS_MAX_BARS:
+            raise ValueError(f"bars must be between 2 and {settings.ANALYTICS_MAX_BARS}")
+
+    def get_aligned(self, symbols: list[str], timeframe: Optional[str] = None, bars: int = 1000) -> AlignedReturns:
+        """
+        Get the last `bars` log returns of each symbol on the time grid they all share.
+
+        Aligned matrices are cached per (symbol set, timeframe, bars) and
+        reused until any symbol's data version changes.
+        """
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        self._check(symbols, bars)
+        ordered = sorted(set(symbols))
+        versions = tuple(data_service.get_data_version(symbol, timeframe) for symbol in ordered)
+        key = (tuple(ordered), timeframe, bars)
+
+        cached = self._aligned_cache.get(key)
+        record_cache("aligned_returns", hit=cached is not None and cached[0] == versions)
+        if cached is not None and cached[0] == versions:
+            aligned = cached[1]
+        else:
+            arrays = [data_service.get_arrays(symbol, timeframe) for symbol in ordered]
+            grid = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), (a.time for a in arrays))
+            grid = grid[-(bars + 1):]
+            if len(grid) < 2:
+                raise ValueError(f"{', '.join(ordered)} share fewer than 2 bars on {timeframe}")
+
+            closes = np.empty((len(grid), len(ordered)))
+            for column, a in enumerate(arrays):
+                closes[:, column] = a.close[np.searchsorted(a.time, grid)]
+            aligned = AlignedReturns(symbols=ordered, time=grid[1:], returns=np.diff(np.log(closes), axis=0))
+            self._aligned_cache.set(key, (versions, aligned))
+
+        # Cached matrices are in sorted order; present them in the caller's order
+        if ordered == symbols:
+            return aligned
+        columns = [ordered.index(symbol) for symbol in symbols]
+        return AlignedReturns(symbols=list(symbols), time=aligned.time, returns=aligned.returns[:, columns])
+
+    def correlation_matrix(
+        self,
+        symbols: list[str],
+        timeframe: Optional[str] = None,
+        window: int = 500
+    ) -> tuple[AlignedReturns, np.ndarray]:
+        """
+        Pearson correlation of the last `window` aligned returns of every symbol pair.
+
+        Returns:
+            tuple: (aligned returns used, (n, n) correlation matrix; NaN where a series is flat)
+        """
+        aligned = self.get_aligned(symbols, timeframe, window)
+        returns = aligned.returns - aligned.returns.mean(axis=0)
+        norms = np.sqrt((returns * returns).sum(axis=0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (returns.T @ returns) / np.outer(norms, norms)
+        np.fill_diagonal(corr, 1.0)
+        return aligned, np.clip(corr, -1.0, 1.0)
+
+    def rolling_correlation(
+        self,
+        symbol: str,
+        against: list[str],
+        timeframe: Optional[str] = None,
+        window: int = 96,
+        bars: int = 1000
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Rolling correlation of `symbol`'s returns with each of `against` over
+        trailing `window`-return windows, for all pairs at once via cumulative sums.
+
+        Returns:
+            tuple: (window end times, (len(times), len(against)) correlations)
+        """
+        if window < 2 or window > bars:
+            raise ValueError("window must be at least 2 and at most bars")
+        against = [other for other in against if other != symbol]
+        if not against:
+            raise ValueError("against must contain at least one other symbol")
+        aligned = self.get_aligned([symbol] + against, timeframe, bars)
+        if len(aligned.time) < window:
+            raise ValueError(f"Only {len(aligned.time)} aligned returns; need {window}")
+
+        x = aligned.returns[:, :1]
+        y = aligned.returns[:, 1:]
+        n = float(window)
+        sx = _rolling_sums(x, window)
+        sy = _rolling_sums(y, window)
+        sxx = _rolling_sums(x * x, window)
+        syy = _rolling_sums(y * y, window)
+        sxy = _rolling_sums(x * y, window)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (n * sxy - sx * sy) / np.sqrt((n * sxx - sx * sx) * (n * syy - sy * sy))
+        return aligned.time[window - 1:], np.clip(corr, -1.0, 1.0)
+
+
+# Singleton instance
+correlation_service = CorrelationService()
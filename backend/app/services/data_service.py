@@ -1,29 +1,75 @@
-import pandas as pd
-from pathlib import Path
+import numpy as np
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.core.metrics import record_cache
 from app.schemas.pair import CandleData
+from app.services.candle_store import CandleArrays, candle_store
+from app.services.derived_bars import ChartSpec, derive
+from app.services.range_index import RangeIndex, RangeStats
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class _Chunk(NamedTuple):
+    """Time-bounded slice of a symbol's history that can be loaded on demand"""
+    start: int
+    end: int
+    rows: int
+    load: Callable[[], CandleArrays]
+
+
+def _to_timestamp(date: str) -> int:
+    return int(datetime.fromisoformat(date.replace('Z', '+00:00')).timestamp())
+
+
+def arrays_to_candles(arrays: CandleArrays) -> list[CandleData]:
+    """Convert columnar candles to CandleData models"""
+    return [
+        CandleData(time=t, open=o, high=h, low=l, close=c, volume=v)
+        for t, o, h, l, c, v in zip(
+            arrays.time.tolist(),
+            arrays.open.tolist(),
+            arrays.high.tolist(),
+            arrays.low.tolist(),
+            arrays.close.tolist(),
+            arrays.volume.tolist(),
+        )
+    ]
 
 
 class DataService:
-    """Service for loading and managing CSV trading data"""
+    """Service for loading and managing trading data (partitioned store, CSV fallback)"""
     
     def __init__(self):
         self._data_cache = {}
-        
-    def load_csv_data(self, symbol: str) -> pd.DataFrame:
-        """Load CSV data and cache it in memory"""
-        if symbol in self._data_cache:
-            return self._data_cache[symbol]
-        
-        # For now, we only have EURUSD data
+        # Full histories are large; keep the most recently used symbols only
+        self._array_cache = LRUCache(settings.CANDLE_ARRAY_CACHE_SIZE)
+        self._range_index_cache = LRUCache(settings.CANDLE_ARRAY_CACHE_SIZE)
+        self._derived_cache = LRUCache(settings.DERIVED_CHART_CACHE_SIZE)
+        self._data_versions = {}
+    
+    def load_csv_data(self, symbol: str) -> "pd.DataFrame":
+        """Load CSV data and cache it in memory (reloaded when the file changes)"""
+        # The bundled CSV only holds one symbol
         csv_path = settings.CSV_FILE_PATH
         
+        if symbol != settings.CSV_SYMBOL:
+            raise FileNotFoundError(f"No data for symbol {symbol}")
         if not csv_path.exists():
             raise FileNotFoundError(f"CSV file not found: {csv_path}")
         
-        # Load CSV
+        stat = csv_path.stat()
+        version = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        if symbol in self._data_cache and self._data_versions.get((symbol, settings.CSV_TIMEFRAME)) == version:
+            record_cache("candle_frames", hit=True)
+            return self._data_cache[symbol]
+        record_cache("candle_frames", hit=False)
+        
+        # Load CSV (pandas is imported here so only the CSV fallback pays for it)
+        import pandas as pd
         df = pd.read_csv(csv_path)
         
         # Ensure time column is integer (unix timestamp)
@@ -41,9 +87,223 @@ class DataService:
         
         # Cache the data
         self._data_cache[symbol] = df
+        self._data_versions[(symbol, settings.CSV_TIMEFRAME)] = version
         
         return df
     
+    def clear_cache(self, symbol: Optional[str] = None):
+        """Drop cached data for a symbol (or all symbols) so it is reloaded on next access"""
+        for cache in (self._data_cache, self._array_cache, self._range_index_cache, self._derived_cache, self._data_versions):
+            for key in list(cache.keys()):
+                if symbol is None or key == symbol or (isinstance(key, tuple) and key[0] == symbol):
+                    cache.pop(key, None)
+    
+    def list_symbols(self, timeframe: Optional[str] = None) -> list[str]:
+        """List symbols available in the data catalog (only those with `timeframe` candles when given)"""
+        symbols = set(candle_store.list_symbols())
+        if timeframe is not None:
+            symbols = {symbol for symbol in symbols if candle_store.has(symbol, timeframe)}
+        if settings.CSV_FILE_PATH.exists() and timeframe in (None, settings.CSV_TIMEFRAME):
+            symbols.add(settings.CSV_SYMBOL)
+        return sorted(symbols)
+    
+    def _uses_store(self, symbol: str, timeframe: str) -> bool:
+        return candle_store.has(symbol, timeframe)
+    
+    def _check_csv_timeframe(self, symbol: str, timeframe: str):
+        if timeframe != settings.CSV_TIMEFRAME:
+            raise FileNotFoundError(f"No {timeframe} data for symbol {symbol}")
+    
+    def get_data_version(self, symbol: str, timeframe: Optional[str] = None) -> str:
+        """Version tag of the data currently served for a symbol (changes when the source changes)"""
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        if self._uses_store(symbol, timeframe):
+            return f"store-{candle_store.get_manifest(symbol, timeframe).version}"
+        self._check_csv_timeframe(symbol, timeframe)
+        self.load_csv_data(symbol)
+        return self._data_versions[(symbol, timeframe)]
+    
+    def get_arrays(self, symbol: str, timeframe: Optional[str] = None) -> CandleArrays:
+        """Get the full candle history of a symbol as contiguous NumPy arrays"""
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        version = self.get_data_version(symbol, timeframe)
+        key = (symbol, timeframe)
+        cached = self._array_cache.get(key)
+        if cached is not None and cached[0] == version:
+            record_cache("candle_arrays", hit=True)
+            return cached[1]
+        record_cache("candle_arrays", hit=False)
+        
+        if self._uses_store(symbol, timeframe):
+            arrays = candle_store.load_range(symbol, timeframe)
+        else:
+            df = self.load_csv_data(symbol)
+            arrays = CandleArrays(
+                time=np.ascontiguousarray(df['time'].to_numpy(dtype=np.int64)),
+                open=np.ascontiguousarray(df['open'].to_numpy(dtype=np.float64)),
+                high=np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64)),
+                low=np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64)),
+                close=np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64)),
+                volume=np.ascontiguousarray(df['volume'].to_numpy(dtype=np.int64)),
+            )
+        self._array_cache.set(key, (version, arrays))
+        return arrays
+    
+    def get_range_index(self, symbol: str, timeframe: Optional[str] = None) -> RangeIndex:
+        """Get the range high/low/volume index of a symbol, rebuilt when its data changes"""
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        version = self.get_data_version(symbol, timeframe)
+        key = (symbol, timeframe)
+        cached = self._range_index_cache.get(key)
+        if cached is not None and cached[0] == version:
+            record_cache("range_index", hit=True)
+            return cached[1]
+        record_cache("range_index", hit=False)
+        
+        index = RangeIndex(self.get_arrays(symbol, timeframe))
+        self._range_index_cache.set(key, (version, index))
+        return index
+    
+    def get_derived_arrays(self, symbol: str, timeframe: Optional[str], spec: ChartSpec) -> CandleArrays:
+        """Get a derived chart type (Heikin-Ashi, Renko, range bars) of a symbol, rebuilt when its data changes"""
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        version = self.get_data_version(symbol, timeframe)
+        key = (symbol, timeframe, spec)
+        cached = self._derived_cache.get(key)
+        if cached is not None and cached[0] == version:
+            record_cache("derived_charts", hit=True)
+            return cached[1]
+        record_cache("derived_charts", hit=False)
+        
+        source = self.get_arrays(symbol, timeframe)
+        arrays = derive(source, spec, max_bars=int(len(source) * settings.DERIVED_CHART_MAX_BARS_RATIO))
+        self._derived_cache.set(key, (version, arrays))
+        return arrays
+    
+    def get_range_stats(
+        self,
+        symbol: str,
+        ranges: list[tuple[int, int]],
+        timeframe: Optional[str] = None
+    ) -> list[RangeStats]:
+        """High/low (with their times), volume and open/close of each [start, end] time range"""
+        for start, end in ranges:
+            if start > end:
+                raise ValueError(f"start_time {start} is after end_time {end}")
+        index = self.get_range_index(symbol, timeframe)
+        if not ranges:
+            return []
+        starts, ends = zip(*ranges)
+        return index.query(starts, ends)
+    
+    def get_latest_time(self, symbol: str, timeframe: Optional[str] = None, chart: Optional[ChartSpec] = None) -> Optional[int]:
+        """Timestamp of the most recent candle (or derived bar) without loading the history"""
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        chunks = self._get_chunks(symbol, timeframe, chart)
+        return chunks[-1].end if chunks else None
+    
+    def _get_chunks(self, symbol: str, timeframe: str, chart: Optional[ChartSpec] = None) -> list[_Chunk]:
+        """Loadable chunks of a symbol's history (or of a derived chart type) in ascending time order"""
+        if chart is not None and chart.chart_type != "candles":
+            # Derived series depend on the whole history, so they are built and cached in one piece
+            derived = self.get_derived_arrays(symbol, timeframe, chart)
+            if len(derived) == 0:
+                return []
+            return [_Chunk(int(derived.time[0]), int(derived.time[-1]), len(derived), lambda: derived)]
+        
+        if self._uses_store(symbol, timeframe):
+            manifest = candle_store.get_manifest(symbol, timeframe)
+            return [
+                _Chunk(
+                    start=partition.start,
+                    end=partition.end,
+                    rows=partition.rows,
+                    load=lambda partition=partition: candle_store.load_partition(symbol, timeframe, partition),
+                )
+                for partition in manifest.partitions
+            ]
+        
+        self._check_csv_timeframe(symbol, timeframe)
+        arrays = self.get_arrays(symbol, timeframe)
+        if len(arrays) == 0:
+            return []
+        return [_Chunk(int(arrays.time[0]), int(arrays.time[-1]), len(arrays), lambda: arrays)]
+    
+    def get_candle_arrays(
+        self,
+        symbol: str,
+        timeframe: Optional[str] = None,
+        cursor: Optional[int] = None,
+        direction: str = "next",
+        limit: int = 1000,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        chart: Optional[ChartSpec] = None
+    ) -> tuple[CandleArrays, int]:
+        """
+        Select one page of candles (or of the derived bars of `chart`),
+        loading only the chunks the page needs
+        
+        Returns:
+            tuple: (page arrays, total_count within the date range)
+        """
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        start_ts = _to_timestamp(start_date) if start_date else None
+        end_ts = _to_timestamp(end_date) if end_date else None
+        
+        # Apply date range filters if provided (for initial load)
+        chunks = [
+            chunk for chunk in self._get_chunks(symbol, timeframe, chart)
+            if (start_ts is None or chunk.end >= start_ts) and (end_ts is None or chunk.start <= end_ts)
+        ]
+        
+        def load_clipped(chunk: _Chunk) -> CandleArrays:
+            arrays = chunk.load()
+            lo = 0
+            hi = len(arrays)
+            if start_ts is not None and chunk.start < start_ts:
+                lo = int(np.searchsorted(arrays.time, start_ts, side="left"))
+            if end_ts is not None and chunk.end > end_ts:
+                hi = int(np.searchsorted(arrays.time, end_ts, side="right"))
+            return arrays.slice(lo, hi)
+        
+        # Chunks cut by the date range are the only ones that must be opened to count rows
+        total_count = 0
+        for chunk in chunks:
+            if (start_ts is not None and chunk.start < start_ts) or (end_ts is not None and chunk.end > end_ts):
+                total_count += len(load_clipped(chunk))
+            else:
+                total_count += chunk.rows
+        
+        parts = []
+        needed = limit
+        if cursor is not None and direction == "next":
+            # Get data after cursor (going forward in time), first 'limit' rows
+            for chunk in chunks:
+                if chunk.end <= cursor:
+                    continue
+                arrays = load_clipped(chunk)
+                arrays = arrays.slice(int(np.searchsorted(arrays.time, cursor, side="right")), len(arrays))
+                parts.append(arrays.slice(0, needed))
+                needed -= len(parts[-1])
+                if needed <= 0:
+                    break
+        else:
+            # Get data before cursor (or the most recent data), last 'limit' rows
+            for chunk in reversed(chunks):
+                if cursor is not None and chunk.start >= cursor:
+                    continue
+                arrays = load_clipped(chunk)
+                if cursor is not None:
+                    arrays = arrays.slice(0, int(np.searchsorted(arrays.time, cursor, side="left")))
+                parts.append(arrays.slice(max(0, len(arrays) - needed), len(arrays)))
+                needed -= len(parts[-1])
+                if needed <= 0:
+                    break
+            parts.reverse()
+        
+        return CandleArrays.concat(parts), total_count
+    
     def get_candles(
         self,
         symbol: str,
@@ -51,7 +311,9 @@ class DataService:
         direction: str = "next",
         limit: int = 1000,
         start_date: Optional[str] = None,
-        end_date: Optional[str] = None
+        end_date: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        chart: Optional[ChartSpec] = None
     ) -> tuple[list[CandleData], int, Optional[int], Optional[int]]:
         """
         Get paginated candle data with cursor-based pagination
@@ -59,47 +321,17 @@ class DataService:
         Returns:
             tuple: (candles, total_count, next_cursor, prev_cursor)
         """
-        df = self.load_csv_data(symbol)
-        
-        # Apply date range filters if provided (for initial load)
-        if start_date:
-            start_timestamp = int(datetime.fromisoformat(start_date.replace('Z', '+00:00')).timestamp())
-            df = df[df['time'] >= start_timestamp]
-        
-        if end_date:
-            end_timestamp = int(datetime.fromisoformat(end_date.replace('Z', '+00:00')).timestamp())
-            df = df[df['time'] <= end_timestamp]
-        
-        total_count = len(df)
-        
-        # Apply cursor pagination
-        if cursor is not None:
-            if direction == "prev":
-                # Get data before cursor (going backward in time)
-                df = df[df['time'] < cursor]
-                # Take the last 'limit' rows (most recent before cursor)
-                df = df.tail(limit)
-            else:  # direction == "next"
-                # Get data after cursor (going forward in time)
-                df = df[df['time'] > cursor]
-                # Take the first 'limit' rows
-                df = df.head(limit)
-        else:
-            # No cursor provided, get the last 'limit' rows (most recent data)
-            df = df.tail(limit)
-        
-        # Convert to list of CandleData
-        candles = [
-            CandleData(
-                time=int(row['time']),
-                open=float(row['open']),
-                high=float(row['high']),
-                low=float(row['low']),
-                close=float(row['close']),
-                volume=int(row['volume'])
-            )
-            for _, row in df.iterrows()
-        ]
+        arrays, total_count = self.get_candle_arrays(
+            symbol,
+            timeframe=timeframe,
+            cursor=cursor,
+            direction=direction,
+            limit=limit,
+            start_date=start_date,
+            end_date=end_date,
+            chart=chart,
+        )
+        candles = arrays_to_candles(arrays)
         
         # Determine next and previous cursors
         next_cursor = None
@@ -116,4 +348,3 @@ class DataService:
 
 # Singleton instance
 data_service = DataService()
-
@@ -0,0 +1,192 @@
+"""
+Alternative chart types derived from a symbol's OHLC arrays.
+
+- Heikin-Ashi: one bar per source bar. Close, high and low are vectorized;
+  open is a first-order recurrence computed in one pass.
+- Renko: fixed-size bricks on closes, anchored at the first close. A brick
+  continues the trend when the close moves one brick past the last brick,
+  and reverses when it moves one brick past the last brick's open (two
+  bricks from its close). Brick levels are integer multiples of the brick
+  size from the anchor, so they don't drift.
+- Range bars: a bar closes once its high-low span reaches the range size.
+  The intrabar path of each source bar is taken as open, low, high, close
+  for up bars and open, high, low, close for down bars.
+
+Renko and range series only contain completed bars. Each derived bar is
+stamped with the time of the source bar that completed it, bumped by a
+second when one source bar completes several, so times stay strictly
+increasing and cursor pagination works unchanged. Bumped times never leave
+the source bar's interval, and the number of bars built is capped by the
+caller: a brick or range size too small for the data is rejected with a
+ValueError instead of building millions of bars. The volume of source bars
+goes to the next derived bar they complete.
+"""
+import math
+import numpy as np
+from typing import NamedTuple, Optional
+from app.services.candle_store import CandleArrays
+
+
+CHART_TYPES = ("candles", "heikin_ashi", "renko", "range")
+
+
+class ChartSpec(NamedTuple):
+    """A derived chart type and its parameters (hashable, used as a cache key)"""
+    chart_type: str
+    brick_size: Optional[float] = None  # Renko; None means ATR-sized
+    atr_period: int = 14  # Renko bricks sized by the latest ATR when brick_size is None
+    range_size: Optional[float] = None  # Range bars
+
+
+def heikin_ashi(arrays: CandleArrays) -> CandleArrays:
+    if len(arrays) == 0:
+        return arrays
+    close = (arrays.open + arrays.high + arrays.low + arrays.close) / 4
+    open_ = np.empty_like(close)
+    previous = (arrays.open[0] + arrays.close[0]) / 2
+    for i, value in enumerate(close.tolist()):
+        open_[i] = previous
+        previous = (previous + value) / 2
+    return CandleArrays(
+        time=arrays.time,
+        open=open_,
+        high=np.maximum.reduce([arrays.high, open_, close]),
+        low=np.minimum.reduce([arrays.low, open_, close]),
+        close=close,
+        volume=arrays.volume,
+    )
+
+
+def average_true_range(arrays: CandleArrays, period: int) -> Optional[float]:
+    """Wilder's ATR at the last bar (None with fewer than `period` bars)"""
+    if len(arrays) < period:
+        return None
+    previous_close = np.concatenate(([arrays.close[0]], arrays.close[:-1]))
+    true_range = np.maximum(arrays.high, previous_close) - np.minimum(arrays.low, previous_close)
+    atr = float(true_range[:period].mean())
+    for value in true_range[period:].tolist():
+        atr += (value - atr) / period
+    return atr
+
+
+def _interval_ends(time: np.ndarray) -> np.ndarray:
+    """End (exclusive) of each source bar's interval: the next bar, at most one typical step away"""
+    step = max(int(np.median(np.diff(time))), 1) if len(time) > 1 else 1
+    return np.minimum(np.append(time[1:], np.iinfo(np.int64).max), time + step)
+
+
+class _BarBuilder:
+    """Collects derived bars with strictly increasing times inside their source bars' intervals"""
+
+    def __init__(self, size_param: str, max_bars: Optional[int]):
+        self.rows: list[tuple] = []
+        self.last_time: Optional[int] = None
+        self.volume = 0
+        self.size_param = size_param
+        self.max_bars = max_bars
+
+    def add(self, time: int, end: int, open_: float, high: float, low: float, close: float):
+        if self.last_time is not None and time <= self.last_time:
+            time = self.last_time + 1
+        if time >= end:
+            raise ValueError(f"{self.size_param} is too small: one candle completes more bars than its interval has seconds")
+        if self.max_bars is not None and len(self.rows) >= self.max_bars:
+            raise ValueError(f"{self.size_param} is too small: the chart would have more than {self.max_bars} bars")
+        self.rows.append((time, open_, high, low, close, self.volume))
+        self.last_time = time
+        self.volume = 0
+
+    def build(self) -> CandleArrays:
+        if not self.rows:
+            return CandleArrays.empty()
+        time, open_, high, low, close, volume = zip(*self.rows)
+        return CandleArrays(
+            time=np.array(time, dtype=np.int64),
+            open=np.array(open_, dtype=np.float64),
+            high=np.array(high, dtype=np.float64),
+            low=np.array(low, dtype=np.float64),
+            close=np.array(close, dtype=np.float64),
+            volume=np.array(volume, dtype=np.int64),
+        )
+
+
+def renko(arrays: CandleArrays, brick_size: float, max_bars: Optional[int] = None) -> CandleArrays:
+    if len(arrays) == 0:
+        return CandleArrays.empty()
+    base = float(arrays.close[0])
+    bars = _BarBuilder("brick_size", max_bars)
+    # Levels (in bricks from the anchor) of the last brick's lower and upper edge
+    low_level = high_level = 0
+    for time, end, close, volume in zip(
+        arrays.time.tolist(), _interval_ends(arrays.time).tolist(), arrays.close.tolist(), arrays.volume.tolist()
+    ):
+        bars.volume += volume
+        position = (close - base) / brick_size
+        if position >= high_level + 1:
+            for level in range(high_level, math.floor(position)):
+                lower, upper = base + level * brick_size, base + (level + 1) * brick_size
+                bars.add(time, end, lower, upper, lower, upper)
+            high_level = math.floor(position)
+            low_level = high_level - 1
+        elif position <= low_level - 1:
+            for level in range(low_level, math.ceil(position), -1):
+                upper, lower = base + level * brick_size, base + (level - 1) * brick_size
+                bars.add(time, end, upper, upper, lower, lower)
+            low_level = math.ceil(position)
+            high_level = low_level + 1
+    return bars.build()
+
+
+def range_bars(arrays: CandleArrays, range_size: float, max_bars: Optional[int] = None) -> CandleArrays:
+    if len(arrays) == 0:
+        return CandleArrays.empty()
+    bars = _BarBuilder("range_size", max_bars)
+    open_ = high = low = None
+    for time, end, o, h, l, c, volume in zip(
+        arrays.time.tolist(),
+        _interval_ends(arrays.time).tolist(),
+        arrays.open.tolist(),
+        arrays.high.tolist(),
+        arrays.low.tolist(),
+        arrays.close.tolist(),
+        arrays.volume.tolist(),
+    ):
+        bars.volume += volume
+        for price in ((o, l, h, c) if c >= o else (o, h, l, c)):
+            if open_ is None:
+                open_ = high = low = price
+                continue
+            # Close full-range bars until the price fits in the current one
+            while price - low >= range_size:
+                bars.add(time, end, open_, low + range_size, low, low + range_size)
+                open_ = high = low = low + range_size
+            while high - price >= range_size:
+                bars.add(time, end, open_, high, high - range_size, high - range_size)
+                open_ = high = low = high - range_size
+            high = max(high, price)
+            low = min(low, price)
+    return bars.build()
+
+
+def derive(arrays: CandleArrays, spec: ChartSpec, max_bars: Optional[int] = None) -> CandleArrays:
+    """
+    Build the chart type of `spec` from source candles, with at most
+    `max_bars` Renko or range bars.
+
+    Raises:
+        ValueError: Missing or unusable parameters
+    """
+    if spec.chart_type == "heikin_ashi":
+        return heikin_ashi(arrays)
+    if spec.chart_type == "renko":
+        brick_size = spec.brick_size
+        if brick_size is None:
+            brick_size = average_true_range(arrays, spec.atr_period)
+            if not brick_size:
+                raise ValueError(f"Not enough data for an ATR({spec.atr_period}) brick size; pass brick_size")
+        return renko(arrays, brick_size, max_bars)
+    if spec.chart_type == "range":
+        if spec.range_size is None:
+            raise ValueError("range_size is required for range bars")
+        return range_bars(arrays, spec.range_size, max_bars)
+    raise ValueError(f"chart_type must be one of {', '.join(CHART_TYPES)}")
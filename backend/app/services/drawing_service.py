@@ -1,24 +1,67 @@
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+from dataclasses import dataclass, field
+from threading import Lock, RLock, Timer
 import logging
-from sqlalchemy.orm import Session, joinedload
-from app.database.session import SessionLocal
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+from pydantic import ValidationError
+from sqlalchemy import delete, func, insert, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.database.session import SessionLocal, engine
 from app.models.drawing import Drawing as DrawingModel
 from app.models.series import Series as SeriesModel
 from app.models.point import Point as PointModel
 from app.models.pair import Pair as PairModel
-from app.schemas.drawing import Drawing, DrawingCreate, DrawingUpdate
+from app.models.id_sequence import IdSequence
+from app.models.drawing_event import DrawingEvent as DrawingEventModel
+from app.schemas.drawing import Drawing, DrawingChange, DrawingCreate, DrawingUpdate
+from app.core.sampled_logging import log_sampled
+from app.core.config import settings
+from app.core.metrics import drawing_edits, drawing_edit_flushes
 
 
 logger = logging.getLogger(__name__)
 
+# Errors an edit fails with on every attempt (as opposed to e.g. a locked database)
+_PERMANENT_ERRORS = (IntegrityError, ValidationError)
+
+
+@dataclass
+class _PendingEdit:
+    """Logged updates of one drawing not yet in the snapshot, and the detached model they have been applied to"""
+    model: DrawingModel
+    updates: list[DrawingUpdate] = field(default_factory=list)
+    last_seq: int = 0  # Change log sequence number of the newest update
+
 
 class DrawingService:
     """Service for managing drawings stored in SQLite database"""
     
+    def __init__(self):
+        self._change_listeners: list[Callable[[Optional[str]], None]] = []
+        # Write-behind buffer for PUT edits, keyed by drawing id
+        self._pending: dict[int, _PendingEdit] = {}
+        self._pending_lock = Lock()
+        self._write_lock = RLock()  # Serializes flushes with write-through updates
+        self._flush_timer: Optional[Timer] = None
+        self._process_lock: Optional[TextIO] = None
+    
     # =============================================================================
     # HELPER METHODS (PRIVATE)
     # =============================================================================
     
+    def _notify_changed(self, pair: Optional[str]):
+        """Tell listeners that drawings of a pair changed (None means all pairs)"""
+        for listener in self._change_listeners:
+            try:
+                listener(pair)
+            except Exception:
+                logger.exception("Drawing change listener failed")
+    
     def _get_db(self) -> Session:
         """Get database session"""
         return SessionLocal()
@@ -34,6 +77,315 @@ class DrawingService:
             raise ValueError(f"Pair '{pair_symbol.upper()}' does not exist. Please create the pair first.")
         return int(pair_id)
     
+    def _packed(self) -> bool:
+        return settings.POINT_STORAGE_MODE == "packed"
+    
+    def _load_options(self) -> list:
+        """Eager loads for full drawings (packed series carry their points, so skip the points join)"""
+        series = joinedload(DrawingModel.series)
+        if self._packed():
+            return [joinedload(DrawingModel.pair), series]
+        return [joinedload(DrawingModel.pair), series.joinedload(SeriesModel.points)]
+    
+    def _allocate_point_ids(self, db: Session, count: int) -> list[int]:
+        """
+        Reserve `count` point ids shared by both storage modes.
+        
+        The counter never drops below max(points.id) + 1, so ids stay unique
+        even if rows were inserted without it (e.g. bulk loaders).
+        """
+        if count <= 0:
+            return []
+        floor = db.query(func.coalesce(func.max(PointModel.id), 0) + 1).scalar_subquery()
+        updated = db.execute(
+            update(IdSequence)
+            .where(IdSequence.name == "points")
+            .values(next_value=func.max(IdSequence.next_value, floor) + count)
+        ).rowcount
+        if not updated:
+            start = db.query(func.coalesce(func.max(PointModel.id), 0) + 1).scalar()
+            db.add(IdSequence(name="points", next_value=start + count))
+            db.flush()
+        next_value = db.query(IdSequence.next_value).filter(IdSequence.name == "points").scalar()
+        return list(range(next_value - count, next_value))
+    
+    def _series_points(self, series_model: SeriesModel) -> list[tuple[int, float, float]]:
+        """(id, x, y) of a series' points in order, from whichever layout holds them"""
+        if series_model.points_packed is not None:
+            return [(int(point_id), x, y) for point_id, x, y in series_model.points_packed]
+        return [(point_model.id, point_model.x, point_model.y) for point_model in series_model.points]
+    
+    def _store_series_points(self, db: Session, series_model: SeriesModel, points: list[tuple[int, float, float]]):
+        """Replace a series' points using the configured storage mode"""
+        if self._packed():
+            if series_model.points_packed is None and series_model.id is not None:
+                db.query(PointModel).filter(PointModel.series_id == series_model.id).delete(synchronize_session=False)
+            series_model.points_packed = [[point_id, x, y] for point_id, x, y in points]
+            return
+        
+        # Row layout: drop the packed copy and write one row per point
+        series_model.points_packed = None
+        db.flush()
+        db.query(PointModel).filter(PointModel.series_id == series_model.id).delete(synchronize_session=False)
+        for point_idx, (point_id, x, y) in enumerate(points):
+            db.add(PointModel(id=point_id, series_id=series_model.id, x=x, y=y, order_index=point_idx))
+    
+    def _merge_points(self, db: Optional[Session], existing: list[tuple[int, float, float]], points_data: list) -> list[tuple[int, float, float]]:
+        """
+        Apply incoming points to a series the way row updates do: known ids are
+        moved/updated, other points are created, untouched points stay.
+        `db` is only used to allocate ids for created points.
+        """
+        order = {point_id: (idx, x, y) for idx, (point_id, x, y) in enumerate(existing)}
+        new_ids = iter(self._allocate_point_ids(
+            db, sum(1 for point_data in points_data if point_data.id is None or point_data.id not in order)
+        ))
+        for point_idx, point_data in enumerate(points_data):
+            if point_data.id is not None and point_data.id in order:
+                order[point_data.id] = (point_idx, point_data.x, point_data.y)
+            else:
+                order[next(new_ids)] = (point_idx, point_data.x, point_data.y)
+        merged = sorted(order.items(), key=lambda item: (item[1][0], item[0]))
+        return [(point_id, x, y) for point_id, (_, x, y) in merged]
+    
+    def _delete_drawings(self, db: Session, drawing_ids) -> int:
+        """
+        Delete drawings (ids or an id subquery) with their series and points in
+        three set-based statements. Children are deleted explicitly rather than
+        left to ON DELETE CASCADE so no graph is orphaned even on a connection
+        without foreign key enforcement.
+        """
+        series_ids = select(SeriesModel.id).where(SeriesModel.drawing_id.in_(drawing_ids))
+        db.execute(delete(PointModel).where(PointModel.series_id.in_(series_ids)))
+        db.execute(delete(SeriesModel).where(SeriesModel.drawing_id.in_(drawing_ids)))
+        return db.execute(delete(DrawingModel).where(DrawingModel.id.in_(drawing_ids))).rowcount
+    
+    def _drawing_color(self, drawing: DrawingCreate) -> str:
+        """Color of a new drawing: the one given, else its first series' style color, else black"""
+        first_series_style = drawing.series[0].style if drawing.series else None
+        derived_color = first_series_style.get('color') if isinstance(first_series_style, dict) else None
+        return drawing.color or derived_color or "#000000"
+    
+    def _append_event(self, db: Session, pair_id: int, drawing_id: Optional[int], op: str, data: Optional[dict] = None) -> int:
+        """Append an entry to a pair's change log; returns its sequence number"""
+        event = DrawingEventModel(pair_id=pair_id, drawing_id=drawing_id, op=op, data=data)
+        db.add(event)
+        db.flush()
+        return event.id
+    
+    def _advance_snapshot(self, db: Session, pair_id: int, seq: int):
+        """
+        Record that the drawing tables reflect a pair's log up to `seq`, and
+        truncate the events it covers beyond the newest DRAWING_LOG_RETAIN_EVENTS
+        (every drag PUT is logged, so the log would otherwise grow without bound).
+        """
+        db.execute(
+            update(PairModel)
+            .where(PairModel.id == pair_id)
+            .values(snapshot_seq=func.max(PairModel.snapshot_seq, seq))
+        )
+        retain = settings.DRAWING_LOG_RETAIN_EVENTS
+        if retain <= 0:
+            return
+        cutoff = (
+            db.query(DrawingEventModel.id)
+            .filter(DrawingEventModel.pair_id == pair_id, DrawingEventModel.id <= seq)
+            .order_by(DrawingEventModel.id.desc())
+            .offset(retain)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            db.execute(delete(DrawingEventModel).where(DrawingEventModel.pair_id == pair_id, DrawingEventModel.id <= cutoff))
+            db.execute(
+                update(PairModel)
+                .where(PairModel.id == pair_id)
+                .values(truncated_seq=func.max(PairModel.truncated_seq, cutoff))
+            )
+    
+    def _apply_update(self, db: Session, drawing_model: DrawingModel, updates: DrawingUpdate):
+        self._update_basic_drawing_fields(drawing_model, updates)
+        if updates.series is not None:
+            self._update_series_data(db, drawing_model, updates.series)
+    
+    def _load_detached(self, drawing_id: int) -> Optional[DrawingModel]:
+        """Load a drawing with everything the schema needs, detached from its session"""
+        db = self._get_db()
+        try:
+            return db.query(DrawingModel).options(
+                joinedload(DrawingModel.pair),
+                joinedload(DrawingModel.series).joinedload(SeriesModel.points)
+            ).filter(DrawingModel.id == drawing_id).first()
+        finally:
+            db.close()
+    
+    def _copy_detached(self, drawing_model: DrawingModel) -> DrawingModel:
+        """Copy a detached drawing with its series and points, sharing the (read-only) pair"""
+        def copy(model):
+            return type(model)(**{attr.key: getattr(model, attr.key) for attr in inspect(type(model)).column_attrs})
+        
+        drawing_copy = copy(drawing_model)
+        series_copies = []
+        for series_model in drawing_model.series:
+            series_copy = copy(series_model)
+            set_committed_value(series_copy, "points", [copy(point_model) for point_model in series_model.points])
+            series_copies.append(series_copy)
+        # set_committed_value skips backrefs, so the shared pair's collections are left alone
+        set_committed_value(drawing_copy, "series", series_copies)
+        set_committed_value(drawing_copy, "pair", drawing_model.pair)
+        return drawing_copy
+    
+    def _can_buffer(self, drawing_model: DrawingModel, updates: DrawingUpdate) -> bool:
+        """Whether an update only touches existing series and points (nothing needs new ids)"""
+        if updates.series is None:
+            return True
+        series_by_id = {series_model.id: series_model for series_model in drawing_model.series}
+        for series_data in updates.series:
+            series_model = series_by_id.get(series_data.id)
+            if series_model is None:
+                return False
+            if not self._packed() and series_model.points_packed is not None:
+                return False  # Converted back to rows by a write-through update
+            point_ids = {point_id for point_id, _, _ in self._series_points(series_model)}
+            if any(point_data.id not in point_ids for point_data in series_data.points):
+                return False
+        return True
+    
+    def _apply_detached(self, drawing_model: DrawingModel, updates: DrawingUpdate):
+        """Apply a bufferable update to a detached model the way update_drawing would"""
+        self._update_basic_drawing_fields(drawing_model, updates)
+        if updates.series is None:
+            return
+        series_by_id = {series_model.id: series_model for series_model in drawing_model.series}
+        for series_idx, series_data in enumerate(updates.series):
+            series_model = series_by_id[series_data.id]
+            series_model.order_index = series_idx
+            series_model.name = series_data.name
+            series_model.style = series_data.style
+            if self._packed() or series_model.points_packed is not None:
+                series_model.points_packed = [
+                    list(point) for point in self._merge_points(None, self._series_points(series_model), series_data.points)
+                ]
+                continue
+            points_by_id = {point_model.id: point_model for point_model in series_model.points}
+            for point_idx, point_data in enumerate(series_data.points):
+                point_model = points_by_id[point_data.id]
+                point_model.x, point_model.y, point_model.order_index = point_data.x, point_data.y, point_idx
+            series_model.points.sort(key=lambda point_model: (point_model.order_index, point_model.id))
+        # Same order as the relationships load in
+        drawing_model.series.sort(key=lambda series_model: (series_model.order_index, series_model.id))
+    
+    def _supersedes(self, drawing_model: DrawingModel, earlier: DrawingUpdate, later: DrawingUpdate) -> bool:
+        """
+        Whether applying `later` alone gives the same result as `earlier` then
+        `later`: it sets every field `earlier` set and lists every point of
+        each series `earlier` touched (a drag resends the whole drawing).
+        """
+        if not earlier.model_fields_set <= later.model_fields_set:
+            return False
+        if earlier.series is None:
+            return True
+        if later.series is None:
+            return False
+        later_points = {series_data.id: [point_data.id for point_data in series_data.points] for series_data in later.series}
+        series_by_id = {series_model.id: series_model for series_model in drawing_model.series}
+        for series_data in earlier.series:
+            point_ids = later_points.get(series_data.id)
+            if point_ids is None:
+                return False
+            all_ids = [point_id for point_id, _, _ in self._series_points(series_by_id[series_data.id])]
+            if len(point_ids) != len(all_ids) or set(point_ids) != set(all_ids):
+                return False
+        return True
+    
+    def _buffer_update(self, drawing_id: int, updates: DrawingUpdate) -> Optional[Drawing]:
+        """
+        Append an update to the change log and return the drawing as it will
+        be; the drawing tables catch up at the next snapshot (flush_pending).
+        
+        Returns None when the update has to be written through (the drawing
+        is not found, or the update creates series or points).
+        
+        Raises:
+            ValueError: The update would leave the drawing invalid (nothing is logged or buffered)
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                entry = self._pending.get(drawing_id)
+            if entry is None:
+                drawing_model = self._load_detached(drawing_id)
+                if drawing_model is None:
+                    return None
+                entry = _PendingEdit(drawing_model)
+            with self._pending_lock:
+                if not self._can_buffer(entry.model, updates):
+                    return None
+                supersedes = bool(entry.updates) and self._supersedes(entry.model, entry.updates[-1], updates)
+            
+            # Apply to a copy first: an edit the snapshot would reject must fail this request only
+            candidate = self._copy_detached(entry.model)
+            self._apply_detached(candidate, updates)
+            try:
+                state = self._drawing_model_to_schema(candidate)
+            except ValidationError as e:
+                raise ValueError(f"Invalid drawing update: {e}") from e
+            
+            # One sequential insert per edit instead of multi-table updates
+            db = self._get_db()
+            try:
+                seq = self._append_event(db, entry.model.pair_id, drawing_id, "update", updates.model_dump(exclude_unset=True))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+            
+            with self._pending_lock:
+                self._pending.setdefault(drawing_id, entry)
+                if supersedes:
+                    entry.updates[-1] = updates
+                    drawing_edits.inc(result="coalesced")
+                else:
+                    entry.updates.append(updates)
+                    drawing_edits.inc(result="buffered")
+                entry.last_seq = seq
+                entry.model = candidate
+                self._schedule_flush()
+        
+        self._notify_changed(state.pair)
+        return state
+    
+    def _schedule_flush(self):
+        """Start the flush timer unless one is running (caller holds _pending_lock)"""
+        if self._flush_timer is None:
+            self._flush_timer = Timer(settings.DRAWING_WRITE_COALESCE_MS / 1000.0, self._flush_from_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def _flush_from_timer(self):
+        try:
+            self.flush_pending()
+        except Exception:
+            logger.exception("Flushing buffered drawing edits failed")
+    
+    def _discard_pending(self, drawing_ids: Optional[set[int]] = None):
+        """Drop buffered edits of deleted drawings (all when drawing_ids is None)"""
+        with self._pending_lock:
+            if drawing_ids is None:
+                self._pending.clear()
+            for drawing_id in drawing_ids or ():
+                self._pending.pop(drawing_id, None)
+    
+    def _pending_drawings(self, drawing_ids=None) -> dict[int, Drawing]:
+        """Drawings with buffered edits, as they will be once flushed"""
+        with self._pending_lock:
+            return {
+                drawing_id: self._drawing_model_to_schema(entry.model)
+                for drawing_id, entry in self._pending.items()
+                if drawing_ids is None or drawing_id in drawing_ids
+            }
+    
     def _drawing_model_to_schema(self, drawing_model: DrawingModel) -> Drawing:
         """Convert SQLAlchemy Drawing model to Pydantic schema."""
         # Prepare legacy metadata fallback for roles if needed
@@ -53,8 +405,8 @@ class DrawingService:
                 "name": getattr(series_model, 'name', None),
                 "style": getattr(series_model, 'style', None),
                 "points": [
-                    {"id": point_model.id, "x": point_model.x, "y": point_model.y}
-                    for point_model in series_model.points
+                    {"id": point_id, "x": x, "y": y}
+                    for point_id, x, y in self._series_points(series_model)
                 ],
             }
 
@@ -124,7 +476,11 @@ class DrawingService:
                 series_model.name = series_data.name
             if hasattr(series_data, 'style'):
                 series_model.style = series_data.style
-            self._update_points_for_series(db, series_model, series_data.points)
+            if self._packed() or series_model.points_packed is not None:
+                merged = self._merge_points(db, self._series_points(series_model), series_data.points)
+                self._store_series_points(db, series_model, merged)
+            else:
+                self._update_points_for_series(db, series_model, series_data.points)
         else:
             # Series with this ID doesn't exist, create it
             self._create_new_series(db, drawing_id, series_data, series_idx)
@@ -137,6 +493,11 @@ class DrawingService:
             name=getattr(series_data, 'name', None),
             style=getattr(series_data, 'style', None),
         )
+        if self._packed():
+            ids = self._allocate_point_ids(db, len(series_data.points))
+            series_model.points_packed = [[point_id, p.x, p.y] for point_id, p in zip(ids, series_data.points)]
+            db.add(series_model)
+            return
         db.add(series_model)
         db.flush()
         
@@ -169,6 +530,7 @@ class DrawingService:
     def _create_new_point(self, db: Session, series_id: int, point_data, point_idx: int):
         """Create a new point"""
         point_model = PointModel(
+            id=self._allocate_point_ids(db, 1)[0],
             series_id=series_id,
             x=point_data.x,
             y=point_data.y,
@@ -176,41 +538,166 @@ class DrawingService:
         )
         db.add(point_model)
     
+    def _write_edits(self, batch: list[tuple[int, _PendingEdit, list[DrawingUpdate]]], dropped: Iterable[int] = ()):
+        """
+        Apply buffered edits in one transaction and advance the snapshots of
+        their pairs. Dropped drawings get an event restoring the state they
+        have in the tables, so log readers discard the edits they saw.
+        """
+        db = self._get_db()
+        try:
+            snapshots: dict[int, int] = {}
+            for drawing_id, entry, updates in batch:
+                pair_id = entry.model.pair_id
+                snapshots[pair_id] = max(snapshots.get(pair_id, 0), entry.last_seq)
+                drawing_model = db.query(DrawingModel).options(
+                    *self._load_options()
+                ).filter(DrawingModel.id == drawing_id).first()
+                if not drawing_model:
+                    continue  # Deleted since it was buffered
+                for update_data in updates:
+                    self._apply_update(db, drawing_model, update_data)
+            db.flush()
+            for drawing_id in dropped:
+                drawing_model = db.query(DrawingModel).options(
+                    *self._load_options()
+                ).filter(DrawingModel.id == drawing_id).first()
+                if drawing_model:
+                    state = self._drawing_model_to_schema(drawing_model).model_dump(include={"name", "color", "series", "isIncomplete"})
+                    seq = self._append_event(db, drawing_model.pair_id, drawing_id, "update", state)
+                    snapshots[drawing_model.pair_id] = max(snapshots.get(drawing_model.pair_id, 0), seq)
+            # Every logged edit is in `batch` (appends hold the write lock), so the tables are now current
+            for pair_id, seq in snapshots.items():
+                self._advance_snapshot(db, pair_id, seq)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
     # =============================================================================
     # PUBLIC METHODS
     # =============================================================================
     
+    def add_change_listener(self, listener: Callable[[Optional[str]], None]):
+        """Register a callback invoked with the pair symbol after drawings change"""
+        self._change_listeners.append(listener)
+    
     def get_all_drawings(self, pair: Optional[str] = None) -> list[Drawing]:
         """Get all drawings, optionally filtered by trading pair"""
-        logger.debug(f"get_all_drawings pair={pair}")
+        log_sampled(logger, logging.DEBUG, "get_all_drawings pair=%s", pair)
         db = self._get_db()
         try:
-            query = db.query(DrawingModel).options(
-                joinedload(DrawingModel.pair),
-                joinedload(DrawingModel.series).joinedload(SeriesModel.points)
-            )
+            query = db.query(DrawingModel).options(*self._load_options())
             
             if pair:
-                logger.debug(f"Filtering by pair: {pair.upper()}")
                 query = query.join(PairModel).filter(PairModel.symbol == pair.upper())
             
             drawing_models = query.all()
-            return [self._drawing_model_to_schema(d) for d in drawing_models]
+            drawings = [self._drawing_model_to_schema(d) for d in drawing_models]
+            # Drawings with buffered edits are served as they will be once flushed
+            pending = self._pending_drawings({drawing.id for drawing in drawings})
+            return [pending.get(drawing.id, drawing) for drawing in drawings]
         except Exception as e:
-            logger.error(f"Error in get_all_drawings: {str(e)}")
+            logger.error("Error in get_all_drawings: %s", e)
             import traceback
             logger.error(traceback.format_exc())
             raise
         finally:
             db.close()
     
+    def get_series_points(
+        self,
+        pair: str,
+        types: Optional[set[str]] = None,
+        drawing_ids: Optional[list[int]] = None,
+        complete_only: bool = False
+    ) -> list[tuple[int, str, int, list[tuple[float, float]]]]:
+        """
+        Lean read of the (x, y) points of every series of a pair, without
+        building full drawings.
+        
+        Returns:
+            list: (drawing_id, drawing_type, series_id, points) ordered by series id
+        """
+        db = self._get_db()
+        try:
+            query = (
+                db.query(DrawingModel.id, DrawingModel.type, SeriesModel.id, SeriesModel.points_packed)
+                .join(PairModel, DrawingModel.pair_id == PairModel.id)
+                .join(SeriesModel, SeriesModel.drawing_id == DrawingModel.id)
+                .filter(PairModel.symbol == pair.upper())
+            )
+            if types is not None:
+                query = query.filter(DrawingModel.type.in_(types))
+            if drawing_ids is not None:
+                query = query.filter(DrawingModel.id.in_(drawing_ids))
+            if complete_only:
+                query = query.filter(DrawingModel.is_incomplete.is_(False))
+            series_rows = query.order_by(SeriesModel.id).all()
+            
+            # Series still in the row layout: fetch their points in one query
+            row_series = [series_id for _, _, series_id, packed in series_rows if packed is None]
+            row_points: dict[int, list[tuple[float, float]]] = {}
+            if row_series:
+                for series_id, x, y in (
+                    db.query(PointModel.series_id, PointModel.x, PointModel.y)
+                    .filter(PointModel.series_id.in_(row_series))
+                    .order_by(PointModel.series_id, PointModel.order_index, PointModel.id)
+                ):
+                    row_points.setdefault(series_id, []).append((x, y))
+            
+            result = [
+                (
+                    drawing_id,
+                    drawing_type,
+                    series_id,
+                    row_points.get(series_id, []) if packed is None else [(x, y) for _, x, y in packed],
+                )
+                for drawing_id, drawing_type, series_id, packed in series_rows
+            ]
+        finally:
+            db.close()
+        
+        # Swap in drawings with buffered edits (filtered on their pending state)
+        pending = self._pending_drawings(set(drawing_ids) if drawing_ids is not None else None)
+        pending = {drawing_id: drawing for drawing_id, drawing in pending.items() if drawing.pair == pair.upper()}
+        if not pending:
+            return result
+        result = [row for row in result if row[0] not in pending]
+        for drawing in pending.values():
+            if (types is not None and drawing.type not in types) or (complete_only and drawing.isIncomplete):
+                continue
+            result.extend(
+                (drawing.id, drawing.type, series.id, [(point.x, point.y) for point in series.points])
+                for series in drawing.series
+            )
+        return sorted(result, key=lambda row: row[2])
+    
+    def get_time_ranges(self, pair: str, drawing_ids: Optional[list[int]] = None) -> dict[int, tuple[float, float]]:
+        """Earliest and latest point x of each drawing of a pair"""
+        ranges: dict[int, tuple[float, float]] = {}
+        for drawing_id, _, _, points in self.get_series_points(pair, drawing_ids=drawing_ids):
+            if not points:
+                continue
+            xs = [x for x, _ in points]
+            x_min, x_max = min(xs), max(xs)
+            if drawing_id in ranges:
+                x_min, x_max = min(x_min, ranges[drawing_id][0]), max(x_max, ranges[drawing_id][1])
+            ranges[drawing_id] = (x_min, x_max)
+        return dict(sorted(ranges.items()))
+    
     def get_drawing_by_id(self, drawing_id: int) -> Optional[Drawing]:
         """Get a single drawing by ID"""
+        pending = self._pending_drawings({drawing_id})
+        if pending:
+            return pending[drawing_id]
+        
         db = self._get_db()
         try:
             drawing_model = db.query(DrawingModel).options(
-                joinedload(DrawingModel.pair),
-                joinedload(DrawingModel.series).joinedload(SeriesModel.points)
+                *self._load_options()
             ).filter(DrawingModel.id == drawing_id).first()
             
             if not drawing_model:
@@ -220,133 +707,572 @@ class DrawingService:
         finally:
             db.close()
     
-    def create_drawing(self, drawing: DrawingCreate) -> Drawing:
-        """Create a new drawing with auto-generated IDs"""
-        logger.debug(f"create_drawing pair={drawing.pair} type={drawing.type} series_count={len(drawing.series)}")
+    def iter_export(self, pair: Optional[str] = None, batch_size: int = 100) -> Iterator[str]:
+        """
+        Stream drawings (optionally of one pair) as NDJSON lines, oldest first.
+        
+        Drawings are read from a server-side cursor `batch_size` at a time and
+        dropped from the session once written, so memory stays bounded by one
+        batch however many drawings and points there are.
+        """
+        # Buffered edits are snapshotted first so the export matches what reads return
+        self.flush_pending()
+        series = selectinload(DrawingModel.series)
+        if not self._packed():
+            series = series.selectinload(SeriesModel.points)
+        query = (
+            select(DrawingModel)
+            .options(joinedload(DrawingModel.pair), series)
+            .order_by(DrawingModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if pair:
+            query = query.join(PairModel).filter(PairModel.symbol == pair.upper())
         
         db = self._get_db()
         try:
-            # Require pair (must exist)
-            pair_id = self._require_pair_id(db, drawing.pair)
+            for batch in db.execute(query).scalars().partitions():
+                lines = []
+                for drawing_model in batch:
+                    lines.append(self._drawing_model_to_schema(drawing_model).model_dump_json() + "\n")
+                    db.expunge(drawing_model)  # Cascades to its series and points
+                yield "".join(lines)
+        finally:
+            db.close()
+    
+    def create_drawing(self, drawing: DrawingCreate) -> Drawing:
+        """Create a new drawing with auto-generated IDs"""
+        log_sampled(
+            logger, logging.DEBUG, "create_drawing pair=%s type=%s series_count=%d",
+            drawing.pair, drawing.type, len(drawing.series),
+        )
+        
+        with self._write_lock:
+            # Buffered edits are snapshotted first so the log stays in order
+            self.flush_pending()
             
-            # Create drawing (ID will be auto-generated)
-            # Determine drawing color from first series style (fallback to provided or black)
-            first_series_style = None
+            db = self._get_db()
             try:
-                first_series_style = drawing.series[0].style if drawing.series else None
-            except Exception:
-                first_series_style = None
-            derived_color = None
-            if isinstance(first_series_style, dict):
-                derived_color = first_series_style.get('color')
-
-            drawing_model = DrawingModel(
-                name=drawing.name,
-                type=drawing.type,
-                color=drawing.color or derived_color or "#000000",
-                pair_id=pair_id
-            )
-            # Set incomplete flag if provided
-            if getattr(drawing, 'isIncomplete', None) is not None:
-                drawing_model.is_incomplete = bool(drawing.isIncomplete)
-            db.add(drawing_model)
-            db.flush()  # Get auto-generated ID
-            
-            # Create series and points
-            for series_idx, series_data in enumerate(drawing.series):
-                series_model = SeriesModel(
-                    drawing_id=drawing_model.id,
-                    order_index=series_idx,
-                    name=getattr(series_data, 'name', None),
-                    style=getattr(series_data, 'style', None),
+                # Require pair (must exist)
+                pair_id = self._require_pair_id(db, drawing.pair)
+                
+                # Create drawing (ID will be auto-generated)
+                drawing_model = DrawingModel(
+                    name=drawing.name,
+                    type=drawing.type,
+                    color=self._drawing_color(drawing),
+                    pair_id=pair_id
                 )
-                db.add(series_model)
-                db.flush()  # ensure series_model.id
+                # Set incomplete flag if provided
+                if getattr(drawing, 'isIncomplete', None) is not None:
+                    drawing_model.is_incomplete = bool(drawing.isIncomplete)
+                db.add(drawing_model)
+                db.flush()  # Get auto-generated ID
+                
+                # Create series and points (ids for all points reserved at once)
+                point_ids = iter(self._allocate_point_ids(db, sum(len(s.points) for s in drawing.series)))
+                for series_idx, series_data in enumerate(drawing.series):
+                    series_model = SeriesModel(
+                        drawing_id=drawing_model.id,
+                        order_index=series_idx,
+                        name=getattr(series_data, 'name', None),
+                        style=getattr(series_data, 'style', None),
+                    )
+                    if self._packed():
+                        series_model.points_packed = [[next(point_ids), p.x, p.y] for p in series_data.points]
+                        db.add(series_model)
+                        continue
+                    db.add(series_model)
+                    db.flush()  # ensure series_model.id
 
-                for point_idx, point_data in enumerate(series_data.points):
-                    db.add(
-                        PointModel(
-                            series_id=series_model.id,
-                            x=point_data.x,
-                            y=point_data.y,
-                            order_index=point_idx,
+                    for point_idx, point_data in enumerate(series_data.points):
+                        db.add(
+                            PointModel(
+                                id=next(point_ids),
+                                series_id=series_model.id,
+                                x=point_data.x,
+                                y=point_data.y,
+                                order_index=point_idx,
+                            )
                         )
-                    )
+                
+                db.flush()
+                db.refresh(drawing_model)
+                created = self._drawing_model_to_schema(drawing_model)
+                seq = self._append_event(db, pair_id, drawing_model.id, "create", created.model_dump())
+                self._advance_snapshot(db, pair_id, seq)
+                db.commit()
+                self._notify_changed(created.pair)
+                return created
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
+    
+    def import_drawings(self, drawings: Iterable[DrawingCreate], pair: Optional[str] = None) -> int:
+        """
+        Insert a batch of drawings in one transaction with set-based inserts
+        (one statement each for drawings, series, points and change log
+        events). `pair` overrides the pair of every drawing.
+        
+        Returns:
+            int: Number of points inserted
+        """
+        drawings = list(drawings)
+        if not drawings:
+            return 0
+        
+        with self._write_lock:
+            self.flush_pending()
             
-            db.commit()
-            db.refresh(drawing_model)
-            return self._drawing_model_to_schema(drawing_model)
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
+            db = self._get_db()
+            try:
+                symbols = [(pair or drawing.pair).upper() for drawing in drawings]
+                pair_ids = {symbol: self._require_pair_id(db, symbol) for symbol in set(symbols)}
+                drawing_ids = db.scalars(
+                    insert(DrawingModel).returning(DrawingModel.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "name": drawing.name,
+                            "type": drawing.type,
+                            "color": self._drawing_color(drawing),
+                            "is_incomplete": bool(drawing.isIncomplete),
+                            "pair_id": pair_ids[symbol],
+                        }
+                        for drawing, symbol in zip(drawings, symbols)
+                    ],
+                ).all()
+                
+                point_ids = iter(self._allocate_point_ids(db, sum(len(s.points) for d in drawings for s in d.series)))
+                packed = [
+                    [[[next(point_ids), p.x, p.y] for p in series_data.points] for series_data in drawing.series]
+                    for drawing in drawings
+                ]
+                series_rows = [
+                    {
+                        "drawing_id": drawing_id,
+                        "order_index": series_idx,
+                        "name": series_data.name,
+                        "style": series_data.style,
+                        "points_packed": points if self._packed() else None,
+                    }
+                    for drawing, drawing_id, drawing_points in zip(drawings, drawing_ids, packed)
+                    for series_idx, (series_data, points) in enumerate(zip(drawing.series, drawing_points))
+                ]
+                series_ids = iter(db.scalars(
+                    insert(SeriesModel).returning(SeriesModel.id, sort_by_parameter_order=True), series_rows
+                ).all() if series_rows else [])
+                
+                # Detached models shaped like the stored drawings, to log them exactly as reads return them
+                models = [
+                    DrawingModel(
+                        id=drawing_id,
+                        name=drawing.name,
+                        type=drawing.type,
+                        color=self._drawing_color(drawing),
+                        is_incomplete=bool(drawing.isIncomplete),
+                        pair=PairModel(symbol=symbol),
+                        series=[
+                            SeriesModel(id=next(series_ids), name=series_data.name, style=series_data.style, points_packed=points)
+                            for series_data, points in zip(drawing.series, drawing_points)
+                        ],
+                    )
+                    for drawing, drawing_id, symbol, drawing_points in zip(drawings, drawing_ids, symbols, packed)
+                ]
+                if not self._packed():
+                    point_rows = [
+                        {"id": point_id, "series_id": series_model.id, "x": x, "y": y, "order_index": point_idx}
+                        for drawing_model in models
+                        for series_model in drawing_model.series
+                        for point_idx, (point_id, x, y) in enumerate(series_model.points_packed)
+                    ]
+                    if point_rows:
+                        db.execute(insert(PointModel), point_rows)
+                
+                event_ids = db.scalars(
+                    insert(DrawingEventModel).returning(DrawingEventModel.id, sort_by_parameter_order=True),
+                    [
+                        {
+                            "pair_id": pair_ids[symbol],
+                            "drawing_id": drawing_model.id,
+                            "op": "create",
+                            "data": self._drawing_model_to_schema(drawing_model).model_dump(),
+                        }
+                        for drawing_model, symbol in zip(models, symbols)
+                    ],
+                ).all()
+                snapshots: dict[int, int] = {}
+                for symbol, seq in zip(symbols, event_ids):
+                    snapshots[pair_ids[symbol]] = max(snapshots.get(pair_ids[symbol], 0), seq)
+                for pair_id, seq in snapshots.items():
+                    self._advance_snapshot(db, pair_id, seq)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
+        
+        for symbol in pair_ids:
+            self._notify_changed(symbol)
+        return sum(len(points) for drawing_points in packed for points in drawing_points)
     
     def update_drawing(self, drawing_id: int, updates: DrawingUpdate) -> Optional[Drawing]:
-        """Update an existing drawing"""
-        db = self._get_db()
-        try:
-            drawing_model = db.query(DrawingModel).options(
-                joinedload(DrawingModel.series).joinedload(SeriesModel.points)
-            ).filter(DrawingModel.id == drawing_id).first()
-            
-            if not drawing_model:
-                return None
-            
-            # Update basic fields
-            self._update_basic_drawing_fields(drawing_model, updates)
+        """
+        Update an existing drawing.
+        
+        Edits that only move existing series/points are buffered for
+        DRAWING_WRITE_COALESCE_MS and written together by flush_pending;
+        the returned drawing (and every read) already reflects them.
+        """
+        if settings.DRAWING_WRITE_COALESCE_MS > 0:
+            buffered = self._buffer_update(drawing_id, updates)
+            if buffered is not None:
+                return buffered
+        
+        with self._write_lock:
+            # Earlier buffered edits must land first; the database is authoritative afterwards
+            self.flush_pending()
+            self._discard_pending({drawing_id})
+            drawing_edits.inc(result="write_through")
             
-            # Update series if provided
-            if updates.series is not None:
-                self._update_series_data(db, drawing_model, updates.series)
+            db = self._get_db()
+            try:
+                drawing_model = db.query(DrawingModel).options(
+                    *self._load_options()
+                ).filter(DrawingModel.id == drawing_id).first()
+                
+                if not drawing_model:
+                    return None
+                
+                self._apply_update(db, drawing_model, updates)
+                
+                # Log the change with the ids it created, so replays and other tabs see them
+                db.flush()
+                db.refresh(drawing_model)
+                updated = self._drawing_model_to_schema(drawing_model)
+                seq = self._append_event(
+                    db, drawing_model.pair_id, drawing_id, "update",
+                    {**updates.model_dump(exclude_unset=True), **({"series": [series.model_dump() for series in updated.series]} if updates.series is not None else {})},
+                )
+                self._advance_snapshot(db, drawing_model.pair_id, seq)
+                db.commit()
+                self._notify_changed(updated.pair)
+                return updated
+            except _PERMANENT_ERRORS as e:
+                db.rollback()
+                raise ValueError(f"Invalid drawing update: {e}") from e
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
+    
+    def flush_pending(self) -> int:
+        """
+        Snapshot: write all logged edits that are not in the drawing tables
+        yet in one transaction, and advance each pair's snapshot_seq.
+        
+        Drawings keep serving reads from memory until the commit succeeds;
+        on a transient failure their edits are re-queued ahead of newer ones.
+        Edits the database rejects would fail every retry, so the drawings
+        are then written one at a time and the rejected ones' edits dropped.
+        
+        Returns:
+            int: Number of drawings written
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                self._flush_timer = None
+                batch = [(drawing_id, entry, entry.updates) for drawing_id, entry in self._pending.items() if entry.updates]
+                for _, entry, _ in batch:
+                    entry.updates = []
+            if not batch:
+                return 0
             
-            db.commit()
-            db.refresh(drawing_model)
+            pairs = {drawing_id: entry.model.pair.symbol for drawing_id, entry, _ in batch}
+            dropped: list[int] = []
+            try:
+                try:
+                    self._write_edits(batch)
+                except _PERMANENT_ERRORS:
+                    written = []
+                    for item in batch:
+                        try:
+                            self._write_edits([item])
+                            written.append(item)
+                        except _PERMANENT_ERRORS as e:
+                            logger.error("Dropping buffered edits of drawing %d rejected by the database: %s", item[0], e)
+                            dropped.append(item[0])
+                    batch = written
+                    self._write_edits([], dropped)
+            except Exception:
+                with self._pending_lock:
+                    for drawing_id, entry, updates in batch:
+                        if drawing_id not in dropped and self._pending.get(drawing_id) is entry:
+                            entry.updates = updates + entry.updates
+                    self._schedule_flush()
+                raise
+            finally:
+                if dropped:
+                    # Reads fall back to the tables, which never saw the edits
+                    self._discard_pending(set(dropped))
+                    drawing_edits.inc(len(dropped), result="dropped")
             
-            return self._drawing_model_to_schema(drawing_model)
-        except Exception as e:
-            db.rollback()
-            raise e
+            with self._pending_lock:
+                for drawing_id, entry, _ in batch:
+                    if self._pending.get(drawing_id) is entry and not entry.updates:
+                        del self._pending[drawing_id]
+            drawing_edit_flushes.inc()
+        
+        for pair in {pairs[drawing_id] for drawing_id in dropped}:
+            self._notify_changed(pair)
+        return len(batch)
+    
+    def claim_database(self):
+        """
+        Take an exclusive lock on the SQLite database for the life of the
+        process. Run at startup, before recovering the log.
+        
+        The write-behind buffer and the snapshot order live in this process:
+        a second worker would read drawings without the buffered edits and
+        advance snapshots out of order. It refuses to start instead.
+        
+        Raises:
+            RuntimeError: If another process already serves the database
+        """
+        database = engine.url.database
+        if self._process_lock is not None or engine.dialect.name != "sqlite" or database in (None, "", ":memory:"):
+            return
+        if fcntl is None:
+            logger.warning("Can't detect other workers on this platform; run a single worker for %s", database)
+            return
+        handle = open(f"{database}.worker-lock", "w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            raise RuntimeError(
+                f"Another process is already serving {database}. Drawing edits are buffered and "
+                "snapshotted per process, so run a single worker (no --workers > 1)."
+            )
+        self._process_lock = handle
+    
+    def recover_from_log(self) -> int:
+        """
+        Apply logged edits that never reached the drawing tables (the process
+        stopped before their snapshot) and advance the snapshots. Run at startup.
+        
+        Each event is applied in its own transaction; an event the database
+        rejects is logged and skipped rather than blocking startup.
+        
+        Returns:
+            int: Number of events applied
+        """
+        applied = skipped = 0
+        with self._write_lock:
+            self.flush_pending()
+            db = self._get_db()
+            try:
+                events = (
+                    db.query(DrawingEventModel.id, DrawingEventModel.pair_id, DrawingEventModel.drawing_id, DrawingEventModel.op, DrawingEventModel.data)
+                    .join(PairModel, DrawingEventModel.pair_id == PairModel.id)
+                    .filter(DrawingEventModel.id > PairModel.snapshot_seq)
+                    .order_by(DrawingEventModel.id)
+                    .all()
+                )
+                for seq, pair_id, drawing_id, op, data in events:
+                    try:
+                        # create/delete/clear are committed together with their tables, only updates can lag
+                        if op == "update":
+                            drawing_model = db.query(DrawingModel).options(
+                                *self._load_options()
+                            ).filter(DrawingModel.id == drawing_id).first()
+                            if drawing_model:
+                                self._apply_update(db, drawing_model, DrawingUpdate.model_validate(data))
+                        self._advance_snapshot(db, pair_id, seq)
+                        db.commit()
+                        applied += 1
+                    except _PERMANENT_ERRORS as e:
+                        db.rollback()
+                        logger.error("Skipping drawing change %d that can't be applied: %s", seq, e)
+                        self._advance_snapshot(db, pair_id, seq)
+                        db.commit()
+                        skipped += 1
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
+        
+        if applied or skipped:
+            logger.info("Recovered %d drawing change(s) from the log, skipped %d", applied, skipped)
+            self._notify_changed(None)
+        return applied
+    
+    def get_changes(self, pair: str, since: int = 0, limit: Optional[int] = None) -> tuple[list[DrawingChange], int, int]:
+        """
+        Read a pair's change log after sequence number `since`, oldest first.
+        
+        Returns:
+            tuple: (changes, snapshot_seq, truncated_seq); events up to
+            truncated_seq are gone, so readers behind it must reload drawings
+        """
+        db = self._get_db()
+        try:
+            pair_model = db.query(PairModel).filter(PairModel.symbol == pair.upper()).first()
+            if pair_model is None:
+                raise ValueError(f"Pair '{pair.upper()}' does not exist.")
+            query = (
+                db.query(DrawingEventModel)
+                .filter(DrawingEventModel.pair_id == pair_model.id, DrawingEventModel.id > since)
+                .order_by(DrawingEventModel.id)
+            )
+            if limit is not None:
+                query = query.limit(limit)
+            changes = [
+                DrawingChange(seq=event.id, drawing_id=event.drawing_id, op=event.op, data=event.data, created_at=event.created_at)
+                for event in query
+            ]
+            return changes, pair_model.snapshot_seq, pair_model.truncated_seq
         finally:
             db.close()
     
+    def truncate_log(self, pair: str, before: Optional[int] = None) -> tuple[int, int]:
+        """
+        Take a snapshot, then delete a pair's logged events up to `before`
+        (default: everything the snapshot covers; never past it).
+        
+        Returns:
+            tuple: (events deleted, new truncated_seq)
+        """
+        with self._write_lock:
+            self.flush_pending()
+            db = self._get_db()
+            try:
+                pair_model = db.query(PairModel).filter(PairModel.symbol == pair.upper()).first()
+                if pair_model is None:
+                    raise ValueError(f"Pair '{pair.upper()}' does not exist.")
+                cutoff = pair_model.snapshot_seq if before is None else min(before, pair_model.snapshot_seq)
+                deleted = db.query(DrawingEventModel).filter(
+                    DrawingEventModel.pair_id == pair_model.id, DrawingEventModel.id <= cutoff
+                ).delete(synchronize_session=False)
+                pair_model.truncated_seq = max(pair_model.truncated_seq, cutoff)
+                db.commit()
+                return deleted, pair_model.truncated_seq
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
+    
     def delete_drawing(self, drawing_id: int) -> bool:
         """Delete a drawing by ID"""
-        db = self._get_db()
-        try:
-            drawing_model = db.query(DrawingModel).filter(DrawingModel.id == drawing_id).first()
-            
-            if not drawing_model:
-                return False
+        with self._write_lock:
+            self.flush_pending()
             
-            db.delete(drawing_model)
-            db.commit()
-            return True
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
+            db = self._get_db()
+            try:
+                row = (
+                    db.query(DrawingModel.pair_id, PairModel.symbol)
+                    .join(PairModel, DrawingModel.pair_id == PairModel.id)
+                    .filter(DrawingModel.id == drawing_id)
+                    .first()
+                )
+                
+                if not row:
+                    return False
+                
+                pair_id, pair_symbol = row
+                self._discard_pending({drawing_id})
+                seq = self._append_event(db, pair_id, drawing_id, "delete")
+                self._advance_snapshot(db, pair_id, seq)
+                self._delete_drawings(db, [drawing_id])
+                db.commit()
+                self._notify_changed(pair_symbol)
+                return True
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
     
     def delete_all_drawings(self, pair: Optional[str] = None) -> int:
         """Delete all drawings, optionally filtered by pair. Returns count of deleted drawings."""
-        db = self._get_db()
-        try:
-            query = db.query(DrawingModel)
-            
-            if pair:
-                query = query.join(PairModel).filter(PairModel.symbol == pair.upper())
-            
-            deleted_count = query.delete(synchronize_session=False)
-            db.commit()
+        with self._write_lock:
+            self.flush_pending()
             
-            return deleted_count
-        except Exception as e:
-            db.rollback()
-            raise e
-        finally:
-            db.close()
+            db = self._get_db()
+            try:
+                pair_query = db.query(PairModel.id)
+                if pair:
+                    pair_query = pair_query.filter(PairModel.symbol == pair.upper())
+                pair_ids = [pair_id for (pair_id,) in pair_query.all()]
+                drawing_ids = select(DrawingModel.id).where(DrawingModel.pair_id.in_(pair_ids))
+                
+                self._discard_pending(set(db.scalars(drawing_ids)) if pair else None)
+                for pair_id in pair_ids:
+                    self._advance_snapshot(db, pair_id, self._append_event(db, pair_id, None, "clear"))
+                deleted_count = self._delete_drawings(db, drawing_ids)
+                db.commit()
+                self._notify_changed(pair.upper() if pair else None)
+                
+                return deleted_count
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
 
+    
+    def purge_orphans(self) -> dict[str, int]:
+        """
+        Delete rows left behind by deletes that skipped cascades: drawings of
+        missing pairs, series of missing drawings, points of missing series
+        and point rows shadowed by a packed copy of their series, plus change
+        log events of missing pairs.
+        
+        Returns:
+            dict: Rows deleted per table
+        """
+        with self._write_lock:
+            self.flush_pending()
+            db = self._get_db()
+            try:
+                # Orphaned graphs are collected top-down and deleted bottom-up, so rows
+                # removed through ON DELETE CASCADE are still counted
+                orphan_drawings = select(DrawingModel.id).where(DrawingModel.pair_id.not_in(select(PairModel.id)))
+                orphan_series = select(SeriesModel.id).where(
+                    SeriesModel.drawing_id.not_in(select(DrawingModel.id)) | SeriesModel.drawing_id.in_(orphan_drawings)
+                )
+                # Python None is stored as JSON 'null', so test for an actual array
+                packed_series = select(SeriesModel.id).where(func.json_type(SeriesModel.points_packed) == "array")
+                purged = {
+                    "points": db.execute(
+                        delete(PointModel).where(
+                            PointModel.series_id.not_in(select(SeriesModel.id))
+                            | PointModel.series_id.in_(orphan_series)
+                            | PointModel.series_id.in_(packed_series)
+                        )
+                    ).rowcount,
+                    "series": db.execute(delete(SeriesModel).where(SeriesModel.id.in_(orphan_series))).rowcount,
+                    "drawings": db.execute(delete(DrawingModel).where(DrawingModel.id.in_(orphan_drawings))).rowcount,
+                    "drawing_events": db.execute(
+                        delete(DrawingEventModel).where(DrawingEventModel.pair_id.not_in(select(PairModel.id)))
+                    ).rowcount,
+                }
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                raise e
+            finally:
+                db.close()
+        
+        if purged["drawings"]:
+            self._discard_pending()
+            self._notify_changed(None)
+        return purged
 
 # Singleton instance
 drawing_service = DrawingService()
@@ -0,0 +1,225 @@
+import io
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+from app.services.candle_store import CandleArrays, CandleStore, candle_store
+from app.services.data_service import data_service
+
+
+# Broker export layout (MT4/MT5 style); spread and real_volume are not stored
+CSV_COLUMNS = ["time", "open", "high", "low", "close", "tick_volume", "spread", "real_volume"]
+USED_COLUMNS = ["time", "open", "high", "low", "close", "tick_volume"]
+
+# SYMBOL_TIMEFRAME[_anything].csv, e.g. EURUSD_15m_1year.csv
+FILENAME_PATTERN = re.compile(r"^(?P<symbol>[A-Za-z0-9.]+)_(?P<timeframe>\d+[smhdw])(?:_.*)?$")
+
+MODES = ("append", "overwrite")
+
+
+@dataclass
+class IngestReport:
+    """Outcome of ingesting the files of one symbol/timeframe"""
+    symbol: str
+    timeframe: str
+    files: int
+    rows_parsed: int
+    duplicates: int
+    rows_added: int
+    rows_total: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_parsed / self.seconds if self.seconds > 0 else 0.0
+
+
+def parse_filename(path: Path) -> tuple[str, str]:
+    """Symbol and timeframe encoded in an export's file name"""
+    match = FILENAME_PATTERN.match(path.stem)
+    if not match:
+        raise ValueError(f"Cannot infer symbol/timeframe from {path.name} (expected SYMBOL_TIMEFRAME.csv)")
+    return match.group("symbol").upper(), match.group("timeframe")
+
+
+def _check_header(path: Path) -> int:
+    """Validate the header line and return the offset of the first data row"""
+    with open(path, "rb") as f:
+        header = f.readline()
+    columns = [column.strip().lower() for column in header.decode("utf-8-sig").split(",")]
+    if columns != CSV_COLUMNS:
+        raise ValueError(f"{path.name}: expected columns {','.join(CSV_COLUMNS)}, got {header.decode().strip()}")
+    return len(header)
+
+
+def _split_chunks(path: Path, start: int, chunk_bytes: int) -> list[tuple[int, int]]:
+    """Split the data rows into byte ranges that end on line boundaries"""
+    size = path.stat().st_size
+    ranges = []
+    with open(path, "rb") as f:
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_chunk(path: str, start: int, end: int) -> CandleArrays:
+    """Parse one byte range of an export (runs in a worker process)"""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=CSV_COLUMNS,
+        usecols=USED_COLUMNS,
+        dtype={"open": np.float64, "high": np.float64, "low": np.float64, "close": np.float64, "tick_volume": np.int64},
+    )
+    if df["time"].dtype.kind in "iu":
+        times = df["time"].to_numpy(dtype=np.int64)
+    else:
+        # Exports with formatted dates, e.g. "2024.09.16 00:00" (taken as UTC)
+        parsed = pd.to_datetime(df["time"].str.replace(".", "-", n=2, regex=False), utc=True)
+        times = parsed.astype("int64").to_numpy() // 1_000_000_000
+    return CandleArrays(
+        time=times,
+        open=df["open"].to_numpy(),
+        high=df["high"].to_numpy(),
+        low=df["low"].to_numpy(),
+        close=df["close"].to_numpy(),
+        volume=df["tick_volume"].to_numpy(),
+    )
+
+
+def dedupe_sorted(arrays: CandleArrays) -> tuple[CandleArrays, int]:
+    """Sort by time and keep the last row of each duplicate timestamp"""
+    order = np.argsort(arrays.time, kind="stable")
+    times = arrays.time[order]
+    keep = order[np.append(times[1:] != times[:-1], True)] if len(times) else order
+    return CandleArrays(*(column[keep] for column in arrays)), len(order) - len(keep)
+
+
+def _month_bounds(start: int, end: int) -> tuple[int, int]:
+    """First second of start's month and last second of end's month"""
+    first = np.datetime64(start, "s").astype("datetime64[M]")
+    last = np.datetime64(end, "s").astype("datetime64[M]") + 1
+    return int(first.astype("datetime64[s]").astype(np.int64)), int(last.astype("datetime64[s]").astype(np.int64)) - 1
+
+
+class IngestService:
+    """Parse broker CSV exports in parallel and merge them into the candle store"""
+
+    def __init__(self, store: CandleStore):
+        self.store = store
+
+    def discover(
+        self,
+        source: Path,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ) -> dict[tuple[str, str], list[Path]]:
+        """Group the CSV files of a file or directory by (symbol, timeframe)"""
+        paths = sorted(source.rglob("*.csv")) if source.is_dir() else [source]
+        groups: dict[tuple[str, str], list[Path]] = {}
+        for path in paths:
+            if symbol and timeframe:
+                key = (symbol.upper(), timeframe)
+            else:
+                parsed_symbol, parsed_timeframe = parse_filename(path)
+                key = ((symbol or parsed_symbol).upper(), timeframe or parsed_timeframe)
+            groups.setdefault(key, []).append(path)
+        return groups
+
+    def merge(self, symbol: str, timeframe: str, incoming: CandleArrays, mode: str = "append") -> tuple[int, int]:
+        """
+        Merge sorted, unique candles into the store.
+
+        append: existing candles win, only new timestamps are added.
+        overwrite: the incoming time range replaces what is stored there.
+
+        Returns:
+            tuple: (rows added or replaced, total rows stored)
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        if len(incoming) == 0:
+            return 0, self.store.get_manifest(symbol, timeframe).rows if self.store.has(symbol, timeframe) else 0
+
+        # The store rewrites whole months, so merge against the months being touched
+        existing = CandleArrays.empty()
+        if self.store.has(symbol, timeframe):
+            lo, hi = _month_bounds(int(incoming.time[0]), int(incoming.time[-1]))
+            existing = self.store.load_range(symbol, timeframe, lo, hi)
+
+        if mode == "append":
+            incoming = CandleArrays(*(column[~np.isin(incoming.time, existing.time)] for column in incoming))
+            kept = existing
+        else:
+            outside = (existing.time < incoming.time[0]) | (existing.time > incoming.time[-1])
+            kept = CandleArrays(*(column[outside] for column in existing))
+
+        merged = CandleArrays.concat([kept, incoming])
+        order = np.argsort(merged.time, kind="stable")
+        merged = CandleArrays(*(column[order] for column in merged))
+        manifest = self.store.write(symbol, timeframe, merged)
+        # Histories cached by this process (e.g. when ingesting from the API) are outdated now
+        data_service.clear_cache(symbol)
+        return len(incoming), manifest.rows if manifest else 0
+
+    def ingest(
+        self,
+        source: Path,
+        mode: str = "append",
+        workers: Optional[int] = None,
+        chunk_bytes: int = 16 * 1024 * 1024,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None
+    ) -> list[IngestReport]:
+        """Ingest a file or directory of exports, parsing chunks across `workers` processes"""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        groups = self.discover(Path(source), symbol, timeframe)
+        if not groups:
+            raise FileNotFoundError(f"No CSV files found in {source}")
+
+        reports = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            for (group_symbol, group_timeframe), paths in groups.items():
+                started = time.perf_counter()
+                tasks = []
+                for path in paths:
+                    start = _check_header(path)
+                    tasks.extend((str(path), lo, hi) for lo, hi in _split_chunks(path, start, chunk_bytes))
+
+                # Chunks come back in submission order, so later files win on duplicates
+                parts = list(pool.map(_parse_chunk, *zip(*tasks))) if tasks else []
+                incoming = CandleArrays.concat(parts)
+                parsed = len(incoming)
+                incoming, duplicates = dedupe_sorted(incoming)
+                added, total = self.merge(group_symbol, group_timeframe, incoming, mode)
+
+                reports.append(IngestReport(
+                    symbol=group_symbol,
+                    timeframe=group_timeframe,
+                    files=len(paths),
+                    rows_parsed=parsed,
+                    duplicates=duplicates,
+                    rows_added=added,
+                    rows_total=total,
+                    seconds=time.perf_counter() - started,
+                ))
+        return reports
+
+
+# Singleton instance
+ingest_service = IngestService(candle_store)
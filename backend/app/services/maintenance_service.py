@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from threading import Lock
+from typing import Optional
+from app.core.config import settings
+from app.core.metrics import Counter, registry
+from app.database.session import engine
+from app.services.drawing_service import drawing_service
+
+
+logger = logging.getLogger(__name__)
+
+reclaimed_bytes = registry.register(Counter(
+    "db_maintenance_reclaimed_bytes_total", "Database file bytes released by maintenance runs", ()
+))
+
+# PRAGMA auto_vacuum value of a database that releases free pages with PRAGMA incremental_vacuum
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+class MaintenanceService:
+    """
+    Keeps the drawings database compact: purges orphaned rows, refreshes the
+    query planner statistics and returns free pages to the file system.
+
+    The first full VACUUM also switches the database to incremental
+    auto-vacuum, after which scheduled runs only need PRAGMA
+    incremental_vacuum instead of rewriting the whole file.
+    """
+
+    def __init__(self):
+        self.last_report: Optional[dict] = None
+        self._lock = Lock()
+
+    def _pragma(self, conn, name: str) -> int:
+        return int(conn.exec_driver_sql(f"PRAGMA {name}").scalar())
+
+    def _file_stats(self, conn) -> tuple[int, int]:
+        """(database size, free space inside it) in bytes"""
+        page_size = self._pragma(conn, "page_size")
+        return self._pragma(conn, "page_count") * page_size, self._pragma(conn, "freelist_count") * page_size
+
+    def run(self, full_vacuum: bool = False) -> dict:
+        """
+        Purge orphans, ANALYZE and vacuum (incrementally when the database
+        supports it, fully when asked or when it doesn't yet).
+
+        Returns:
+            dict: Report with rows purged per table and bytes reclaimed
+        """
+        with self._lock:
+            started = time.perf_counter()
+            purged = drawing_service.purge_orphans()
+            report = {"purged": purged, "vacuum": "none"}
+
+            if engine.dialect.name == "sqlite":
+                # VACUUM can't run inside a transaction
+                with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    size_before, free_before = self._file_stats(conn)
+                    conn.exec_driver_sql("ANALYZE")
+                    if full_vacuum or self._pragma(conn, "auto_vacuum") != _AUTO_VACUUM_INCREMENTAL:
+                        # Only takes effect through a VACUUM, which this one is
+                        conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+                        conn.exec_driver_sql("VACUUM")
+                        report["vacuum"] = "full"
+                    else:
+                        # execute() steps the pragma once, freeing a single page; executescript() runs it to completion
+                        conn.connection.driver_connection.executescript("PRAGMA incremental_vacuum")
+                        report["vacuum"] = "incremental"
+                    size_after, free_after = self._file_stats(conn)
+                report.update(
+                    size_before=size_before,
+                    size_after=size_after,
+                    free_before=free_before,
+                    free_after=free_after,
+                    reclaimed_bytes=max(0, size_before - size_after),
+                )
+                reclaimed_bytes.inc(report["reclaimed_bytes"])
+
+            report["duration_seconds"] = round(time.perf_counter() - started, 3)
+            report["finished_at"] = time.time()
+            self.last_report = report
+        logger.info(
+            "Database maintenance: purged %s, %s vacuum reclaimed %d bytes in %.2fs",
+            purged, report["vacuum"], report.get("reclaimed_bytes", 0), report["duration_seconds"]
+        )
+        return report
+
+    async def run_periodically(self):
+        """Run maintenance every MAINTENANCE_INTERVAL_HOURS in a worker thread"""
+        while True:
+            await asyncio.sleep(settings.MAINTENANCE_INTERVAL_HOURS * 3600)
+            try:
+                await asyncio.to_thread(self.run)
+            except Exception:
+                # A failed run (e.g. the database is busy) is retried at the next interval
+                logger.exception("Database maintenance failed")
+
+
+# Singleton instance
+maintenance_service = MaintenanceService()
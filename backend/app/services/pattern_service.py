@@ -0,0 +1,147 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.data_service import data_service
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    """A historical window similar to the query window"""
+    symbol: str
+    start_time: int
+    end_time: int
+    distance: float
+
+
+class PatternIndex:
+    """
+    Precomputed distance-profile index over one symbol's closes.
+
+    Holds the FFT of the full close series (padded for the longest allowed
+    window) and cumulative sums of the closes and their squares. Nothing
+    depends on the window length, so one index serves every selection: a query
+    costs one FFT of the query, one inverse FFT (MASS algorithm) and a
+    difference of prefix sums for the rolling mean/std.
+    """
+
+    def __init__(self, time: np.ndarray, close: np.ndarray, max_window: int):
+        self.time = time
+        self.n = len(close)
+        self.nfft = 1 << int(np.ceil(np.log2(self.n + max_window)))
+        # Centering the series keeps the FFT dot products precise
+        self.offset = float(close.mean())
+        close = close - self.offset
+        self.series_fft = np.fft.rfft(close, self.nfft)
+        self.csum = np.concatenate(([0.0], np.cumsum(close)))
+        self.csum2 = np.concatenate(([0.0], np.cumsum(close * close)))
+
+    def window_stats(self, m: int) -> tuple[np.ndarray, np.ndarray]:
+        """Mean and std of every length-`m` window"""
+        window_sum = self.csum[m:] - self.csum[:-m]
+        window_sum2 = self.csum2[m:] - self.csum2[:-m]
+        mean = window_sum / m
+        std = np.sqrt(np.maximum(window_sum2 / m - mean ** 2, 0.0))
+        return mean, std
+
+    def distance_profile(self, query: np.ndarray) -> np.ndarray:
+        """Z-normalized Euclidean distance from `query` to every window"""
+        m = len(query)
+        if m > self.n:
+            raise ValueError(f"Not enough data: need {m} bars, have {self.n}")
+        n_windows = self.n - m + 1
+        mean, std = self.window_stats(m)
+        query = query - self.offset
+        q_mean = query.mean()
+        q_std = query.std()
+        if q_std == 0:
+            raise ValueError("Query window is flat; shape distance is undefined")
+
+        query_fft = np.fft.rfft(query[::-1], self.nfft)
+        dot = np.fft.irfft(self.series_fft * query_fft, self.nfft)[m - 1:m - 1 + n_windows]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = (dot - m * q_mean * mean) / (m * q_std * std)
+        distance = np.sqrt(np.maximum(2.0 * m * (1.0 - corr), 0.0))
+        distance[std == 0] = np.inf
+        return distance
+
+
+class PatternService:
+    """Service for finding historical windows with a similar normalized shape"""
+
+    def __init__(self):
+        self._index_cache = LRUCache(settings.PATTERN_INDEX_CACHE_SIZE)
+
+    def get_index(self, symbol: str) -> PatternIndex:
+        """Get (or build and cache) the index of a symbol, rebuilt when its data changes"""
+        key = (symbol, data_service.get_data_version(symbol))
+        index = self._index_cache.get(key)
+        if index is None:
+            arrays = data_service.get_arrays(symbol)
+            index = PatternIndex(arrays.time, arrays.close, settings.PATTERN_MAX_WINDOW)
+            self._index_cache.set(key, index)
+        return index
+
+    def get_query_window(self, symbol: str, start_time: int, end_time: int) -> tuple[np.ndarray, int, int]:
+        """
+        Get the closes of a symbol between two timestamps (inclusive)
+
+        Returns:
+            tuple: (closes, start_index, end_index_exclusive)
+        """
+        arrays = data_service.get_arrays(symbol)
+        start = int(np.searchsorted(arrays.time, start_time, side="left"))
+        end = int(np.searchsorted(arrays.time, end_time, side="right"))
+        m = end - start
+        if m < settings.PATTERN_MIN_WINDOW or m > settings.PATTERN_MAX_WINDOW:
+            raise ValueError(
+                f"Selected window has {m} candles; must be between "
+                f"{settings.PATTERN_MIN_WINDOW} and {settings.PATTERN_MAX_WINDOW}"
+            )
+        return arrays.close[start:end], start, end
+
+    def search(
+        self,
+        symbol: str,
+        start_time: int,
+        end_time: int,
+        k: int = 10,
+        symbols: Optional[list[str]] = None,
+    ) -> list[PatternMatch]:
+        """Find the `k` windows most similar in shape to `symbol`'s [start_time, end_time] window"""
+        query, query_start, query_end = self.get_query_window(symbol, start_time, end_time)
+        m = len(query)
+        # Matches closer than half a window to each other are the same pattern
+        exclusion = max(1, m // 2)
+
+        matches: list[PatternMatch] = []
+        # The catalog only offers symbols that have candles at the searched timeframe
+        for candidate in symbols or data_service.list_symbols(settings.DEFAULT_TIMEFRAME):
+            index = self.get_index(candidate)
+            if candidate != symbol and index.n < m:
+                continue  # Too short to hold a window of this length
+            profile = index.distance_profile(query)
+            if candidate == symbol:
+                profile[max(0, query_start - exclusion):query_end] = np.inf
+
+            for _ in range(k):
+                idx = int(np.argmin(profile))
+                distance = float(profile[idx])
+                if not np.isfinite(distance):
+                    break
+                matches.append(PatternMatch(
+                    symbol=candidate,
+                    start_time=int(index.time[idx]),
+                    end_time=int(index.time[idx + m - 1]),
+                    distance=distance,
+                ))
+                profile[max(0, idx - exclusion):idx + exclusion + 1] = np.inf
+
+        matches.sort(key=lambda match: match.distance)
+        return matches[:k]
+
+
+# Singleton instance
+pattern_service = PatternService()
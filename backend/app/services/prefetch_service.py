@@ -0,0 +1,125 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import Counter, record_cache, registry
+
+
+logger = logging.getLogger(__name__)
+
+prefetches = registry.register(Counter(
+    "candle_prefetches_total", "Speculative candle page renders by outcome", ("result",)
+))
+
+
+@dataclass
+class _Pattern:
+    """What a symbol's readers did last and how often the prediction was right"""
+    expected: Optional[Hashable] = None  # Page key predicted to be requested next
+    accuracy: float = 1.0  # Moving average of correct predictions
+
+
+class PrefetchService:
+    """
+    Renders the candle page a scrolling chart is likely to ask for next.
+
+    Scrolling is predictable: after a page in one direction the next request
+    is almost always the adjacent page in the same direction (and after the
+    initial, most recent page, the one before it). Predicted pages are
+    rendered on a single background thread into a small cache of their own,
+    so speculation never evicts pages that were actually requested, and the
+    thread's CPU time is capped at CANDLE_PREFETCH_CPU_BUDGET of one core.
+    Symbols whose readers stop following the prediction (jumping around the
+    history) are no longer prefetched until they do again.
+    """
+
+    def __init__(self):
+        self._cache = LRUCache(settings.CANDLE_PREFETCH_CACHE_SIZE)
+        self._patterns = LRUCache(1024)  # (symbol, timeframe) -> _Pattern
+        self._inflight: set = set()
+        self._lock = Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # CPU seconds the worker may spend; refilled at the budget rate, at most one second's worth
+        self._cpu_tokens = settings.CANDLE_PREFETCH_CPU_BUDGET
+        self._refilled = time.monotonic()
+
+    def take(self, key: Hashable) -> Optional[Any]:
+        """Remove and return a prefetched page (the caller moves it to its own cache)"""
+        value = self._cache.pop(key)
+        if value is not None:
+            prefetches.inc(result="used")
+        return value
+
+    def predict_direction(self, cursor: Optional[int], direction: str) -> str:
+        """Direction of the page most likely requested after this one"""
+        # The initial page is the most recent one; readers scroll back from there
+        return direction if cursor is not None else "prev"
+
+    def record(self, pattern_key: Hashable, key: Hashable):
+        """Score the previous prediction for a symbol against the page actually requested"""
+        pattern = self._patterns.get(pattern_key)
+        if pattern is None or pattern.expected is None:
+            return
+        hit = pattern.expected == key
+        pattern.accuracy = 0.8 * pattern.accuracy + 0.2 * (1.0 if hit else 0.0)
+        pattern.expected = None
+        record_cache("candle_prefetch_predictions", hit=hit)
+
+    def expect(self, pattern_key: Hashable, key: Hashable, render: Callable[[], Any], cached: bool = False):
+        """
+        Predict `key` as the next page for a symbol and render it in the
+        background unless it is already cached, the symbol's predictions have
+        been poor, or the CPU budget is spent.
+        """
+        pattern = self._patterns.get(pattern_key)
+        if pattern is None:
+            pattern = _Pattern()
+            self._patterns.set(pattern_key, pattern)
+        pattern.expected = key
+
+        if cached or key in self._cache:
+            return
+        if pattern.accuracy < settings.CANDLE_PREFETCH_MIN_ACCURACY:
+            prefetches.inc(result="skipped_pattern")
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            budget = settings.CANDLE_PREFETCH_CPU_BUDGET
+            self._cpu_tokens = min(budget, self._cpu_tokens + (now - self._refilled) * budget)
+            self._refilled = now
+            if key in self._inflight:
+                return
+            # One render at a time: a backlog would only hold predictions that are already stale
+            if self._inflight or self._cpu_tokens <= 0:
+                prefetches.inc(result="skipped_budget")
+                return
+            self._inflight.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="candle-prefetch")
+        self._executor.submit(self._run, key, render)
+
+    def _run(self, key: Hashable, render: Callable[[], Any]):
+        start = time.thread_time()
+        try:
+            self._cache.set(key, render())
+            prefetches.inc(result="rendered")
+        except Exception as e:
+            # The request itself will surface the error if the reader gets there
+            logger.debug("Prefetch of %s failed: %s", key, e)
+            prefetches.inc(result="failed")
+        finally:
+            with self._lock:
+                self._cpu_tokens -= time.thread_time() - start
+                self._inflight.discard(key)
+
+    def clear(self):
+        self._cache.clear()
+
+
+# Singleton instance
+prefetch_service = PrefetchService()
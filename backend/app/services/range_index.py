@@ -0,0 +1,183 @@
+"""
+Constant-time range aggregates over a symbol's candles.
+
+Highest high / lowest low use a block sparse table: positions are split into
+blocks of BLOCK bars, each position stores the argmax of its block prefix and
+suffix, and a sparse table covers the block maxima. A range spanning several
+blocks is answered from one suffix, one prefix and two overlapping sparse
+table entries; a range inside one block scans at most BLOCK bars. Memory is
+~2 ints per bar plus (n / BLOCK) * log2(n / BLOCK) for the table, instead of
+n * log2(n) for a plain sparse table. Volume sums use prefix sums.
+
+All queries are vectorized over arrays of ranges.
+"""
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+from app.services.candle_store import CandleArrays
+
+
+BLOCK = 32
+
+
+@dataclass
+class RangeStats:
+    """Aggregates of the candles with start_time <= time <= end_time"""
+    start_time: int
+    end_time: int
+    bars: int
+    high: Optional[float] = None
+    high_time: Optional[int] = None
+    low: Optional[float] = None
+    low_time: Optional[int] = None
+    volume: int = 0
+    open: Optional[float] = None
+    close: Optional[float] = None
+
+
+def _better(values: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Positions holding the larger value (a wins ties; a precedes b)"""
+    return np.where(values[b] > values[a], b, a)
+
+
+class _ArgMaxIndex:
+    """Earliest argmax of any [lo, hi] position range in O(1)"""
+
+    def __init__(self, values: np.ndarray):
+        self.values = values
+        n = len(values)
+        n_blocks = max(1, -(-n // BLOCK))
+        padded = np.full(n_blocks * BLOCK, -np.inf)
+        padded[:n] = values
+        blocks = padded.reshape(n_blocks, BLOCK)
+        columns = np.arange(BLOCK)
+        offsets = (np.arange(n_blocks) * BLOCK)[:, None]
+
+        # Prefix argmax: position of the last strict new maximum from the block start
+        running = np.maximum.accumulate(blocks, axis=1)
+        previous = np.concatenate((np.full((n_blocks, 1), -np.inf), running[:, :-1]), axis=1)
+        prefix = np.maximum.accumulate(np.where(blocks > previous, columns, 0), axis=1)
+        self._prefix = (prefix + offsets).ravel()[:n].astype(np.int32)
+
+        # Suffix argmax: same on the reversed block, ties going to the earlier bar
+        reverse = blocks[:, ::-1]
+        running = np.maximum.accumulate(reverse, axis=1)
+        previous = np.concatenate((np.full((n_blocks, 1), -np.inf), running[:, :-1]), axis=1)
+        suffix = np.maximum.accumulate(np.where(reverse >= previous, columns, 0), axis=1)
+        self._suffix = ((BLOCK - 1 - suffix)[:, ::-1] + offsets).ravel()[:n].astype(np.int32)
+
+        # Sparse table over block argmaxes: level k covers 2**k blocks
+        self._values = padded
+        level = (np.argmax(blocks, axis=1) + offsets[:, 0]).astype(np.int32)
+        self._table = [level]
+        span = 1
+        while span * 2 <= n_blocks:
+            level = _better(padded, level[:-span], level[span:]).astype(np.int32)
+            self._table.append(level)
+            span *= 2
+
+    def query(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        """Argmax positions of [lo, hi] ranges (lo <= hi, both inclusive)"""
+        result = np.empty(len(lo), dtype=np.int64)
+        block_lo = lo // BLOCK
+        block_hi = hi // BLOCK
+
+        same = block_lo == block_hi
+        if same.any():
+            # Short range: scan at most one block
+            starts = lo[same]
+            positions = starts[:, None] + np.arange(BLOCK)
+            inside = positions <= hi[same][:, None]
+            window = np.where(inside, self._values[np.minimum(positions, len(self._values) - 1)], -np.inf)
+            result[same] = starts + np.argmax(window, axis=1)
+
+        cross = ~same
+        if cross.any():
+            lo_c, hi_c = lo[cross], hi[cross]
+            best = _better(self.values, self._suffix[lo_c], self._prefix[hi_c])
+            first = block_lo[cross] + 1
+            count = block_hi[cross] - first
+            middle = count > 0
+            if middle.any():
+                first, count = first[middle], count[middle]
+                level = np.floor(np.log2(count)).astype(np.int64)
+                inner = np.empty(len(first), dtype=np.int64)
+                for k in np.unique(level):
+                    rows = level == k
+                    table = self._table[k]
+                    inner[rows] = _better(
+                        self._values, table[first[rows]], table[first[rows] + count[rows] - (1 << k)]
+                    )
+                # Middle blocks lie between the suffix and the prefix part
+                suffix_best = self._suffix[lo_c[middle]]
+                prefix_best = self._prefix[hi_c[middle]]
+                best[middle] = _better(self.values, _better(self.values, suffix_best, inner), prefix_best)
+            result[cross] = best
+        return result
+
+
+class RangeIndex:
+    """Range high/low/volume index of one symbol's candles"""
+
+    def __init__(self, arrays: CandleArrays):
+        self.arrays = arrays
+        self._high = _ArgMaxIndex(arrays.high)
+        self._low = _ArgMaxIndex(-arrays.low)
+        self._volume = np.concatenate(([0], np.cumsum(arrays.volume, dtype=np.int64)))
+
+    def positions(self, start_times: np.ndarray, end_times: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Inclusive [lo, hi] bar positions of time ranges (lo > hi when a range holds no bars)"""
+        lo = np.searchsorted(self.arrays.time, start_times, side="left")
+        hi = np.searchsorted(self.arrays.time, end_times, side="right") - 1
+        return lo, hi
+
+    def query(self, start_times, end_times) -> list[RangeStats]:
+        """Stats of each [start_time, end_time] range"""
+        start_times = np.asarray(start_times, dtype=np.int64)
+        end_times = np.asarray(end_times, dtype=np.int64)
+        lo, hi = self.positions(start_times, end_times)
+        valid = lo <= hi
+        if not valid.any():
+            return [
+                RangeStats(start_time=start, end_time=end, bars=0)
+                for start, end in zip(start_times.tolist(), end_times.tolist())
+            ]
+
+        high_pos = np.zeros(len(lo), dtype=np.int64)
+        low_pos = np.zeros(len(lo), dtype=np.int64)
+        high_pos[valid] = self._high.query(lo[valid], hi[valid])
+        low_pos[valid] = self._low.query(lo[valid], hi[valid])
+        volume = np.where(valid, self._volume[np.maximum(hi + 1, lo)] - self._volume[lo], 0)
+
+        arrays = self.arrays
+        # Empty ranges may point past the ends; clamp for the gather and discard below
+        last = len(arrays) - 1
+        lo_c, hi_c = np.minimum(lo, last), np.clip(hi, 0, last)
+        columns = zip(
+            start_times.tolist(), end_times.tolist(), valid.tolist(), (hi - lo + 1).tolist(),
+            *(
+                column.tolist()
+                for column in (
+                    arrays.high[high_pos], arrays.time[high_pos], arrays.low[low_pos], arrays.time[low_pos],
+                    volume, arrays.open[lo_c], arrays.close[hi_c],
+                )
+            ),
+        )
+        stats = []
+        for start, end, ok, bars, high, high_time, low, low_time, total, first, last_close in columns:
+            if not ok:
+                stats.append(RangeStats(start_time=start, end_time=end, bars=0))
+                continue
+            stats.append(RangeStats(
+                start_time=start,
+                end_time=end,
+                bars=bars,
+                high=high,
+                high_time=high_time,
+                low=low,
+                low_time=low_time,
+                volume=total,
+                open=first,
+                close=last_close,
+            ))
+        return stats
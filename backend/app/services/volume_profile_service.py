@@ -0,0 +1,184 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.services.candle_store import CandleArrays
+from app.services.data_service import data_service
+
+
+@dataclass
+class VolumeProfile:
+    """Volume traded per price bin over a time range"""
+    start_time: int
+    end_time: int
+    bars: int
+    bin_size: float
+    price_low: float = 0.0  # Lower edge of the first bin
+    volumes: Optional[np.ndarray] = None
+    poc_price: Optional[float] = None  # Midpoint of the bin with the most volume
+    value_area_low: Optional[float] = None
+    value_area_high: Optional[float] = None
+    total_volume: float = 0.0
+
+
+def _bin_volumes(arrays: CandleArrays, base: int, bin_size: float, n_bins: int, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Spread each bar's volume uniformly over its [low, high] range and sum it
+    per (group, price bin).
+
+    Bins fully inside a bar's range get volume / range-in-bins; the two end
+    bins get their overlapping fraction. The interior run is written as +d/-d
+    into a difference array, so every bar costs O(1) regardless of its range.
+
+    Returns:
+        (n_groups, n_bins) array
+    """
+    u = arrays.low / bin_size - base
+    w = arrays.high / bin_size - base
+    volume = arrays.volume.astype(np.float64)
+    first = np.clip(np.floor(u).astype(np.int64), 0, n_bins - 1)
+    last = np.clip(np.ceil(w).astype(np.int64) - 1, first, n_bins - 1)
+    single = first == last
+
+    width = np.where(single, 1.0, w - u)
+    density = volume / width
+    row = groups * n_bins
+    size = n_groups * n_bins
+
+    direct = np.bincount(row[single] + first[single], weights=volume[single], minlength=size)
+    multi = ~single
+    f, l, d, r = first[multi], last[multi], density[multi], row[multi]
+    ends = np.bincount(r + f, weights=d * (f + 1 - u[multi]), minlength=size)
+    ends += np.bincount(r + l, weights=d * (w[multi] - l), minlength=size)
+    # Interior bins first+1 .. last-1 (empty when last == first + 1)
+    interior = l > f + 1
+    diff = np.bincount(r[interior] + f[interior] + 1, weights=d[interior], minlength=size)
+    diff -= np.bincount(r[interior] + l[interior], weights=d[interior], minlength=size)
+    interior_volumes = np.cumsum(diff.reshape(n_groups, n_bins), axis=1)
+
+    return (direct + ends).reshape(n_groups, n_bins) + interior_volumes
+
+
+class VolumeProfileIndex:
+    """
+    Cumulative per-bin volume of one symbol at a fixed bin size.
+
+    checkpoints[c] holds the profile of bars [0, c * step), so the profile of
+    any window is two checkpoint lookups plus binning at most 2 * step edge
+    bars; sliding the visible window never re-bins the whole range. `step`
+    grows with the history so checkpoints stay within VOLUME_PROFILE_MAX_CELLS.
+    """
+
+    def __init__(self, arrays: CandleArrays, bin_size: float):
+        self.arrays = arrays
+        self.bin_size = bin_size
+        n = len(arrays)
+        self.base = int(np.floor(arrays.low.min() / bin_size)) if n else 0
+        top = int(np.floor(arrays.high.max() / bin_size)) if n else 0
+        self.n_bins = top - self.base + 1
+        if self.n_bins > settings.VOLUME_PROFILE_MAX_BINS:
+            raise ValueError(
+                f"bin_size {bin_size} gives {self.n_bins} bins over the price history; "
+                f"max is {settings.VOLUME_PROFILE_MAX_BINS}"
+            )
+
+        self.step = max(256, -(-n * self.n_bins // settings.VOLUME_PROFILE_MAX_CELLS))
+        n_blocks = -(-n // self.step)
+        groups = np.arange(n) // self.step
+        per_block = _bin_volumes(arrays, self.base, bin_size, self.n_bins, groups, n_blocks)
+        self.checkpoints = np.zeros((n_blocks + 1, self.n_bins))
+        np.cumsum(per_block, axis=0, out=self.checkpoints[1:])
+
+    def _cumulative(self, position: int) -> np.ndarray:
+        """Profile of bars [0, position)"""
+        block = position // self.step
+        start = block * self.step
+        profile = self.checkpoints[block].copy()
+        if position > start:
+            part = self.arrays.slice(start, position)
+            profile += _bin_volumes(part, self.base, self.bin_size, self.n_bins, np.zeros(len(part), dtype=np.int64), 1)[0]
+        return profile
+
+    def window(self, lo: int, hi: int) -> np.ndarray:
+        """Profile of bars [lo, hi)"""
+        return np.maximum(self._cumulative(hi) - self._cumulative(lo), 0.0)
+
+
+class VolumeProfileService:
+    """Service for price-binned volume histograms over arbitrary time ranges"""
+
+    def __init__(self):
+        self._index_cache = LRUCache(settings.VOLUME_PROFILE_CACHE_SIZE)
+
+    def get_index(self, symbol: str, bin_size: float, timeframe: Optional[str] = None) -> VolumeProfileIndex:
+        """Get (or build and cache) the cumulative profile index of a symbol for a bin size"""
+        timeframe = timeframe or settings.DEFAULT_TIMEFRAME
+        key = (symbol, timeframe, bin_size, data_service.get_data_version(symbol, timeframe))
+        index = self._index_cache.get(key)
+        record_cache("volume_profile", hit=index is not None)
+        if index is None:
+            index = VolumeProfileIndex(data_service.get_arrays(symbol, timeframe), bin_size)
+            self._index_cache.set(key, index)
+        return index
+
+    def get_profile(
+        self,
+        symbol: str,
+        start_time: int,
+        end_time: int,
+        bin_size: float,
+        timeframe: Optional[str] = None,
+        value_area: float = 0.7,
+    ) -> VolumeProfile:
+        """
+        Volume profile of the candles with start_time <= time <= end_time,
+        trimmed to the bins between the range's lowest low and highest high.
+        """
+        if bin_size <= 0:
+            raise ValueError("bin_size must be positive")
+        if start_time > end_time:
+            raise ValueError(f"start_time {start_time} is after end_time {end_time}")
+
+        index = self.get_index(symbol, bin_size, timeframe)
+        arrays = index.arrays
+        lo = int(np.searchsorted(arrays.time, start_time, side="left"))
+        hi = int(np.searchsorted(arrays.time, end_time, side="right"))
+        profile = VolumeProfile(start_time=start_time, end_time=end_time, bars=max(0, hi - lo), bin_size=bin_size)
+        if hi <= lo:
+            return profile
+
+        # Trim to the window's price range (O(1) from the range index)
+        stats = data_service.get_range_index(symbol, timeframe).query([start_time], [end_time])[0]
+        first = max(int(np.floor(stats.low / bin_size)) - index.base, 0)
+        last = min(int(np.floor(stats.high / bin_size)) - index.base, index.n_bins - 1)
+        volumes = index.window(lo, hi)[first:last + 1]
+
+        profile.price_low = (index.base + first) * bin_size
+        profile.volumes = volumes
+        profile.total_volume = float(volumes.sum())
+        if profile.total_volume > 0:
+            poc = int(np.argmax(volumes))
+            profile.poc_price = profile.price_low + (poc + 0.5) * bin_size
+
+            # Value area: grow from the POC towards the heavier neighbour until it holds `value_area`
+            low_bin = high_bin = poc
+            covered = volumes[poc]
+            target = value_area * profile.total_volume
+            while covered < target and (low_bin > 0 or high_bin < len(volumes) - 1):
+                below = volumes[low_bin - 1] if low_bin > 0 else -1.0
+                above = volumes[high_bin + 1] if high_bin < len(volumes) - 1 else -1.0
+                if above >= below:
+                    high_bin += 1
+                    covered += above
+                else:
+                    low_bin -= 1
+                    covered += below
+            profile.value_area_low = profile.price_low + low_bin * bin_size
+            profile.value_area_high = profile.price_low + (high_bin + 1) * bin_size
+        return profile
+
+
+# Singleton instance
+volume_profile_service = VolumeProfileService()
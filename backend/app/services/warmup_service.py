@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+from app.core.config import settings
+from app.services.data_service import data_service
+
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """Preloads configured symbols/timeframes at startup and reports progress for readiness probes"""
+
+    def __init__(self):
+        self.targets: list[tuple[str, str]] = []
+        self.loaded: list[str] = []
+        self.failed: dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def _resolve_targets(self) -> list[tuple[str, str]]:
+        symbols = settings.WARMUP_SYMBOLS
+        if "*" in symbols:
+            symbols = data_service.list_symbols()
+        return [(symbol.upper(), timeframe) for symbol in symbols for timeframe in settings.WARMUP_TIMEFRAMES]
+
+    def _load(self, symbol: str, timeframe: str):
+        """Build everything the first candle and range requests would otherwise pay for"""
+        data_service.get_arrays(symbol, timeframe)
+        data_service.get_range_index(symbol, timeframe)
+
+    async def run(self):
+        """Load every target in a worker thread, one at a time so requests keep a free core"""
+        self.targets = self._resolve_targets()
+        # A restarted app (e.g. a second lifespan in the same process) reports this run only
+        self.loaded, self.failed, self.finished_at = [], {}, None
+        self.started_at = time.perf_counter()
+        for symbol, timeframe in self.targets:
+            name = f"{symbol}:{timeframe}"
+            try:
+                await asyncio.to_thread(self._load, symbol, timeframe)
+                self.loaded.append(name)
+            except Exception as e:
+                # A missing symbol shouldn't keep the worker out of rotation forever
+                logger.warning("Warm-up of %s failed: %s", name, e)
+                self.failed[name] = str(e)
+        self.finished_at = time.perf_counter()
+        logger.info(
+            "Warm-up finished in %.2fs (%d loaded, %d failed)",
+            self.finished_at - self.started_at, len(self.loaded), len(self.failed)
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    def status(self) -> dict:
+        """Warm-up progress for the readiness endpoint"""
+        if self.finished_at is not None:
+            elapsed = self.finished_at - self.started_at
+        elif self.started_at is not None:
+            elapsed = time.perf_counter() - self.started_at
+        else:
+            elapsed = 0.0
+        return {
+            "status": "ready" if self.ready else "warming_up",
+            "total": len(self.targets),
+            "loaded": len(self.loaded),
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+
+# Singleton instance
+warmup_service = WarmupService()
@@ -0,0 +1,58 @@
+"""
+Compare two benchmark result files.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 0.1
+
+Exits with status 1 when any p50 latency regressed by more than the threshold,
+or when the candidate run had failed requests.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _flatten(results: dict) -> dict[str, dict]:
+    flat = {}
+    for group in ("micro", "load"):
+        for section, entries in results.get(group, {}).items():
+            if "mean_ms" in entries:
+                flat[f"{group}.{section}"] = entries
+                continue
+            for name, stats in entries.items():
+                flat[f"{group}.{section}.{name}"] = stats
+    return flat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative p50 slowdown")
+    args = parser.parse_args(argv)
+
+    baseline = _flatten(json.loads(args.baseline.read_text()))
+    candidate = _flatten(json.loads(args.candidate.read_text()))
+
+    regressions = 0
+    for name in sorted(baseline.keys() & candidate.keys()):
+        if candidate[name].get("errors"):
+            print(f"{name:55} {candidate[name]['errors']} failed request(s)  ERRORS")
+            regressions += 1
+            continue
+        if not baseline[name].get("count") or not candidate[name].get("count"):
+            continue  # Nothing succeeded in the baseline to compare against
+        old = baseline[name].get("p50_ms", baseline[name]["mean_ms"])
+        new = candidate[name].get("p50_ms", candidate[name]["mean_ms"])
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{name:55} {old:9.2f}ms -> {new:9.2f}ms  {change:+7.1%}{flag}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
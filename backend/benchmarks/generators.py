@@ -0,0 +1,130 @@
+"""
+Synthetic data generators for benchmarks.
+
+- OHLCV CSV files in the broker export layout used by the API
+  (time,open,high,low,close,tick_volume,spread,real_volume)
+- SQLite drawing databases with many drawings/series/points
+"""
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, insert
+from app.database.base import Base
+from app.core.config import settings
+from app.models import Pair, Drawing, Series, Point, IdSequence
+
+
+def generate_ohlcv_csv(
+    path: Path,
+    years: float = 1.0,
+    timeframe_seconds: int = 60,
+    start_time: int = 1420070400,  # 2015-01-01
+    start_price: float = 1.1,
+    seed: int = 42,
+) -> int:
+    """Write a random-walk OHLCV history to `path` and return the number of rows"""
+    rng = np.random.default_rng(seed)
+    n = int(years * 365 * 24 * 3600 / timeframe_seconds)
+    time = start_time + np.arange(n, dtype=np.int64) * timeframe_seconds
+
+    volatility = 0.0002 * np.sqrt(timeframe_seconds / 60)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, n)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    wick = np.abs(rng.normal(0.0, volatility, (2, n))) * close
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+
+    df = pd.DataFrame({
+        "time": time,
+        "open": open_.round(5),
+        "high": high.round(5),
+        "low": low.round(5),
+        "close": close.round(5),
+        "tick_volume": rng.integers(1, 500, n),
+        "spread": rng.integers(0, 30, n),
+        "real_volume": np.zeros(n, dtype=np.int64),
+    })
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    return n
+
+
+def generate_drawings_db(
+    database_url: str,
+    pair: str = "EURUSD",
+    n_drawings: int = 10_000,
+    n_points: int = 1_000_000,
+    series_per_drawing: int = 2,
+    start_time: int = 1420070400,
+    seed: int = 42,
+    batch_size: int = 50_000,
+) -> dict:
+    """Create the schema in `database_url` and fill it with synthetic drawings"""
+    rng = np.random.default_rng(seed)
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+
+    types = np.array(["line", "trendline", "channel", "hline", "rectangle"])
+    points_per_series = max(1, n_points // (n_drawings * series_per_drawing))
+
+    with engine.begin() as conn:
+        pair_id = conn.execute(
+            insert(Pair).values(symbol=pair, timeframe="15m", is_active=True)
+        ).inserted_primary_key[0]
+
+        drawing_types = rng.choice(types, n_drawings)
+        conn.execute(insert(Drawing), [
+            {
+                "id": i + 1,
+                "name": f"Drawing {i + 1}",
+                "type": str(drawing_types[i]),
+                "color": "#000000",
+                "is_incomplete": False,
+                "pair_id": pair_id,
+            }
+            for i in range(n_drawings)
+        ])
+
+        n_series = n_drawings * series_per_drawing
+        total_points = n_series * points_per_series
+        xs = start_time + rng.integers(0, 10 * 365 * 24 * 3600, total_points)
+        ys = 1.1 + rng.normal(0.0, 0.05, total_points)
+        packed = settings.POINT_STORAGE_MODE == "packed"
+
+        series_rows = [
+            {
+                "id": d * series_per_drawing + s + 1,
+                "drawing_id": d + 1,
+                "order_index": s,
+                "name": f"series-{s}",
+                "style": {"color": "#000000"},
+            }
+            for d in range(n_drawings)
+            for s in range(series_per_drawing)
+        ]
+        if packed:
+            # Point ids are 1..total_points in series order, like the row layout below
+            for idx, row in enumerate(series_rows):
+                lo = idx * points_per_series
+                row["points_packed"] = [
+                    [i + 1, float(xs[i]), float(ys[i])] for i in range(lo, lo + points_per_series)
+                ]
+        conn.execute(insert(Series), series_rows)
+
+        if packed:
+            conn.execute(insert(IdSequence).values(name="points", next_value=total_points + 1))
+        else:
+            for offset in range(0, total_points, batch_size):
+                end = min(offset + batch_size, total_points)
+                conn.execute(insert(Point), [
+                    {
+                        "series_id": i // points_per_series + 1,
+                        "x": float(xs[i]),
+                        "y": float(ys[i]),
+                        "order_index": i % points_per_series,
+                    }
+                    for i in range(offset, end)
+                ])
+
+    engine.dispose()
+    return {"drawings": n_drawings, "series": n_series, "points": total_points}
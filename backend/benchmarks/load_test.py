@@ -0,0 +1,52 @@
+"""In-process concurrent load driver for the FastAPI app"""
+import asyncio
+import random
+import time
+from typing import Callable
+import httpx
+from benchmarks.stats import summarize
+
+
+async def run_load(
+    app,
+    make_request: Callable[[random.Random], tuple[str, str, dict]],
+    concurrency: int = 16,
+    total_requests: int = 1000,
+    seed: int = 0,
+) -> dict:
+    """
+    Fire `total_requests` requests from `concurrency` workers against `app`.
+
+    `make_request(rng)` returns (method, url, kwargs) for each request.
+    Latency and throughput only cover successful (2xx) responses; the others
+    are counted in `errors`, by status code in `error_statuses`.
+    """
+    transport = httpx.ASGITransport(app=app)
+    samples: list[float] = []
+    error_statuses: dict[str, int] = {}
+    remaining = total_requests
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(worker_id: int):
+            nonlocal remaining
+            rng = random.Random(seed + worker_id)
+            while remaining > 0:
+                remaining -= 1
+                method, url, kwargs = make_request(rng)
+                start = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                if 200 <= response.status_code < 300:
+                    samples.append(time.perf_counter() - start)
+                else:
+                    status = str(response.status_code)
+                    error_statuses[status] = error_statuses.get(status, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    result = summarize(samples, elapsed)
+    result["concurrency"] = concurrency
+    result["errors"] = sum(error_statuses.values())
+    result["error_statuses"] = error_statuses
+    return result
@@ -0,0 +1,144 @@
+"""
+Benchmark runner.
+
+Generates synthetic data, runs service micro-benchmarks and an in-process
+load test against the FastAPI app, and writes machine-readable results.
+
+Run from the backend directory:
+    python -m benchmarks.run --scale small --output bench_results.json
+    python -m benchmarks.compare old.json new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCALES = {
+    # years of 1m candles, drawings, points, load-test requests
+    "small": {"years": 0.25, "drawings": 500, "points": 20_000, "requests": 300},
+    "full": {"years": 5.0, "drawings": 10_000, "points": 1_000_000, "requests": 2_000},
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run candle and drawing API benchmarks")
+    parser.add_argument("--scale", choices=SCALES.keys(), default="small")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--workdir", type=Path, default=None, help="Where to put generated data (default: temp dir)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--admission", action="store_true",
+        help="Keep admission control on (the load test is one client far over its budget, so most requests are shed)",
+    )
+    args = parser.parse_args(argv)
+    scale = SCALES[args.scale]
+
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="charting-bench-"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    csv_path = workdir / "EURUSD_1m.csv"
+    db_path = workdir / "bench.db"
+
+    # Settings are read at import time, so point them at the synthetic data first
+    os.environ["CSV_FILE_PATH"] = str(csv_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    # The load test measures the handlers; as a single peer it would otherwise mostly measure 429s
+    if not args.admission:
+        os.environ["ADMISSION_ENABLED"] = "false"
+
+    from benchmarks.generators import generate_ohlcv_csv, generate_drawings_db
+
+    print(f"Generating data in {workdir} ...")
+    start = time.perf_counter()
+    n_candles = generate_ohlcv_csv(csv_path, years=scale["years"], timeframe_seconds=60)
+    if db_path.exists():
+        db_path.unlink()
+    drawing_counts = generate_drawings_db(
+        os.environ["DATABASE_URL"], n_drawings=scale["drawings"], n_points=scale["points"]
+    )
+    print(f"  {n_candles} candles, {drawing_counts} in {time.perf_counter() - start:.1f}s")
+
+    from app.main import app
+    from benchmarks.service_bench import bench_data_service, bench_drawing_service
+    from benchmarks.load_test import run_load
+
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": int(time.time()),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "admission": args.admission,
+            "candles": n_candles,
+            **drawing_counts,
+        },
+        "micro": {},
+        "load": {},
+    }
+
+    print("Running service micro-benchmarks ...")
+    results["micro"]["data_service"] = bench_data_service("EURUSD")
+    sample_ids = list(range(1, drawing_counts["drawings"] + 1, max(1, drawing_counts["drawings"] // 50)))
+    results["micro"]["drawing_service"] = bench_drawing_service("EURUSD", sample_ids)
+
+    from app.services.data_service import data_service
+    times = data_service.get_arrays("EURUSD").time
+
+    def candle_scroll(rng):
+        cursor = int(times[rng.randrange(len(times) // 10, len(times))])
+        return "GET", f"/api/v1/pairs/EURUSD/candles?cursor={cursor}&direction=prev&limit=500", {}
+
+    def candle_latest(rng):
+        return "GET", "/api/v1/pairs/EURUSD/candles?limit=500", {"headers": {"Accept-Encoding": "gzip"}}
+
+    def drawing_by_id(rng):
+        return "GET", f"/api/v1/drawings/{rng.choice(sample_ids)}", {}
+
+    scenarios = {
+        "candles_scroll_prev": candle_scroll,
+        "candles_latest_gzip": candle_latest,
+        "drawing_by_id": drawing_by_id,
+    }
+    for name, make_request in scenarios.items():
+        print(f"Load test: {name} ...")
+        results["load"][name] = asyncio.run(
+            run_load(app, make_request, concurrency=args.concurrency, total_requests=scale["requests"])
+        )
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"Wrote {args.output}")
+    errors = 0
+    for group in ("micro", "load"):
+        for section, entries in results[group].items():
+            if "p50_ms" in entries:
+                entries = {section: entries}
+            for name, stats in entries.items():
+                if stats["count"] == 0:
+                    latency = f"{'no successful requests':36}"
+                else:
+                    latency = (f"p50={stats.get('p50_ms', stats['mean_ms']):8.2f}ms "
+                               f"p99={stats.get('p99_ms', stats['mean_ms']):8.2f}ms")
+                failed = stats.get("errors", 0)
+                errors += failed
+                print(f"  {group:5} {name:32} {latency}" + (f"  errors={failed} {stats['error_statuses']}" if failed else ""))
+    if errors:
+        # Failed requests are left out of the latencies, which would otherwise look fast
+        print(f"ERROR: {errors} load test request(s) failed; their latencies are excluded", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
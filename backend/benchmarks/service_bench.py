@@ -0,0 +1,64 @@
+"""Micro-benchmarks of DataService and DrawingService methods"""
+import time
+import numpy as np
+from benchmarks.stats import time_calls
+from app.services.data_service import data_service
+from app.services.drawing_service import drawing_service
+from app.schemas.drawing import DrawingCreate, DrawingUpdate
+
+
+def bench_data_service(symbol: str, repeat: int = 50) -> dict:
+    results = {}
+
+    # Cold load (parse + sort), measured once
+    data_service.clear_cache(symbol)
+    start = time.perf_counter()
+    data_service.load_csv_data(symbol)
+    results["load_csv_data_cold"] = {"count": 1, "mean_ms": (time.perf_counter() - start) * 1000.0}
+
+    times = data_service.get_arrays(symbol).time
+    rng = np.random.default_rng(0)
+    cursors = rng.choice(times[len(times) // 10:], repeat + 3)
+    cursor_iter = iter(cursors)
+
+    results["get_candles_latest_500"] = time_calls(
+        lambda: data_service.get_candles(symbol, limit=500), repeat
+    )
+    results["get_candles_prev_cursor_1000"] = time_calls(
+        lambda: data_service.get_candles(symbol, cursor=int(next(cursor_iter)), direction="prev", limit=1000), repeat
+    )
+    results["get_candles_max_page_5000"] = time_calls(
+        lambda: data_service.get_candles(symbol, limit=5000), max(5, repeat // 5)
+    )
+    return results
+
+
+def bench_drawing_service(pair: str, sample_ids: list[int], repeat: int = 20) -> dict:
+    results = {}
+    id_iter = iter(sample_ids * (repeat + 3))
+
+    results["get_all_drawings"] = time_calls(
+        lambda: drawing_service.get_all_drawings(pair=pair), max(3, repeat // 10), warmup=1
+    )
+    results["get_drawing_by_id"] = time_calls(
+        lambda: drawing_service.get_drawing_by_id(next(id_iter)), repeat
+    )
+
+    payload = DrawingCreate(
+        name="bench",
+        type="line",
+        pair=pair,
+        series=[{"points": [{"x": 1420070400 + i * 900, "y": 1.1 + i * 1e-4} for i in range(2)]}],
+    )
+    created = []
+    results["create_drawing"] = time_calls(lambda: created.append(drawing_service.create_drawing(payload)), repeat)
+
+    def update():
+        drawing = created[len(created) // 2]
+        series = [s.model_copy(update={"points": [p.model_copy(update={"y": p.y + 1e-5}) for p in s.points]})
+                  for s in drawing.series]
+        drawing_service.update_drawing(drawing.id, DrawingUpdate(series=series))
+
+    results["update_drawing_move"] = time_calls(update, repeat)
+    results["delete_drawing"] = time_calls(lambda: drawing_service.delete_drawing(created.pop().id), min(repeat, len(created) - 3), warmup=0)
+    return results
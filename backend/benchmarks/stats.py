@@ -0,0 +1,34 @@
+import time
+from typing import Callable
+import numpy as np
+
+
+def summarize(samples: list[float], elapsed: float = None) -> dict:
+    """Latency percentiles (ms) and throughput for a list of samples in seconds (None without samples)"""
+    total = elapsed if elapsed is not None else float(np.sum(samples))
+    if not samples:
+        stats = ("mean_ms", "min_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+        return {"count": 0, **dict.fromkeys(stats), "throughput_per_s": 0.0}
+    values = np.asarray(samples, dtype=np.float64) * 1000.0
+    return {
+        "count": len(samples),
+        "mean_ms": float(values.mean()),
+        "min_ms": float(values.min()),
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "max_ms": float(values.max()),
+        "throughput_per_s": len(samples) / total if total > 0 else 0.0,
+    }
+
+
+def time_calls(fn: Callable[[], object], repeat: int = 50, warmup: int = 3) -> dict:
+    """Call `fn` repeatedly and summarize its latency"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
@@ -0,0 +1,53 @@
+"""
+Candle ingestion
+Run with: python ingest.py path/to/exports [--mode append|overwrite] [--workers N]
+
+Imports broker CSV exports (time,open,high,low,close,tick_volume,spread,real_volume)
+into the candle store served by the API. Symbol and timeframe are taken from file
+names like EURUSD_15m_2024.csv unless given with --symbol/--timeframe.
+"""
+import argparse
+import sys
+from pathlib import Path
+from app.services.ingest_service import MODES, ingest_service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest broker CSV exports into the candle store")
+    parser.add_argument("source", type=Path, help="CSV file or directory of CSV files")
+    parser.add_argument("--mode", choices=MODES, default="append",
+                        help="append: keep stored candles, add new timestamps; overwrite: replace the imported time range")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--chunk-mb", type=float, default=16, help="Bytes of CSV parsed per task, in MB")
+    parser.add_argument("--symbol", default=None, help="Symbol for all files (default: from file name)")
+    parser.add_argument("--timeframe", default=None, help="Timeframe for all files (default: from file name)")
+    args = parser.parse_args(argv)
+
+    try:
+        reports = ingest_service.ingest(
+            args.source,
+            mode=args.mode,
+            workers=args.workers,
+            chunk_bytes=int(args.chunk_mb * 1024 * 1024),
+            symbol=args.symbol,
+            timeframe=args.timeframe,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    total_rows = sum(report.rows_parsed for report in reports)
+    total_seconds = sum(report.seconds for report in reports)
+    for report in reports:
+        print(
+            f"{report.symbol} {report.timeframe}: {report.files} file(s), {report.rows_parsed} rows parsed, "
+            f"{report.duplicates} duplicates, {report.rows_added} {'added' if args.mode == 'append' else 'written'}, "
+            f"{report.rows_total} stored, {report.seconds:.2f}s ({report.rows_per_second:,.0f} rows/s)"
+        )
+    if total_seconds > 0:
+        print(f"total: {total_rows} rows in {total_seconds:.2f}s ({total_rows / total_seconds:,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
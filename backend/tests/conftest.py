@@ -0,0 +1,59 @@
+import os
+import tempfile
+
+# Settings are read when app.core.config is imported, so the environment is set up first
+_tmp_dir = tempfile.mkdtemp(prefix="charting-app-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp_dir}/test.db"
+os.environ["ADMISSION_ENABLED"] = "false"
+os.environ["MAINTENANCE_INTERVAL_HOURS"] = "0"
+os.environ["WARMUP_SYMBOLS"] = "[]"
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.database.base import Base
+from app.database.session import SessionLocal, engine
+from app.models import Pair
+from app.api.v1 import pairs
+from app.services.candle_store import candle_store
+from app.services.data_service import data_service
+from app.services.drawing_service import drawing_service
+from app.services.pattern_service import pattern_service
+from app.services.prefetch_service import prefetch_service
+
+
+@pytest.fixture
+def db_tables(monkeypatch):
+    """Fresh drawing tables with the EURUSD pair; buffered edits are only flushed explicitly"""
+    monkeypatch.setattr(settings, "DRAWING_WRITE_COALESCE_MS", 60_000)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    db.add(Pair(symbol="EURUSD", timeframe="15m"))
+    db.commit()
+    db.close()
+    yield
+    if drawing_service._flush_timer is not None:
+        drawing_service._flush_timer.cancel()
+        drawing_service._flush_timer = None
+    drawing_service._discard_pending()
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def client(db_tables):
+    from app.main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Empty candle store; versions and file names restart per directory, so in-memory caches are reset too"""
+    monkeypatch.setattr(candle_store, "root", tmp_path)
+    candle_store._manifests.clear()
+    candle_store._partition_cache.clear()
+    candle_store._encoded_cache.clear()
+    data_service.clear_cache()
+    pattern_service._index_cache.clear()
+    pairs._page_cache.clear()
+    prefetch_service.clear()
+    return candle_store
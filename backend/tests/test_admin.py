@@ -0,0 +1,88 @@
+import pytest
+from sqlalchemy import text
+from app.core.config import settings
+from app.database.session import engine
+from app.services.drawing_service import drawing_service
+from app.services.maintenance_service import maintenance_service
+
+TOKEN = "s3cret"
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+
+@pytest.fixture
+def admin(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", TOKEN)
+    monkeypatch.setattr(maintenance_service, "last_report", None)
+    return client
+
+
+def create_line(client) -> dict:
+    response = client.post("/api/v1/drawings/", json={
+        "name": "line",
+        "type": "line",
+        "pair": "EURUSD",
+        "series": [{"points": [{"x": 1, "y": 1.1}, {"x": 2, "y": 1.2}]}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def insert_orphans():
+    """Rows a bulk delete without cascades would leave behind"""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.execute(text(
+            "INSERT INTO drawings (id, name, type, color, pair_id, is_incomplete) VALUES (900, 'gone', 'line', '#000', 999, 0)"
+        ))
+        conn.execute(text("INSERT INTO series (id, drawing_id, order_index) VALUES (900, 900, 0), (901, 999, 0)"))
+        conn.execute(text(
+            "INSERT INTO points (id, series_id, x, y, order_index) "
+            "VALUES (900, 900, 1, 1.1, 0), (901, 901, 1, 1.1, 0), (902, 999, 1, 1.1, 0)"
+        ))
+        conn.execute(text("INSERT INTO drawing_events (pair_id, op) VALUES (999, 'clear')"))
+        conn.commit()
+        conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+
+def test_admin_routes_are_disabled_without_a_token(client):
+    assert settings.ADMIN_TOKEN is None
+    assert client.post("/api/v1/admin/maintenance?full=true").status_code == 403
+    assert client.get("/api/v1/admin/profiles").status_code == 403
+
+
+def test_admin_routes_need_the_token(admin):
+    for headers in ({}, {"Authorization": "Bearer wrong"}, {"Authorization": TOKEN}):
+        response = admin.post("/api/v1/admin/maintenance", headers=headers)
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+    assert admin.get("/api/v1/admin/maintenance", headers=AUTH).status_code == 404  # Not run yet
+    assert admin.post("/api/v1/admin/maintenance", headers=AUTH).status_code == 200
+
+
+def test_purge_orphans_keeps_live_drawings(client):
+    drawing = create_line(client)
+    insert_orphans()
+    
+    assert drawing_service.purge_orphans() == {"points": 3, "series": 2, "drawings": 1, "drawing_events": 1}
+    assert drawing_service.purge_orphans() == {"points": 0, "series": 0, "drawings": 0, "drawing_events": 0}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM drawings")).scalar() == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM series")).scalar() == 1
+    assert client.get(f"/api/v1/drawings/{drawing['id']}").json()["series"] == drawing["series"]
+
+
+def test_maintenance_report(admin):
+    create_line(admin)
+    insert_orphans()
+    
+    report = admin.post("/api/v1/admin/maintenance?full=true", headers=AUTH).json()
+    assert report["purged"] == {"points": 3, "series": 2, "drawings": 1, "drawing_events": 1}
+    assert report["vacuum"] == "full"
+    assert report["size_after"] <= report["size_before"]
+    assert report["reclaimed_bytes"] == report["size_before"] - report["size_after"]
+    assert admin.get("/api/v1/admin/maintenance", headers=AUTH).json() == report
+    
+    # The full vacuum switched the database to incremental auto-vacuum
+    report = admin.post("/api/v1/admin/maintenance", headers=AUTH).json()
+    assert report["vacuum"] == "incremental"
+    assert report["purged"] == {"points": 0, "series": 0, "drawings": 0, "drawing_events": 0}
@@ -0,0 +1,132 @@
+import asyncio
+import httpx
+import pytest
+from app.core import admission
+from app.core.admission import AdmissionMiddleware, TokenBucket, admission_decisions
+from app.core.config import settings
+
+ANALYTICS = "/api/v1/analytics/correlation"
+BIG_PAGE = "/api/v1/pairs/EURUSD/candles?limit=5000"
+
+
+class BlockingApp:
+    """Answers 200; requests to analytics routes wait until `release` is set"""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+
+    async def __call__(self, scope, receive, send):
+        if scope["path"].startswith("/api/v1/analytics"):
+            await self.release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "ADMISSION_RATE", 1000.0)
+    monkeypatch.setattr(settings, "ADMISSION_BURST", 1000.0)
+    monkeypatch.setattr(settings, "ADMISSION_HEAVY_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "ADMISSION_HEAVY_QUEUE", 8)
+    monkeypatch.setattr(settings, "ADMISSION_QUEUE_TIMEOUT_MS", 2000)
+    monkeypatch.setattr(settings, "ADMISSION_ROUTE_CONCURRENCY", {})
+    monkeypatch.setattr(settings, "ADMISSION_ROUTE_QUEUE_TIMEOUT_MS", {})
+    return settings
+
+
+def run(scenario):
+    """Run `scenario(client, app)` against the middleware wrapped around a BlockingApp"""
+    async def main():
+        app = BlockingApp()
+        transport = httpx.ASGITransport(app=AdmissionMiddleware(app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await scenario(client, app)
+    return asyncio.run(main())
+
+
+async def started(task: asyncio.Task):
+    """Let a request reach its handler (or its queue)"""
+    for _ in range(20):
+        await asyncio.sleep(0)
+    assert not task.done()
+
+
+def test_over_budget_requests_get_429_with_retry_after(limits):
+    limits.ADMISSION_RATE = 0.5
+    limits.ADMISSION_BURST = 2.0
+    
+    async def scenario(client, app):
+        return [await client.get("/api/v1/drawings/") for _ in range(3)]
+    
+    responses = run(scenario)
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[2].headers["retry-after"] == "2"  # One token at 0.5 per second
+
+
+def test_token_bucket_refills(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2.0, burst=4.0)
+    assert bucket.take(4.0) == 0.0
+    assert bucket.take(1.0) == pytest.approx(0.5)
+    now[0] += 0.5
+    assert bucket.take(1.0) == 0.0
+    now[0] += 60
+    assert bucket.tokens == 0.0 and bucket.take(4.0) == 0.0  # Refilled to the burst, no further
+    assert bucket.take(10.0) == pytest.approx(2.0)  # Costlier than the burst: wait for a full bucket
+
+
+def test_queued_request_gets_503_at_its_deadline(limits):
+    limits.ADMISSION_ROUTE_QUEUE_TIMEOUT_MS = {ANALYTICS: 50}
+    
+    async def scenario(client, app):
+        first = asyncio.create_task(client.get(ANALYTICS))
+        await started(first)
+        second = await client.get(ANALYTICS)
+        app.release.set()
+        return (await first), second
+    
+    first, second = run(scenario)
+    assert first.status_code == 200
+    assert second.status_code == 503
+    assert second.headers["retry-after"] == "1"
+
+
+def test_full_queue_sheds_at_once(limits):
+    limits.ADMISSION_HEAVY_QUEUE = 0
+    
+    async def scenario(client, app):
+        first = asyncio.create_task(client.get(ANALYTICS))
+        await started(first)
+        shed = await asyncio.wait_for(client.get(ANALYTICS), 1.0)
+        app.release.set()
+        await first
+        return shed
+    
+    shed = run(scenario)
+    assert shed.status_code == 503 and "retry-after" in shed.headers
+
+
+def test_routes_have_their_own_limits(limits):
+    limits.ADMISSION_HEAVY_QUEUE = 0
+    limits.ADMISSION_ROUTE_CONCURRENCY = {ANALYTICS: 2}
+    shed_before = admission_decisions.value(route=ANALYTICS, request_class="heavy", result="shed")
+    
+    async def scenario(client, app):
+        busy = [asyncio.create_task(client.get(ANALYTICS)) for _ in range(2)]
+        for task in busy:
+            await started(task)
+        # Analytics is saturated; large candle pages and other analytics routes still get in
+        statuses = [
+            (await client.get(ANALYTICS)).status_code,
+            (await client.get(BIG_PAGE)).status_code,
+            (await client.get(BIG_PAGE)).status_code,
+        ]
+        returns = asyncio.create_task(client.get("/api/v1/analytics/returns"))
+        await started(returns)
+        app.release.set()
+        statuses += [(await task).status_code for task in (*busy, returns)]
+        return statuses
+    
+    assert run(scenario) == [503, 200, 200, 200, 200, 200]
+    assert admission_decisions.value(route=ANALYTICS, request_class="heavy", result="shed") == shed_before + 1
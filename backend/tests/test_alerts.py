@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from app.services.alert_service import AlertIndex, Bar, alert_service
+from app.services.data_service import data_service
+
+
+@pytest.fixture(autouse=True)
+def reset_alerts():
+    alert_service._cursors.clear()
+    alert_service._events.clear()
+    alert_service.invalidate()
+    yield
+
+
+def create_level(client, price: float) -> dict:
+    response = client.post("/api/v1/drawings/", json={
+        "name": "level",
+        "type": "hline",
+        "pair": "EURUSD",
+        "series": [{"points": [{"x": 0, "y": price}]}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def bar(time: int, open_: float, close: float) -> dict:
+    return {"time": time, "open": open_, "high": max(open_, close), "low": min(open_, close), "close": close}
+
+
+def evaluate(client, bars=None) -> list[dict]:
+    response = client.post("/api/v1/alerts/EURUSD/evaluate", json={"bars": bars} if bars else None)
+    assert response.status_code == 200
+    return response.json()["events"]
+
+
+def test_same_bar_fires_once(client):
+    create_level(client, 1.1)
+    crossing = [bar(100, 1.09, 1.11)]
+    
+    assert [event["direction"] for event in evaluate(client, crossing)] == ["up"]
+    assert evaluate(client, crossing) == []
+    assert evaluate(client, crossing) == []
+    assert client.get("/api/v1/alerts/EURUSD/events").json()["count"] == 1
+
+
+def test_latest_stored_bar_fires_once(client):
+    arrays = data_service.get_arrays("EURUSD")
+    create_level(client, float((arrays.high[-1] + arrays.low[-1]) / 2))
+    
+    fired = [len(evaluate(client)) for _ in range(3)]
+    assert fired == [1, 0, 0]
+    assert client.get("/api/v1/alerts/EURUSD/events").json()["count"] == 1
+
+
+def test_stale_bars_do_not_move_the_reference(client):
+    create_level(client, 1.1)
+    assert evaluate(client, [bar(100, 1.08, 1.09)]) == []
+    # An older bar is skipped and leaves the reference at the last close (1.09)
+    assert evaluate(client, [bar(50, 1.2, 1.2)]) == []
+    # A gap over the level from the last close counts as a crossing
+    assert [event["direction"] for event in evaluate(client, [bar(200, 1.12, 1.13)])] == ["up"]
+
+
+def test_bars_in_one_call_chain_their_references(client):
+    create_level(client, 1.1)
+    events = evaluate(client, [bar(100, 1.09, 1.11), bar(100, 1.11, 1.09), bar(200, 1.11, 1.09)])
+    # The bar repeating time 100 is skipped; the last one falls back through the level from 1.11
+    assert [(event["time"], event["direction"]) for event in events] == [(100, "up"), (200, "down")]
+
+
+def test_index_handles_mixed_segment_lengths():
+    rng = np.random.default_rng(0)
+    x0 = rng.uniform(0, 1e6, 500)
+    durations = rng.uniform(100, 1000, 500)
+    # A few far-reaching trendlines among the short ones
+    durations[:3] = [1e9, 5e12, 1e15]
+    segments = [(a, a + d, 1.0, 0.0, i, i) for i, (a, d) in enumerate(zip(x0, durations))]
+    index = AlertIndex([], segments)
+    assert len(index.long_segments) + len(index.short_segments) == 500
+    
+    for t in rng.uniform(0, 1.1e6, 200):
+        expected = {i for i, (a, b, *_) in enumerate(segments) if a <= t <= b}
+        assert set(index._segments_at(t).tolist()) == expected
+    hits = index.evaluate(Bar(time=2e6, open=0.9, high=1.1, low=0.9, close=1.1), reference=0.9)
+    assert sorted(drawing_id for drawing_id, *_ in hits) == [0, 1, 2]
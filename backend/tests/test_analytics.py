@@ -0,0 +1,73 @@
+import asyncio
+import numpy as np
+import pytest
+from app.services.candle_store import CandleArrays
+from app.services.correlation_service import correlation_service
+
+START = 1_700_000_000
+
+
+def bars(close: np.ndarray) -> CandleArrays:
+    return CandleArrays(
+        time=START + np.arange(len(close), dtype=np.int64) * 900,
+        open=close,
+        high=close + 0.001,
+        low=close - 0.001,
+        close=close,
+        volume=np.ones(len(close), dtype=np.int64),
+    )
+
+
+def random_walk(n: int, seed: int) -> np.ndarray:
+    return 1.1 + np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n))
+
+
+@pytest.fixture
+def symbols(store):
+    correlation_service._aligned_cache.clear()
+    for seed, symbol in enumerate(("AAA", "BBB", "CCC")):
+        store.write(symbol, "15m", bars(random_walk(200, seed)))
+    return ["AAA", "BBB", "CCC"]
+
+
+def outside_event_loop(monkeypatch, name: str) -> list[bool]:
+    """Record, for each call of a correlation_service method, whether it ran off the event loop"""
+    calls = []
+    method = getattr(correlation_service, name)
+    
+    def wrapper(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            calls.append(False)
+        except RuntimeError:
+            calls.append(True)
+        return method(*args, **kwargs)
+    
+    monkeypatch.setattr(correlation_service, name, wrapper)
+    return calls
+
+
+def test_correlation_matrix_runs_in_a_worker_thread(client, symbols, monkeypatch):
+    calls = outside_event_loop(monkeypatch, "correlation_matrix")
+    response = client.get("/api/v1/analytics/correlation", params={"symbols": ",".join(symbols), "window": 100})
+    assert response.status_code == 200
+    assert calls == [True]
+    
+    aligned = correlation_service.get_aligned(symbols, "15m", 100)
+    expected = np.round(np.corrcoef(aligned.returns.T), 4)
+    assert np.allclose(response.json()["matrix"], expected)
+
+
+def test_rolling_correlation_and_returns_run_in_a_worker_thread(client, symbols, monkeypatch):
+    rolling = outside_event_loop(monkeypatch, "rolling_correlation")
+    returns = outside_event_loop(monkeypatch, "get_aligned")
+    response = client.get("/api/v1/analytics/correlation/rolling", params={
+        "symbol": "AAA", "against": "BBB,CCC", "window": 20, "bars": 100,
+    })
+    assert response.status_code == 200
+    assert set(response.json()["series"]) == {"BBB", "CCC"}
+    
+    response = client.get("/api/v1/analytics/returns", params={"symbols": "AAA,BBB", "bars": 50})
+    assert response.status_code == 200
+    assert len(response.json()["time"]) == 50
+    assert rolling == [True] and all(returns)
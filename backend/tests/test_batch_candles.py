@@ -0,0 +1,77 @@
+import threading
+import time
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.schemas.pair import BatchCandlesResponse
+from app.services.data_service import data_service
+from tests.test_data_service import START, bars
+
+BATCH = "/api/v1/pairs/candles"
+
+
+def iso(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def test_batch_returns_the_latest_candles_per_symbol(client, store):
+    store.write("AAA", "15m", bars([1.0 + i / 100 for i in range(50)]))
+    store.write("BBB", "15m", bars([2.0 + i / 100 for i in range(30)], start=START + 900))
+
+    response = client.get(BATCH, params={"symbols": "AAA,BBB,MISSING", "limit": 20})
+    assert response.status_code == 200
+    batch = BatchCandlesResponse.model_validate(response.json())
+    assert list(batch.symbols) == ["AAA", "BBB"] and list(batch.errors) == ["MISSING"]
+
+    aaa = response.json()["symbols"]["AAA"]
+    assert (aaa["count"], aaa["total"]) == (20, 50)
+    assert aaa["time"] == [START + i * 900 for i in range(30, 50)]
+    assert aaa["close"][-1] == 1.49
+    # Same candles as the single-symbol endpoint's latest page
+    page = client.get("/api/v1/pairs/BBB/candles", params={"limit": 20}).json()["results"]
+    assert response.json()["symbols"]["BBB"]["time"] == [candle["time"] for candle in page]
+
+
+def test_symbols_are_normalized_and_deduplicated(client, store):
+    store.write("AAA", "15m", bars([1.0, 1.1]))
+    store.write("BBB", "15m", bars([2.0, 2.1]))
+    response = client.get(BATCH, params={"symbols": " bbb, AAA,,aaa ,BBB"})
+    assert list(response.json()["symbols"]) == ["BBB", "AAA"]
+
+
+def test_date_range_limits_each_symbol(client, store):
+    store.write("AAA", "15m", bars([1.0 + i / 100 for i in range(50)]))
+    response = client.get(BATCH, params={
+        "symbols": "AAA",
+        "start_date": iso(START + 4 * 900),
+        "end_date": iso(START + 13 * 900),
+    })
+    aaa = response.json()["symbols"]["AAA"]
+    assert aaa["time"] == [START + i * 900 for i in range(4, 14)]
+
+
+def test_invalid_batches_are_rejected(client, monkeypatch):
+    assert client.get(BATCH, params={"symbols": " , "}).status_code == 400
+    monkeypatch.setattr(settings, "BATCH_MAX_SYMBOLS", 2)
+    assert client.get(BATCH, params={"symbols": "A,B,C"}).status_code == 400
+
+
+def test_symbols_load_concurrently_up_to_the_limit(client, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_CONCURRENCY", 3)
+    lock = threading.Lock()
+    running = []
+    peak = [0]
+
+    def slow_load(symbol, **kwargs):
+        with lock:
+            running.append(symbol)
+            peak[0] = max(peak[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(symbol)
+        return bars([1.0]), 1
+    monkeypatch.setattr(data_service, "get_candle_arrays", slow_load)
+
+    response = client.get(BATCH, params={"symbols": ",".join(f"S{i}" for i in range(10))})
+    assert response.status_code == 200
+    assert len(response.json()["symbols"]) == 10
+    assert peak[0] == 3
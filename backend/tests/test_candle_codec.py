@@ -0,0 +1,116 @@
+import logging
+import numpy as np
+import pytest
+from app.services import candle_codec
+from app.services.candle_codec import decode_candles, decode_ticks, encode_candles, encode_ticks
+
+
+def candles(n: int, seed: int = 0, decimals: int = 5, step: int = 900) -> tuple[np.ndarray, ...]:
+    rng = np.random.default_rng(seed)
+    close = np.round(1.1 + np.cumsum(rng.normal(0, 0.0005, n)), decimals)
+    open_ = np.round(np.concatenate((close[:1], close[:-1])) + rng.normal(0, 0.0001, n), decimals)
+    high = np.round(np.maximum(open_, close) + rng.uniform(0, 0.001, n), decimals)
+    low = np.round(np.minimum(open_, close) - rng.uniform(0, 0.001, n), decimals)
+    time = 1_700_000_000 + np.arange(n, dtype=np.int64) * step
+    volume = rng.integers(0, 10_000, n)
+    return time, open_, high, low, close, volume
+
+
+def assert_round_trip(columns, decoded):
+    assert len(decoded) == 6
+    for expected, actual in zip(columns, decoded):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def block_metas(data: bytes) -> list[dict]:
+    return [meta for meta, _ in candle_codec._read_blocks(data)]
+
+
+@pytest.mark.parametrize("values", [
+    np.array([0, 1, -1, 2, -2, 127, -128, 2**31, -2**31], dtype=np.int64),
+    np.array([np.iinfo(np.int64).max, np.iinfo(np.int64).min, 0], dtype=np.int64),
+    np.zeros(0, dtype=np.int64),
+])
+def test_zigzag_round_trip(values):
+    narrowed = candle_codec._narrow(values)
+    assert narrowed.dtype.kind == "u"
+    np.testing.assert_array_equal(candle_codec._widen(narrowed), values)
+
+
+def test_zigzag_narrows_small_magnitudes():
+    assert candle_codec._narrow(np.array([-128, 127])).dtype == np.uint8
+    assert candle_codec._narrow(np.array([-129, 127])).dtype == np.uint16
+    assert candle_codec._narrow(np.array([2**40])).dtype == np.uint64
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.uint32, np.uint64, np.float64])
+def test_shuffle_round_trip(dtype):
+    values = (np.arange(1000) * 7919 % 251).astype(dtype)
+    shuffled = candle_codec._shuffle(values)
+    # Leading padding checks the offset is honoured
+    restored = candle_codec._unshuffle(b"pad" + shuffled, np.dtype(dtype), len(values), 3)
+    np.testing.assert_array_equal(restored, values)
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 1000, candle_codec.BLOCK_ROWS + 5])
+def test_fixed_point_candles_round_trip(n):
+    columns = candles(n)
+    data = encode_candles(columns)
+    assert all(meta["decimals"] == (5 if n else None) for meta in block_metas(data))
+    assert_round_trip(columns, decode_candles(data))
+
+
+def test_irregular_times_round_trip():
+    time, *rest = candles(500)
+    time = time + np.random.default_rng(1).integers(0, 600, 500).cumsum()
+    data = encode_candles((time, *rest))
+    assert "time_step" not in block_metas(data)[0]
+    assert_round_trip((time, *rest), decode_candles(data))
+
+
+def test_unquantizable_prices_are_stored_as_floats():
+    columns = candles(100)
+    columns = (columns[0], *(values + 1e-12 for values in columns[1:5]), columns[5])
+    data = encode_candles(columns)
+    assert block_metas(data)[0]["decimals"] is None
+    assert_round_trip(columns, decode_candles(data))
+
+
+def test_configured_decimals_never_drop_digits(caplog):
+    columns = candles(100, decimals=5)
+    with caplog.at_level(logging.WARNING, logger=candle_codec.__name__):
+        data = encode_candles(columns, decimals=2)
+    assert block_metas(data)[0]["decimals"] == 5
+    assert "more than 2 decimals" in caplog.text
+    assert_round_trip(columns, decode_candles(data))
+
+
+def test_configured_decimals_are_used_when_they_fit(caplog):
+    columns = candles(100, decimals=3)
+    with caplog.at_level(logging.WARNING, logger=candle_codec.__name__):
+        data = encode_candles(columns, decimals=5)
+    assert block_metas(data)[0]["decimals"] == 5
+    assert caplog.text == ""
+    assert_round_trip(columns, decode_candles(data))
+
+
+@pytest.mark.parametrize("decimals", [None, 1])
+def test_ticks_round_trip(decimals):
+    rng = np.random.default_rng(2)
+    n = candle_codec.BLOCK_ROWS + 100
+    time = 1_700_000_000_000 + rng.integers(1, 50, n).cumsum()
+    bid = np.round(1.1 + np.cumsum(rng.normal(0, 0.00002, n)), 5)
+    prices = {"bid": bid, "ask": np.round(bid + 0.00012, 5)}
+    volume = rng.integers(1, 100, n)
+    
+    restored_time, restored_prices, restored_volume = decode_ticks(encode_ticks(time, prices, volume, decimals=decimals))
+    np.testing.assert_array_equal(restored_time, time)
+    assert list(restored_prices) == ["bid", "ask"]
+    for name, values in prices.items():
+        np.testing.assert_array_equal(restored_prices[name], values)
+    np.testing.assert_array_equal(restored_volume, volume)
+
+
+def test_rejects_foreign_data():
+    with pytest.raises(ValueError):
+        decode_candles(b"PK\x03\x04 not a candle file")
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from app.services.candle_store import CandleStore
+from tests.test_data_service import START, bars
+
+# 15m bars from 2023-11-14 to early February 2024: four monthly partitions
+HISTORY = 8000
+
+
+@pytest.fixture
+def history():
+    return bars(list(1.0 + np.arange(HISTORY) / 1e4))
+
+
+def test_write_splits_months(tmp_path, history):
+    store = CandleStore(tmp_path)
+    manifest = store.write("aaa", "15m", history)
+
+    assert manifest.symbol == "AAA" and manifest.version == 1 and manifest.rows == HISTORY
+    assert [partition.key for partition in manifest.partitions] == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert manifest.partitions[0].start == START and manifest.partitions[-1].end == int(history.time[-1])
+    for before, after in zip(manifest.partitions, manifest.partitions[1:]):
+        assert after.start - before.end == 900
+    assert sorted(path.name for path in (tmp_path / "AAA" / "15m").iterdir()) == sorted(
+        ["manifest.json"] + [partition.file for partition in manifest.partitions]
+    )
+    assert store.list_symbols() == ["AAA"] and store.list_timeframes("AAA") == ["15m"]
+
+
+@pytest.mark.parametrize("file_format", ["compact", "npz"])
+def test_load_range_matches_a_full_scan(tmp_path, history, file_format):
+    store = CandleStore(tmp_path, file_format=file_format)
+    store.write("AAA", "15m", history)
+    rng = np.random.default_rng(0)
+    bounds = [(None, None), (None, START + 100), (START + 7000 * 900, None), (0, START - 1)]
+    bounds += [tuple(sorted(rng.integers(START - 10**5, int(history.time[-1]) + 10**5, 2))) for _ in range(50)]
+
+    for start, end in bounds:
+        mask = np.ones(HISTORY, dtype=bool)
+        if start is not None:
+            mask &= history.time >= start
+        if end is not None:
+            mask &= history.time <= end
+        loaded = store.load_range("AAA", "15m", start, end)
+        for expected, actual in zip(history, loaded):
+            np.testing.assert_array_equal(actual, expected[mask])
+
+
+def test_load_range_reads_overlapping_partitions_only(tmp_path, history, monkeypatch):
+    store = CandleStore(tmp_path)
+    manifest = store.write("AAA", "15m", history)
+    december = manifest.partitions[1]
+    loaded = []
+    original = store.load_partition
+    monkeypatch.setattr(store, "load_partition", lambda *args: loaded.append(args[2].key) or original(*args))
+
+    arrays = store.load_range("AAA", "15m", december.start + 900, december.end - 900)
+    assert loaded == ["2023-12"]
+    assert len(arrays) == december.rows - 2
+
+
+def test_rewrite_replaces_touched_months_only(tmp_path, history):
+    store = CandleStore(tmp_path)
+    first = store.write("AAA", "15m", history)
+    december = first.partitions[1]
+    updated = bars([5.0] * 10, start=december.start)
+
+    second = store.write("AAA", "15m", updated)
+    assert second.version == 2
+    assert [partition.file for partition in second.partitions] == [
+        first.partitions[0].file, "2023-12.v2.cnd", first.partitions[2].file, first.partitions[3].file,
+    ]
+    assert second.partitions[1].rows == 10
+    assert not (tmp_path / "AAA" / "15m" / december.file).exists()
+    assert store.load_range("AAA", "15m", december.start, december.end).close.tolist() == [5.0] * 10
+
+
+def test_hot_partitions_are_served_from_memory(tmp_path, history):
+    store = CandleStore(tmp_path, cache_size=1)
+    manifest = store.write("AAA", "15m", history)
+    november, december = manifest.partitions[:2]
+    store.load_partition("AAA", "15m", november)
+    store.load_partition("AAA", "15m", december)
+
+    for partition in (november, december):
+        (tmp_path / "AAA" / "15m" / partition.file).unlink()
+    # The decoded cache keeps one partition and the encoded cache the other's bytes
+    assert len(store.load_partition("AAA", "15m", december)) == december.rows
+    assert len(store.load_partition("AAA", "15m", november)) == november.rows
+
+
+def test_npz_partitions_stay_readable_after_switching_format(tmp_path, history):
+    CandleStore(tmp_path, file_format="npz").write("AAA", "15m", history)
+    store = CandleStore(tmp_path)
+    # A new month (March 2024); months in `arrays` are replaced as a whole
+    store.write("AAA", "15m", bars([5.0] * 10, start=1709251200))
+
+    files = [partition.file for partition in store.get_manifest("AAA", "15m").partitions]
+    assert files[0].endswith(".npz") and files[-1].endswith(".cnd")
+    loaded = store.load_range("AAA", "15m")
+    assert len(loaded) == HISTORY + 10
+    np.testing.assert_array_equal(loaded.close[:HISTORY], history.close)
+
+
+def test_missing_symbol_raises(tmp_path):
+    with pytest.raises(FileNotFoundError, match="No stored candles"):
+        CandleStore(tmp_path).load_range("AAA", "15m")
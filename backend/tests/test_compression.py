@@ -0,0 +1,119 @@
+import asyncio
+import gzip
+import os
+import httpx
+import pytest
+from app.core.middleware import CompressionMiddleware
+from tests.test_data_service import START, bars
+
+CANDLES = "/api/v1/pairs/AAA/candles"
+OLDEST_PAGE = f"{CANDLES}?limit=500&cursor={START}&direction=next"
+
+
+@pytest.fixture
+def history(store):
+    store.write("AAA", "15m", bars([1.1 + i * 1e-4 for i in range(3000)]))
+    return store
+
+
+def test_pages_are_gzipped_when_accepted(client, history):
+    plain = client.get(OLDEST_PAGE, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    compressed = client.get(OLDEST_PAGE, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert int(compressed.headers["content-length"]) < len(plain.content) / 2
+    # httpx decodes the body; it must be the same page
+    assert compressed.json() == plain.json()
+
+
+def test_small_bodies_are_not_compressed(client, history):
+    response = client.get(f"{CANDLES}?limit=1&cursor={START}", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_matching_etag_gets_304(client, history):
+    first = client.get(OLDEST_PAGE)
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    for if_none_match in (etag, f'"other", {etag}', "*"):
+        response = client.get(OLDEST_PAGE, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+    assert client.get(OLDEST_PAGE, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_only_historical_pages_are_immutable(client, history):
+    assert "immutable" in client.get(OLDEST_PAGE).headers["cache-control"]
+    assert client.get(f"{CANDLES}?limit=500").headers["cache-control"] == "no-cache"
+
+
+def test_new_data_changes_the_etag(client, history):
+    etag = client.get(f"{CANDLES}?limit=500").headers["etag"]
+    history.write("AAA", "15m", bars([1.2 + i * 1e-4 for i in range(3001)]))
+
+    response = client.get(f"{CANDLES}?limit=500", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+class BodyApp:
+    """Answers with `body` and `headers`, in chunks when `chunks` > 1"""
+
+    def __init__(self, body: bytes, headers: list, chunks: int = 1):
+        self.body, self.headers, self.chunks = body, headers, chunks
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": list(self.headers)})
+        size = len(self.body) // self.chunks
+        for i in range(self.chunks):
+            last = i == self.chunks - 1
+            chunk = self.body[i * size:] if last else self.body[i * size:(i + 1) * size]
+            await send({"type": "http.response.body", "body": chunk, "more_body": not last})
+
+
+def fetch(app, count: int = 1) -> list[httpx.Response]:
+    async def main():
+        transport = httpx.ASGITransport(app=CompressionMiddleware(app, minimum_size=100))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await client.get("/", headers={"Accept-Encoding": "gzip"}) for _ in range(count)]
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def compress_calls(monkeypatch):
+    calls = []
+    real_compress = gzip.compress
+
+    def counting(data, compresslevel=9):
+        calls.append(len(data))
+        return real_compress(data, compresslevel=compresslevel)
+    monkeypatch.setattr(gzip, "compress", counting)
+    return calls
+
+
+@pytest.mark.parametrize("etag,expected_calls", [(b'"v1"', 1), (b'W/"v1"', 3), (None, 3)])
+def test_only_strong_etags_reuse_compressed_bodies(compress_calls, etag, expected_calls):
+    headers = [(b"etag", etag)] if etag else []
+    responses = fetch(BodyApp(b"x" * 1000, headers), count=3)
+    assert all(response.headers["content-encoding"] == "gzip" for response in responses)
+    assert all(response.content == b"x" * 1000 for response in responses)
+    assert len(compress_calls) == expected_calls
+
+
+def test_streamed_and_encoded_bodies_pass_through(compress_calls):
+    streamed, = fetch(BodyApp(b"y" * 1000, [], chunks=4))
+    assert "content-encoding" not in streamed.headers
+    assert streamed.content == b"y" * 1000
+
+    # Incompressible, so the encoded body stays above minimum_size
+    body = os.urandom(1000)
+    already_encoded = gzip.compress(body)
+    compress_calls.clear()
+    encoded, = fetch(BodyApp(already_encoded, [(b"content-encoding", b"gzip")]))
+    assert encoded.content == body
+    assert compress_calls == []
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.candle_store import CandleArrays
+from app.services.data_service import data_service
+from app.services.ingest_service import ingest_service
+
+START = 1_700_000_000
+
+
+def bars(close: list[float], start: int = START) -> CandleArrays:
+    close = np.asarray(close, dtype=np.float64)
+    return CandleArrays(
+        time=start + np.arange(len(close), dtype=np.int64) * 900,
+        open=close,
+        high=close + 0.001,
+        low=close - 0.001,
+        close=close,
+        volume=np.ones(len(close), dtype=np.int64),
+    )
+
+
+def test_array_cache_is_bounded(store, monkeypatch):
+    monkeypatch.setattr(data_service, "_array_cache", LRUCache(2))
+    for symbol in ("AAA", "BBB", "CCC"):
+        store.write(symbol, "15m", bars([1.1, 1.2]))
+        data_service.get_arrays(symbol, "15m")
+    assert len(data_service._array_cache) == 2
+    assert ("AAA", "15m") not in data_service._array_cache
+
+
+
+def test_ingest_refreshes_cached_candles(store):
+    store.write("AAA", "15m", bars([1.1, 1.2, 1.3]))
+    assert len(data_service.get_arrays("AAA", "15m")) == 3
+    
+    ingest_service.merge("AAA", "15m", bars([1.4, 1.5], start=START + 3 * 900))
+    arrays = data_service.get_arrays("AAA", "15m")
+    assert len(arrays) == 5
+    assert arrays.close[-1] == pytest.approx(1.5, abs=1e-4)
+
+
+def test_csv_is_reloaded_when_the_file_changes(store, tmp_path, monkeypatch):
+    csv_path = tmp_path / "EURUSD_15m.csv"
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", csv_path)
+    header = "time,open,high,low,close,tick_volume\n"
+    csv_path.write_text(header + f"{START},1.1,1.2,1.0,1.15,10\n")
+    assert len(data_service.get_arrays("EURUSD", "15m")) == 1
+    
+    csv_path.write_text(header + f"{START},1.1,1.2,1.0,1.15,10\n{START + 900},1.15,1.3,1.1,1.25,12\n")
+    arrays = data_service.get_arrays("EURUSD", "15m")
+    assert len(arrays) == 2
+    assert arrays.close[-1] == 1.25
+
+
+def test_store_rewrite_is_seen_without_ingest(store):
+    store.write("AAA", "15m", bars([1.1, 1.2, 1.3]))
+    data_service.get_arrays("AAA", "15m")
+    
+    # Same size, written straight away: only the replaced manifest tells them apart
+    store.write("AAA", "15m", bars([2.1, 2.2, 2.3]))
+    assert data_service.get_arrays("AAA", "15m").close[0] == pytest.approx(2.1, abs=1e-4)
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from app.services.candle_store import CandleArrays
+from app.services.data_service import data_service
+from app.services.derived_bars import ChartSpec, derive
+
+
+def candles(closes: list[float], step: int = 60) -> CandleArrays:
+    close = np.array(closes, dtype=np.float64)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return CandleArrays(
+        time=np.arange(len(close), dtype=np.int64) * step,
+        open=open_,
+        high=np.maximum(open_, close),
+        low=np.minimum(open_, close),
+        close=close,
+        volume=np.ones(len(close), dtype=np.int64),
+    )
+
+
+def candle_pages(client, query: str) -> list[dict]:
+    """Every bar of a derived chart, walking `previous` links back from the latest page"""
+    response = client.get(f"/api/v1/pairs/EURUSD/candles?limit=500&{query}")
+    assert response.status_code == 200, response.text
+    bars = response.json()["results"]
+    url = response.json()["previous"]
+    while url:
+        page = client.get(url).json()
+        bars = page["results"] + bars
+        url = page["previous"]
+    return bars
+
+
+def _spec(query: str) -> ChartSpec:
+    params = dict(part.split("=") for part in query.split("&"))
+    return ChartSpec(
+        params["chart_type"],
+        brick_size=float(params["brick_size"]) if "brick_size" in params else None,
+        atr_period=int(params.get("atr_period", 14)),
+        range_size=float(params["range_size"]) if "range_size" in params else None,
+    )
+
+
+@pytest.mark.parametrize("query", [
+    "chart_type=heikin_ashi",
+    "chart_type=renko&brick_size=0.001",
+    "chart_type=renko&atr_period=14",
+    "chart_type=range&range_size=0.002",
+])
+def test_pages_match_the_derived_series(client, query):
+    bars = candle_pages(client, query)
+    times = [bar["time"] for bar in bars]
+    assert times == sorted(set(times))
+    assert bars[-1]["close"] == pytest.approx(float(data_service.get_candle_arrays(
+        "EURUSD", limit=1, direction="prev", chart=_spec(query))[0].close[-1]))
+
+
+@pytest.mark.parametrize("query", ["chart_type=range&range_size=0.00001", "chart_type=renko&brick_size=0.00001"])
+def test_sizes_too_small_for_the_data_are_rejected(client, query):
+    response = client.get(f"/api/v1/pairs/EURUSD/candles?{query}")
+    assert response.status_code == 400
+    assert "too small" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("query, status", [
+    ("chart_type=range", 400),
+    ("chart_type=bogus", 400),
+    ("chart_type=renko&brick_size=0", 422),
+    ("chart_type=range&range_size=-1", 422),
+])
+def test_invalid_parameters(client, query, status):
+    assert client.get(f"/api/v1/pairs/EURUSD/candles?{query}").status_code == status
+
+
+def test_bar_times_stay_inside_their_candle(client):
+    source = data_service.get_arrays("EURUSD")
+    for spec in (ChartSpec("renko", brick_size=0.0002), ChartSpec("range", range_size=0.0005)):
+        derived = data_service.get_derived_arrays("EURUSD", None, spec)
+        candle = np.searchsorted(source.time, derived.time, side="right") - 1
+        assert (derived.time - source.time[candle] < 900).all()
+
+
+def test_bars_per_candle_are_capped_by_its_interval():
+    # One 60s candle crossing 100 bricks can't be given distinct times inside its interval
+    with pytest.raises(ValueError, match="interval"):
+        derive(candles([1.0, 1.0, 2.0]), ChartSpec("renko", brick_size=0.01))
+    bricks = derive(candles([1.0, 1.0, 1.5], step=900), ChartSpec("renko", brick_size=0.01))
+    assert len(bricks) == 50
+    assert bricks.time.tolist() == list(range(1800, 1850))
+
+
+def test_bar_count_is_capped():
+    closes = [1.0 + 0.001 * (i % 2) for i in range(100)]
+    assert len(derive(candles(closes), ChartSpec("range", range_size=0.0005), max_bars=200)) > 0
+    with pytest.raises(ValueError, match="more than 50 bars"):
+        derive(candles(closes), ChartSpec("range", range_size=0.0005), max_bars=50)
@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.database.session import SessionLocal, engine
+from app.models import DrawingEvent
+from app.schemas.drawing import DrawingUpdate
+from app.services.drawing_service import drawing_service
+
+
+def create_line(client) -> dict:
+    response = client.post("/api/v1/drawings/", json={
+        "name": "line",
+        "type": "line",
+        "pair": "EURUSD",
+        "series": [{"points": [{"x": 1, "y": 1.1}, {"x": 2, "y": 1.2}]}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def moved(drawing: dict, dy: float) -> dict:
+    """PUT body of a drag: the whole drawing with every point moved by dy"""
+    return {"series": [
+        {**series, "points": [{**point, "y": point["y"] + dy} for point in series["points"]]}
+        for series in drawing["series"]
+    ]}
+
+
+def event_count() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(DrawingEvent).count()
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("storage_mode", ["packed", "rows"])
+def test_invalid_update_fails_only_its_request(client, monkeypatch, storage_mode):
+    monkeypatch.setattr("app.core.config.settings.POINT_STORAGE_MODE", storage_mode)
+    drawing = create_line(client)
+    events = event_count()
+    
+    response = client.put(f"/api/v1/drawings/{drawing['id']}", json={"name": None})
+    assert response.status_code == 400
+    # Nothing was logged or buffered, so reads and writes keep working
+    assert event_count() == events
+    assert not drawing_service._pending
+    assert client.get("/api/v1/drawings/?pair=EURUSD").status_code == 200
+    assert client.get(f"/api/v1/drawings/{drawing['id']}").json()["name"] == "line"
+    assert create_line(client)["id"] != drawing["id"]
+
+
+def test_buffered_update_is_served_and_flushed(client):
+    drawing = create_line(client)
+    response = client.put(f"/api/v1/drawings/{drawing['id']}", json={"name": "renamed", **moved(drawing, 0.5)})
+    assert response.status_code == 200
+    assert drawing['id'] in drawing_service._pending
+    assert client.get(f"/api/v1/drawings/{drawing['id']}").json()["name"] == "renamed"
+    
+    assert drawing_service.flush_pending() == 1
+    assert not drawing_service._pending
+    stored = client.get(f"/api/v1/drawings/{drawing['id']}").json()
+    assert stored["name"] == "renamed"
+    assert [point["y"] for point in stored["series"][0]["points"]] == [1.6, 1.7]
+
+
+def test_rejected_flush_drops_the_edit(client, monkeypatch):
+    first, second = create_line(client), create_line(client)
+    client.put(f"/api/v1/drawings/{first['id']}", json={"name": "rejected"})
+    client.put(f"/api/v1/drawings/{second['id']}", json={"name": "kept"})
+    
+    apply_update = drawing_service._apply_update
+    def reject_first(db, drawing_model, updates):
+        if drawing_model.id == first["id"]:
+            raise IntegrityError("UPDATE drawings", {}, Exception("constraint failed"))
+        apply_update(db, drawing_model, updates)
+    monkeypatch.setattr(drawing_service, "_apply_update", reject_first)
+    
+    assert drawing_service.flush_pending() == 1
+    # The rejected edit is neither retried nor served; the other drawing's edit is written
+    assert not drawing_service._pending
+    assert drawing_service._flush_timer is None
+    assert client.get(f"/api/v1/drawings/{first['id']}").json()["name"] == "line"
+    assert client.get(f"/api/v1/drawings/{second['id']}").json()["name"] == "kept"
+    assert client.get("/api/v1/drawings/?pair=EURUSD").status_code == 200
+    
+    # Log readers get the state the drawing was restored to
+    changes = client.get("/api/v1/drawings/changes?pair=EURUSD").json()["items"]
+    assert changes[-1]["drawing_id"] == first["id"]
+    assert changes[-1]["data"]["name"] == "line"
+    assert drawing_service.flush_pending() == 0
+
+
+def test_transient_flush_failure_is_retried(client, monkeypatch):
+    drawing = create_line(client)
+    client.put(f"/api/v1/drawings/{drawing['id']}", json={"name": "retried"})
+    
+    apply_update = drawing_service._apply_update
+    def locked(db, drawing_model, updates):
+        raise OperationalError("UPDATE drawings", {}, Exception("database is locked"))
+    monkeypatch.setattr(drawing_service, "_apply_update", locked)
+    with pytest.raises(OperationalError):
+        drawing_service.flush_pending()
+    assert drawing_service._pending[drawing["id"]].updates
+    assert client.get(f"/api/v1/drawings/{drawing['id']}").json()["name"] == "retried"
+    
+    monkeypatch.setattr(drawing_service, "_apply_update", apply_update)
+    assert drawing_service.flush_pending() == 1
+    assert client.get(f"/api/v1/drawings/{drawing['id']}").json()["name"] == "retried"
+
+
+def test_write_through_rejects_invalid_update(client, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.DRAWING_WRITE_COALESCE_MS", 0)
+    drawing = create_line(client)
+    with pytest.raises(ValueError):
+        drawing_service.update_drawing(drawing["id"], DrawingUpdate(name=None))
+    assert client.get(f"/api/v1/drawings/{drawing['id']}").json()["name"] == "line"
+
+
+def test_second_process_cannot_serve_the_database(client):
+    with client:
+        # Startup took the lock for this process; claiming it again is a no-op
+        assert drawing_service._process_lock is not None
+        drawing_service.claim_database()
+    
+    other_worker = subprocess.run(
+        [sys.executable, "-c", "from app.services.drawing_service import drawing_service; drawing_service.claim_database()"],
+        cwd=Path(__file__).parent.parent,
+        env={**os.environ, "DATABASE_URL": str(engine.url)},
+        capture_output=True,
+        text=True,
+    )
+    assert other_worker.returncode != 0
+    assert "single worker" in other_worker.stderr
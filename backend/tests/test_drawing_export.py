@@ -0,0 +1,123 @@
+import json
+import pytest
+from app.core.config import settings
+from app.database.session import SessionLocal
+from app.models import Pair
+from tests.test_drawing_edits import moved
+
+EXPORT = "/api/v1/drawings/export"
+IMPORT = "/api/v1/drawings/import"
+
+
+@pytest.fixture
+def drawings(client):
+    db = SessionLocal()
+    db.add(Pair(symbol="GBPUSD", timeframe="15m"))
+    db.commit()
+    db.close()
+
+    created = []
+    for i, pair in enumerate(["EURUSD", "GBPUSD", "EURUSD"]):
+        response = client.post("/api/v1/drawings/", json={
+            "name": f"drawing {i}",
+            "type": "channel",
+            "pair": pair,
+            "color": "#ff0000",
+            "series": [
+                {"points": [{"x": j, "y": 1.0 + i + j / 10} for j in range(i + 2)], "name": "upper"},
+                {"points": [{"x": 0, "y": 0.5}], "style": {"dash": [4, 2]}},
+            ],
+        })
+        assert response.status_code == 201
+        created.append(response.json())
+    return created
+
+
+def export(client, **params) -> list[dict]:
+    response = client.get(EXPORT, params=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def without_ids(drawing: dict) -> dict:
+    return {
+        **{key: value for key, value in drawing.items() if key != "id"},
+        "series": [
+            {
+                **{key: value for key, value in series.items() if key != "id"},
+                "points": [{"x": point["x"], "y": point["y"]} for point in series["points"]],
+            }
+            for series in drawing["series"]
+        ],
+    }
+
+
+def ndjson(drawings: list[dict]) -> bytes:
+    return "".join(json.dumps(drawing) + "\n" for drawing in drawings).encode()
+
+
+def test_export_streams_every_drawing_oldest_first(client, drawings, monkeypatch):
+    monkeypatch.setattr(settings, "DRAWING_EXPORT_BATCH_SIZE", 1)
+    assert export(client) == [client.get(f"/api/v1/drawings/{d['id']}").json() for d in drawings]
+
+    response = client.get(EXPORT, params={"pair": "gbpusd"})
+    assert 'filename="drawings-GBPUSD.ndjson"' in response.headers["content-disposition"]
+    assert [drawing["name"] for drawing in export(client, pair="GBPUSD")] == ["drawing 1"]
+
+
+def test_export_includes_buffered_edits(client, drawings):
+    drawing = drawings[0]
+    assert client.put(f"/api/v1/drawings/{drawing['id']}", json=moved(drawing, 0.5)).status_code == 200
+    exported = export(client)[0]
+    assert exported["series"][0]["points"][0]["y"] == pytest.approx(drawing["series"][0]["points"][0]["y"] + 0.5)
+
+
+def test_round_trip(client, drawings, monkeypatch):
+    monkeypatch.setattr(settings, "DRAWING_IMPORT_BATCH_POINTS", 4)
+    exported = export(client)
+    for pair in ("EURUSD", "GBPUSD"):
+        assert client.delete("/api/v1/drawings/", params={"pair": pair}).status_code == 200
+    assert export(client) == []
+
+    response = client.post(IMPORT, content=ndjson(exported))
+    assert response.status_code == 200
+    # 3 + 4 + 5 points; a batch is committed once it reaches 4
+    assert response.json() == {"imported": 3, "points": 12, "batches": 2}
+
+    reimported = export(client)
+    assert [without_ids(drawing) for drawing in reimported] == [without_ids(drawing) for drawing in exported]
+
+
+def test_import_into_another_pair(client, drawings):
+    body = ndjson(export(client, pair="EURUSD"))
+    response = client.post(IMPORT, params={"pair": "GBPUSD"}, content=body)
+    assert response.json()["imported"] == 2
+    copies = export(client, pair="GBPUSD")
+    assert [drawing["name"] for drawing in copies] == ["drawing 1", "drawing 0", "drawing 2"]
+    # Exported ids are ignored; the copies get new ones
+    assert len({drawing["id"] for drawing in export(client)}) == 5
+
+
+def test_blank_lines_and_a_missing_final_newline_are_accepted(client, drawings):
+    body = ndjson(export(client, pair="GBPUSD"))
+    response = client.post(IMPORT, content=b"\n" + body + b"\n\n" + body.rstrip(b"\n"))
+    assert response.json()["imported"] == 2
+
+
+def test_malformed_line_keeps_committed_batches(client, drawings, monkeypatch):
+    monkeypatch.setattr(settings, "DRAWING_IMPORT_BATCH_POINTS", 1)
+    body = ndjson(export(client)[:2]) + b'{"name": "broken"}\n' + ndjson(export(client)[2:])
+
+    response = client.post(IMPORT, content=body)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Line 3:")
+    assert "2 drawing(s) imported" in response.json()["detail"]
+    assert len(export(client)) == 5
+
+
+def test_unknown_pair_is_rejected(client, drawings):
+    drawing = {**export(client)[0], "pair": "NOPE"}
+    response = client.post(IMPORT, content=ndjson([drawing]))
+    assert response.status_code == 400
+    assert len(export(client)) == 3
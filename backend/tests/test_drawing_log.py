@@ -0,0 +1,64 @@
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.database.session import SessionLocal
+from app.main import app
+from app.models import DrawingEvent, Pair
+from app.services.drawing_service import drawing_service
+from tests.test_drawing_edits import create_line, moved
+
+
+def log_update(drawing_id: int, data: dict):
+    """Log an update the way a buffered edit is, without it reaching the drawing tables"""
+    db = SessionLocal()
+    try:
+        pair_id = db.query(Pair.id).filter(Pair.symbol == "EURUSD").scalar()
+        drawing_service._append_event(db, pair_id, drawing_id, "update", data)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_invalid_update_is_not_logged(client):
+    drawing = create_line(client)
+    assert client.put(f"/api/v1/drawings/{drawing['id']}", json={"name": None}).status_code == 400
+    changes = client.get("/api/v1/drawings/changes?pair=EURUSD").json()["items"]
+    assert [change["op"] for change in changes] == ["create"]
+
+
+def test_restart_replays_unsnapshotted_edits(client):
+    drawing = create_line(client)
+    log_update(drawing["id"], {"name": "replayed"})
+    
+    # The lifespan replays the log before serving
+    with TestClient(app) as restarted:
+        assert restarted.get(f"/api/v1/drawings/{drawing['id']}").json()["name"] == "replayed"
+    assert drawing_service.recover_from_log() == 0
+
+
+def test_restart_skips_events_that_fail(client):
+    drawing = create_line(client)
+    log_update(drawing["id"], {"name": None})
+    log_update(drawing["id"], {"color": "#ff0000"})
+    
+    with TestClient(app) as restarted:
+        stored = restarted.get(f"/api/v1/drawings/{drawing['id']}").json()
+        assert (stored["name"], stored["color"]) == ("line", "#ff0000")
+        snapshot_seq = restarted.get("/api/v1/drawings/changes?pair=EURUSD").json()["snapshot_seq"]
+        assert snapshot_seq == restarted.get("/api/v1/drawings/changes?pair=EURUSD").json()["last_seq"]
+
+
+def test_snapshots_truncate_the_log(client, monkeypatch):
+    monkeypatch.setattr(settings, "DRAWING_LOG_RETAIN_EVENTS", 5)
+    drawing = create_line(client)
+    for step in range(20):
+        client.put(f"/api/v1/drawings/{drawing['id']}", json=moved(drawing, step * 0.01))
+        drawing_service.flush_pending()
+    
+    db = SessionLocal()
+    try:
+        assert db.query(DrawingEvent).count() == 5
+    finally:
+        db.close()
+    feed = client.get("/api/v1/drawings/changes?pair=EURUSD&since=0").json()
+    assert feed["resync_required"]
+    assert len(feed["items"]) == 5
@@ -0,0 +1,113 @@
+import asyncio
+import numpy as np
+import pytest
+from ai.inference import InferenceService, LinearSignalModel
+from app.services.candle_store import CandleArrays
+from app.services.data_service import data_service
+
+START = 1_700_000_000
+WINDOW = 8
+
+
+def bars(n: int, seed: int, start: int = START) -> CandleArrays:
+    close = 1.1 + np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n))
+    return CandleArrays(
+        time=start + np.arange(n, dtype=np.int64) * 900,
+        open=close,
+        high=close + 0.001,
+        low=close - 0.001,
+        close=close,
+        volume=np.ones(n, dtype=np.int64),
+    )
+
+
+class CountingModel(LinearSignalModel):
+    """Records the batch size of every forward pass"""
+
+    def __init__(self):
+        default = LinearSignalModel.default(WINDOW)
+        super().__init__(default.weights, default.bias)
+        self.batches = []
+
+    def forward(self, closes):
+        self.batches.append(len(closes))
+        return super().forward(closes)
+
+
+@pytest.fixture
+def service(store):
+    for seed, symbol in enumerate(("AAA", "BBB", "CCC")):
+        store.write(symbol, "15m", bars(50, seed))
+    return InferenceService(CountingModel(), max_batch_size=64, max_latency_ms=5)
+
+
+def score_all(service: InferenceService, symbols: list[str]) -> list:
+    async def run():
+        return await asyncio.gather(*(service.score(symbol) for symbol in symbols), return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_share_one_forward_pass(service):
+    results = score_all(service, ["AAA", "BBB", "CCC", "AAA"])
+    assert service.model.batches == [3]
+    assert [result.symbol for result in results] == ["AAA", "BBB", "CCC", "AAA"]
+    assert results[0] is results[3]
+    
+    # Matches scoring each window alone
+    closes = data_service.get_arrays("BBB").close[-(WINDOW + 1):]
+    score, _ = LinearSignalModel.forward(service.model, closes[None, :])
+    assert results[1].score == pytest.approx(float(score[0]))
+
+
+def test_full_batches_flush_immediately(store):
+    for seed, symbol in enumerate(("AAA", "BBB", "CCC")):
+        store.write(symbol, "15m", bars(50, seed))
+    # A latency long enough that only the size limit can explain a prompt first batch
+    service = InferenceService(CountingModel(), max_batch_size=2, max_latency_ms=200)
+    score_all(service, ["AAA", "BBB", "CCC"])
+    assert service.model.batches == [2, 1]
+
+
+def test_results_are_cached_until_a_new_bar_arrives(service, store):
+    first = score_all(service, ["AAA"])[0]
+    assert score_all(service, ["AAA"])[0] is first
+    assert service.model.batches == [1]
+    
+    store.write("AAA", "15m", bars(51, seed=0))
+    second = score_all(service, ["AAA"])[0]
+    assert service.model.batches == [1, 1]
+    assert second.time == first.time + 900
+
+
+def test_windows_are_loaded_off_the_event_loop(service, monkeypatch):
+    calls = []
+    get_arrays = data_service.get_arrays
+    
+    def recording_get_arrays(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            calls.append(False)
+        except RuntimeError:
+            calls.append(True)
+        return get_arrays(*args, **kwargs)
+    
+    monkeypatch.setattr(data_service, "get_arrays", recording_get_arrays)
+    score_all(service, ["AAA", "BBB"])
+    assert calls == [True, True]
+
+
+def test_a_failing_symbol_does_not_fail_its_batch(service, store):
+    store.write("SHORT", "15m", bars(3, seed=9))
+    results = score_all(service, ["AAA", "SHORT", "MISSING"])
+    assert results[0].symbol == "AAA"
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], FileNotFoundError)
+    assert service.model.batches == [1]
+
+
+def test_signals_endpoint(client):
+    response = client.get("/api/v1/signals/", params={"symbols": "EURUSD,NOPE"})
+    assert response.status_code == 404
+    response = client.get("/api/v1/signals/EURUSD")
+    assert response.status_code == 200
+    assert -1 <= response.json()["score"] <= 1
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+from pathlib import Path
+from app.services.candle_store import CandleArrays
+from app.services.ingest_service import (
+    CSV_COLUMNS, _check_header, _split_chunks, dedupe_sorted, ingest_service, parse_filename,
+)
+from tests.test_data_service import START, bars
+
+HEADER = ",".join(CSV_COLUMNS) + "\n"
+
+
+def write_export(path: Path, rows: list[tuple]) -> Path:
+    """rows: (time, close) pairs written as flat candles"""
+    lines = [f"{time},{close},{close},{close},{close},{i},0,0\n" for i, (time, close) in enumerate(rows)]
+    path.write_text(HEADER + "".join(lines))
+    return path
+
+
+@pytest.mark.parametrize("name,expected", [
+    ("EURUSD_15m.csv", ("EURUSD", "15m")),
+    ("eurusd_1h_2024.csv", ("EURUSD", "1h")),
+    ("BRK.B_1d_export_final.csv", ("BRK.B", "1d")),
+])
+def test_parse_filename(name, expected):
+    assert parse_filename(Path(name)) == expected
+
+
+def test_unparseable_filename_is_rejected():
+    with pytest.raises(ValueError, match="SYMBOL_TIMEFRAME"):
+        parse_filename(Path("export.csv"))
+
+
+def test_header_is_checked(tmp_path):
+    path = tmp_path / "AAA_15m.csv"
+    path.write_text("time,open,high,low,close\n1,1,1,1,1\n")
+    with pytest.raises(ValueError, match="expected columns"):
+        _check_header(path)
+
+
+def test_chunks_end_on_line_boundaries(tmp_path):
+    path = write_export(tmp_path / "AAA_15m.csv", [(START + i * 900, 1.0 + i / 1000) for i in range(200)])
+    start = _check_header(path)
+    ranges = _split_chunks(path, start, chunk_bytes=100)
+    assert len(ranges) > 10
+    assert ranges[0][0] == start and ranges[-1][1] == path.stat().st_size
+    data = path.read_bytes()
+    for (_, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end == next_start and data[end - 1:end] == b"\n"
+
+
+def test_dedupe_keeps_the_last_row_per_time():
+    arrays = CandleArrays(
+        time=np.array([3, 1, 3, 2, 1], dtype=np.int64),
+        open=np.array([30.0, 10.0, 31.0, 20.0, 11.0]),
+        high=np.zeros(5), low=np.zeros(5), close=np.zeros(5),
+        volume=np.zeros(5, dtype=np.int64),
+    )
+    unique, duplicates = dedupe_sorted(arrays)
+    assert duplicates == 2
+    assert unique.time.tolist() == [1, 2, 3]
+    assert unique.open.tolist() == [11.0, 20.0, 31.0]
+
+
+def test_ingest_merges_chunks_and_files(store, tmp_path):
+    # Two files overlapping on 50 bars; the later file (by name) wins
+    write_export(tmp_path / "AAA_15m_a.csv", [(START + i * 900, 1.0) for i in range(150)])
+    write_export(tmp_path / "AAA_15m_b.csv", [(START + i * 900, 2.0) for i in range(100, 300)])
+
+    report, = ingest_service.ingest(tmp_path, workers=2, chunk_bytes=512)
+    assert (report.symbol, report.timeframe, report.files) == ("AAA", "15m", 2)
+    assert (report.rows_parsed, report.duplicates, report.rows_added, report.rows_total) == (350, 50, 300, 300)
+
+    arrays = store.load_range("AAA", "15m", START, START + 300 * 900)
+    assert np.all(np.diff(arrays.time) == 900)
+    assert arrays.close[:100].tolist() == [1.0] * 100
+    assert arrays.close[100:].tolist() == [2.0] * 200
+
+
+def test_formatted_dates_are_parsed_as_utc(store, tmp_path):
+    path = tmp_path / "AAA_1h.csv"
+    path.write_text(HEADER + "2024.09.16 00:00,1.1,1.2,1.0,1.15,5,0,0\n2024.09.16 01:00,1.15,1.3,1.1,1.25,7,0,0\n")
+    ingest_service.ingest(path, workers=1)
+    arrays = store.load_range("AAA", "1h", 0, 2**40)
+    assert arrays.time.tolist() == [1726444800, 1726448400]
+    assert arrays.volume.tolist() == [5, 7]
+
+
+def test_append_keeps_stored_candles(store):
+    ingest_service.merge("AAA", "15m", bars([1.0, 1.0, 1.0]))
+    added, total = ingest_service.merge("AAA", "15m", bars([2.0, 2.0, 2.0, 2.0], start=START + 900))
+    assert (added, total) == (2, 5)
+    assert store.load_range("AAA", "15m", START, START + 10 * 900).close.tolist() == [1.0, 1.0, 1.0, 2.0, 2.0]
+
+
+def test_overwrite_replaces_only_the_incoming_range(store):
+    ingest_service.merge("AAA", "15m", bars([1.0] * 6))
+    # Replaces bars 2..3 and drops the stored bar at 4 that the new data skips
+    replacement = bars([2.0, 2.0, 2.0], start=START + 2 * 900)
+    replacement = CandleArrays(*(column[[0, 1]] for column in replacement))
+    replacement.time[1] = START + 4 * 900
+    added, total = ingest_service.merge("AAA", "15m", replacement, mode="overwrite")
+    assert (added, total) == (2, 5)
+
+    arrays = store.load_range("AAA", "15m", START, START + 10 * 900)
+    assert arrays.time.tolist() == [START + i * 900 for i in (0, 1, 2, 4, 5)]
+    assert arrays.close.tolist() == [1.0, 1.0, 2.0, 2.0, 1.0]
+
+
+def test_merge_across_months_keeps_other_months(store):
+    # 15m bars from mid-November 2023 into December
+    history = bars([1.0] * 4000)
+    ingest_service.merge("AAA", "15m", history)
+    months_before = len(store.get_manifest("AAA", "15m").partitions)
+
+    ingest_service.merge("AAA", "15m", bars([2.0], start=START + 4000 * 900))
+    assert store.get_manifest("AAA", "15m").rows == 4001
+    assert len(store.get_manifest("AAA", "15m").partitions) == months_before
+    arrays = store.load_range("AAA", "15m", START, START + 4001 * 900)
+    assert arrays.close.tolist() == [1.0] * 4000 + [2.0]
+
+
+def test_unknown_mode_is_rejected(store):
+    with pytest.raises(ValueError, match="mode"):
+        ingest_service.merge("AAA", "15m", bars([1.0]), mode="upsert")
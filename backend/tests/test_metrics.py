@@ -0,0 +1,87 @@
+import logging
+import pytest
+from app.core.metrics import Counter, Gauge, Histogram, MetricsRegistry, cache_requests, record_cache
+from app.core.sampled_logging import log_sampled
+from tests.test_drawing_edits import create_line
+
+
+def sample(text: str, line_start: str) -> float:
+    """Value of the exposition line starting with `line_start` (0 when absent)"""
+    for line in text.splitlines():
+        if line.startswith(line_start + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(Histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0)))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, route="/a")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert sample(text, 'latency_seconds_bucket{route="/a",le="0.1"}') == 2
+    assert sample(text, 'latency_seconds_bucket{route="/a",le="1"}') == 3
+    assert sample(text, 'latency_seconds_bucket{route="/a",le="+Inf"}') == 4
+    assert sample(text, 'latency_seconds_sum{route="/a"}') == pytest.approx(3.65)
+    assert sample(text, 'latency_seconds_count{route="/a"}') == 4
+
+
+def test_counter_and_gauge_render_labels():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("jobs_total", "Jobs", ("queue", "result")))
+    counter.inc(queue="fast", result="ok")
+    counter.inc(2, queue="fast", result="ok")
+    counter.inc(queue="slow", result="failed")
+    registry.register(Gauge("depth", "Queue depth", ("queue",), lambda: {("fast",): 7}))
+
+    text = registry.render()
+    assert counter.value(queue="fast", result="ok") == 3
+    assert sample(text, 'jobs_total{queue="fast",result="ok"}') == 3
+    assert sample(text, 'jobs_total{queue="slow",result="failed"}') == 1
+    assert sample(text, 'depth{queue="fast"}') == 7
+
+
+def test_cache_hit_ratio(client):
+    for hit in (True, True, True, False):
+        record_cache("test_cache", hit=hit)
+    text = client.get("/metrics").text
+    hits = cache_requests.value(cache="test_cache", result="hit")
+    misses = cache_requests.value(cache="test_cache", result="miss")
+    assert sample(text, 'cache_hit_ratio{cache="test_cache"}') == pytest.approx(hits / (hits + misses))
+
+
+def test_requests_are_recorded_per_route_template(client):
+    route = 'method="GET",route="/api/v1/drawings/{drawing_id}"'
+    drawing_id = create_line(client)["id"]
+    before = client.get("/metrics").text
+
+    assert client.get(f"/api/v1/drawings/{drawing_id}").status_code == 200
+    assert client.get(f"/api/v1/drawings/{drawing_id}").status_code == 200
+    assert client.get("/api/v1/does-not-exist").status_code == 404
+
+    after = client.get("/metrics").text
+
+    def increase(line_start: str) -> float:
+        return sample(after, line_start) - sample(before, line_start)
+    assert increase(f'http_requests_total{{{route},status="200"}}') == 2
+    assert increase(f"http_request_db_queries_count{{{route}}}") == 2
+    # Reading a drawing runs SQL, and it is attributed to the request
+    assert increase(f"http_request_db_queries_sum{{{route}}}") > 0
+    assert increase('http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+    assert f'/api/v1/drawings/{drawing_id}"' not in after
+
+
+class Unformattable:
+    def __str__(self):
+        raise AssertionError("formatted a message that isn't logged")
+
+
+def test_log_sampled_formats_only_emitted_messages(caplog):
+    logger = logging.getLogger("tests.sampled")
+    with caplog.at_level(logging.INFO, logger="tests.sampled"):
+        log_sampled(logger, logging.DEBUG, "%s", Unformattable(), rate=1.0)
+        log_sampled(logger, logging.INFO, "%s", Unformattable(), rate=0.0)
+        log_sampled(logger, logging.INFO, "kept %d", 1, rate=1.0)
+    assert caplog.messages == ["kept 1"]
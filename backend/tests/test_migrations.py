@@ -0,0 +1,110 @@
+from pathlib import Path
+import pytest
+import sqlalchemy as sa
+from alembic import command
+from alembic.config import Config
+from app.core.config import settings
+
+BEFORE_PACKING = "7a2b1c8d9e20"
+PACKING = "b8c9d0e1f2a3"
+
+
+@pytest.fixture
+def migrations(tmp_path, monkeypatch):
+    """Alembic config for an empty database of its own (env.py reads the URL from settings)"""
+    url = f"sqlite:///{tmp_path}/migrations.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    # No ini file: env.py would otherwise reconfigure logging for the whole test run
+    config = Config()
+    config.set_main_option("script_location", str(Path(__file__).parent.parent / "alembic"))
+    engine = sa.create_engine(url)
+    yield config, engine
+    engine.dispose()
+
+
+def series_points(engine) -> dict[int, list[tuple]]:
+    with engine.connect() as conn:
+        rows = conn.execute(sa.text("SELECT series_id, id, x, y FROM points ORDER BY series_id, order_index"))
+        result: dict[int, list[tuple]] = {}
+        for series_id, point_id, x, y in rows:
+            result.setdefault(series_id, []).append((point_id, x, y))
+        return result
+
+
+def test_pack_points_round_trip_with_mixed_layouts(migrations, monkeypatch):
+    config, engine = migrations
+    monkeypatch.setattr(settings, "POINT_STORAGE_MODE", "packed")
+    command.upgrade(config, BEFORE_PACKING)
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO pairs (id, symbol, timeframe, is_active) VALUES (1, 'EURUSD', '15m', 1)"))
+        conn.execute(sa.text("INSERT INTO drawings (id, name, type, color, pair_id, is_incomplete) VALUES (1, 'd', 'line', '#000', 1, 0)"))
+        conn.execute(sa.text("INSERT INTO series (id, drawing_id, order_index) VALUES (1, 1, 0), (2, 1, 1), (3, 1, 2)"))
+        conn.execute(sa.text(
+            "INSERT INTO points (id, series_id, x, y, order_index) VALUES (1, 1, 1, 1.1, 0), (2, 1, 2, 1.2, 1), (3, 2, 3, 1.3, 0)"
+        ))
+    original = series_points(engine)
+    
+    command.upgrade(config, PACKING)
+    assert series_points(engine) == {}
+    with engine.begin() as conn:
+        packed = dict(conn.execute(sa.text("SELECT id, points_packed FROM series ORDER BY id")).all())
+        assert packed == {1: "[[1, 1.0, 1.1], [2, 2.0, 1.2]]", 2: "[[3, 3.0, 1.3]]", 3: "[]"}
+        # Series 2 goes back to the row layout, as POINT_STORAGE_MODE=rows writes it
+        conn.execute(sa.text("UPDATE series SET points_packed = 'null' WHERE id = 2"))
+        conn.execute(sa.text("INSERT INTO points (id, series_id, x, y, order_index) VALUES (4, 2, 4, 1.4, 0)"))
+    
+    command.downgrade(config, BEFORE_PACKING)
+    assert series_points(engine) == {1: original[1], 2: [(4, 4.0, 1.4)]}
+    
+    command.upgrade(config, "head")
+    command.downgrade(config, BEFORE_PACKING)
+    assert series_points(engine) == {1: original[1], 2: [(4, 4.0, 1.4)]}
+
+
+def insert_drawing(engine, n_series: int):
+    """One drawing with `n_series` series of two points each"""
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO pairs (id, symbol, timeframe, is_active) VALUES (1, 'EURUSD', '15m', 1)"))
+        conn.execute(sa.text("INSERT INTO drawings (id, name, type, color, pair_id, is_incomplete) VALUES (1, 'd', 'line', '#000', 1, 0)"))
+        conn.execute(
+            sa.text("INSERT INTO series (id, drawing_id, order_index) VALUES (:id, 1, :id)"),
+            [{"id": series_id} for series_id in range(1, n_series + 1)],
+        )
+        conn.execute(
+            sa.text("INSERT INTO points (id, series_id, x, y, order_index) VALUES (:id, :series_id, :x, :y, :order_index)"),
+            [
+                {"id": 2 * series_id + idx, "series_id": series_id, "x": series_id, "y": 1.0 + idx, "order_index": idx}
+                for series_id in range(1, n_series + 1)
+                for idx in range(2)
+            ],
+        )
+
+
+def test_rows_mode_upgrade_leaves_points_in_place(migrations, monkeypatch):
+    config, engine = migrations
+    monkeypatch.setattr(settings, "POINT_STORAGE_MODE", "rows")
+    command.upgrade(config, BEFORE_PACKING)
+    insert_drawing(engine, 3)
+    original = series_points(engine)
+    
+    command.upgrade(config, "head")
+    assert series_points(engine) == original
+    with engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT COUNT(*) FROM series WHERE points_packed IS NOT NULL")).scalar() == 0
+        assert conn.execute(sa.text("SELECT next_value FROM id_sequences WHERE name = 'points'")).scalar() == 8
+
+
+def test_packing_spans_several_batches(migrations, monkeypatch):
+    config, engine = migrations
+    monkeypatch.setattr(settings, "POINT_STORAGE_MODE", "packed")
+    command.upgrade(config, BEFORE_PACKING)
+    insert_drawing(engine, 2500)  # BATCH_SIZE is 1000 series
+    original = series_points(engine)
+    
+    command.upgrade(config, PACKING)
+    with engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT COUNT(*) FROM points")).scalar() == 0
+        assert conn.execute(sa.text("SELECT COUNT(*) FROM series WHERE json_array_length(points_packed) = 2")).scalar() == 2500
+    
+    command.downgrade(config, BEFORE_PACKING)
+    assert series_points(engine) == original
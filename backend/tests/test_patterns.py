@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.services.candle_store import CandleArrays
+from app.services.data_service import data_service
+from app.services.pattern_service import pattern_service
+
+START = 1_700_000_000  # All bars fall in one monthly partition
+
+
+def bars(close: np.ndarray) -> CandleArrays:
+    return CandleArrays(
+        time=START + np.arange(len(close), dtype=np.int64) * 900,
+        open=close,
+        high=close + 0.001,
+        low=close - 0.001,
+        close=close,
+        volume=np.ones(len(close), dtype=np.int64),
+    )
+
+
+def random_walk(n: int, seed: int) -> np.ndarray:
+    return 1.1 + np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n))
+
+
+def test_search_sees_ingested_data(store):
+    close = random_walk(300, seed=1)
+    store.write("AAA", "15m", bars(close))
+    window = (START + 50 * 900, START + 69 * 900)
+    before = pattern_service.search("AAA", *window, k=1, symbols=["AAA"])
+    
+    # Re-ingest with the query window repeated far from the original
+    close[200:220] = close[50:70] + 0.05
+    store.write("AAA", "15m", bars(close))
+    after = pattern_service.search("AAA", *window, k=1, symbols=["AAA"])
+    assert after[0].start_time == START + 200 * 900
+    assert after[0].distance == pytest.approx(0, abs=1e-3)  # Prices are stored fixed-point
+    assert before[0].start_time != after[0].start_time
+
+
+def test_search_skips_symbols_shorter_than_the_window(store):
+    store.write("AAA", "15m", bars(random_walk(300, seed=2)))
+    store.write("SHORT", "15m", bars(random_walk(5, seed=3)))
+    matches = pattern_service.search("AAA", START, START + 19 * 900, k=5, symbols=["AAA", "SHORT"])
+    assert matches and all(match.symbol == "AAA" for match in matches)
+
+
+def test_catalog_search_ignores_symbols_without_the_timeframe(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", tmp_path / "missing.csv")
+    store.write("AAA", "15m", bars(random_walk(300, seed=4)))
+    store.write("HOURLY", "1h", bars(random_walk(300, seed=5)))
+    matches = pattern_service.search("AAA", START, START + 19 * 900, k=5)
+    assert matches and all(match.symbol == "AAA" for match in matches)
+
+
+def test_index_is_shared_across_window_lengths(store):
+    store.write("AAA", "15m", bars(random_walk(400, seed=6)))
+    close = data_service.get_arrays("AAA").close  # As stored (fixed-point)
+    index = pattern_service.get_index("AAA")
+    for m in (8, 37, 120):
+        query = close[100:100 + m]
+        # Brute force: z-normalize every window and compare directly
+        windows = np.lib.stride_tricks.sliding_window_view(close, m)
+        z = (windows - windows.mean(axis=1, keepdims=True)) / windows.std(axis=1, keepdims=True)
+        expected = np.sqrt((((query - query.mean()) / query.std() - z) ** 2).sum(axis=1))
+        assert np.allclose(index.distance_profile(query), expected, atol=1e-4)
+    assert pattern_service.get_index("AAA") is index
+    assert len(pattern_service._index_cache) == 1
+
+
+def test_search_endpoint_covers_the_catalog(store, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CSV_FILE_PATH", tmp_path / "missing.csv")
+    store.write("AAA", "15m", bars(random_walk(300, seed=7)))
+    store.write("HOURLY", "1h", bars(random_walk(300, seed=8)))
+    response = client.get("/api/v1/patterns/similar", params={
+        "symbol": "AAA", "start_time": START, "end_time": START + 19 * 900, "k": 3,
+    })
+    assert response.status_code == 200
+    assert response.json()["count"] == 3
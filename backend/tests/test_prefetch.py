@@ -0,0 +1,99 @@
+import threading
+import time
+import pytest
+from app.core.config import settings
+from app.services.prefetch_service import PrefetchService, prefetch_service, prefetches
+from tests.test_data_service import bars
+
+
+def settle(service: PrefetchService, timeout: float = 5.0):
+    """Wait for the background render to finish"""
+    deadline = time.monotonic() + timeout
+    while service._inflight:
+        assert time.monotonic() < deadline, "prefetch did not finish"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "CANDLE_PREFETCH_CPU_BUDGET", 1.0)
+    monkeypatch.setattr(settings, "CANDLE_PREFETCH_MIN_ACCURACY", 0.5)
+    return PrefetchService()
+
+
+def test_predicted_page_is_rendered_once(service):
+    renders = []
+    service.expect("AAA", "page-2", lambda: renders.append(1) or "body")
+    settle(service)
+    service.expect("AAA", "page-2", lambda: renders.append(1) or "body")
+    assert service.take("page-2") == "body"
+    assert service.take("page-2") is None
+    assert len(renders) == 1
+
+
+def test_cached_pages_are_not_rendered(service):
+    service.expect("AAA", "page-2", lambda: pytest.fail("rendered a cached page"), cached=True)
+    assert not service._inflight
+
+
+def test_one_render_at_a_time(service):
+    release = threading.Event()
+    service.expect("AAA", "page-2", lambda: release.wait(5) and "slow")
+    skipped = prefetches.value(result="skipped_budget")
+    service.expect("BBB", "page-9", lambda: "fast")
+    assert prefetches.value(result="skipped_budget") == skipped + 1
+
+    release.set()
+    settle(service)
+    assert service.take("page-2") == "slow"
+    assert service.take("page-9") is None
+
+
+def test_spent_cpu_budget_skips_renders(service, monkeypatch):
+    service._cpu_tokens = -0.01
+    monkeypatch.setattr(settings, "CANDLE_PREFETCH_CPU_BUDGET", 1e-6)
+    service.expect("AAA", "page-2", lambda: "body")
+    assert not service._inflight and service.take("page-2") is None
+
+
+def test_unfollowed_predictions_stop_prefetching(service):
+    for i in range(4):
+        service.expect("AAA", f"predicted-{i}", lambda: "body")
+        settle(service)
+        service.record("AAA", f"requested-{i}")
+    # 0.8^4 = 0.41 after four misses
+    service.expect("AAA", "predicted-4", lambda: pytest.fail("prefetched for a reader jumping around"))
+    assert not service._inflight
+
+    # Following predictions again lifts accuracy back over the threshold
+    service.record("AAA", "predicted-4")
+    service.expect("AAA", "predicted-5", lambda: "body")
+    settle(service)
+    assert service.take("predicted-5") == "body"
+
+
+def test_failed_renders_are_dropped(service):
+    failed = prefetches.value(result="failed")
+    service.expect("AAA", "page-2", lambda: 1 / 0)
+    settle(service)
+    assert service.take("page-2") is None
+    assert prefetches.value(result="failed") == failed + 1
+
+
+def test_scrolling_back_is_served_from_prefetch(client, store, monkeypatch):
+    monkeypatch.setattr(settings, "CANDLE_PREFETCH_CPU_BUDGET", 1.0)
+    prefetch_service._patterns.clear()
+    store.write("AAA", "15m", bars([1.0 + i / 1000 for i in range(300)]))
+
+    latest = client.get("/api/v1/pairs/AAA/candles", params={"limit": 100}).json()
+    settle(prefetch_service)
+    used = prefetches.value(result="used")
+
+    previous = client.get(latest["previous"])
+    assert previous.status_code == 200
+    assert prefetches.value(result="used") == used + 1
+    # Identical to a page rendered on request
+    prefetch_service.clear()
+    store.write("AAA", "15m", bars([1.0 + i / 1000 for i in range(300)]))
+    assert client.get(latest["previous"]).json() == previous.json()
+    assert previous.json()["results"][-1]["time"] < latest["results"][0]["time"]
@@ -0,0 +1,70 @@
+import asyncio
+import numpy as np
+import pytest
+from app.services.candle_store import CandleArrays
+from app.services.data_service import data_service
+from app.services.range_index import BLOCK, RangeIndex
+
+START = 1_700_000_000
+
+
+def random_bars(n: int, seed: int) -> CandleArrays:
+    rng = np.random.default_rng(seed)
+    # Few distinct prices, so ties between equal highs/lows are common
+    close = 1.1 + rng.integers(-20, 20, n) * 0.001
+    return CandleArrays(
+        time=START + np.arange(n, dtype=np.int64) * 900,
+        open=close,
+        high=close + rng.integers(0, 5, n) * 0.001,
+        low=close - rng.integers(0, 5, n) * 0.001,
+        close=close,
+        volume=rng.integers(1, 100, n).astype(np.int64),
+    )
+
+
+@pytest.mark.parametrize("n", [1, BLOCK - 1, BLOCK, 5 * BLOCK + 7, 2000])
+def test_range_stats_match_brute_force(n):
+    arrays = random_bars(n, seed=n)
+    index = RangeIndex(arrays)
+    rng = np.random.default_rng(n + 1)
+    # Range bounds both on and between bar times, reaching past either end
+    bounds = rng.integers(START - 2000, START + n * 900 + 2000, (500, 2))
+    starts, ends = bounds.min(axis=1), bounds.max(axis=1)
+    
+    for stats, start, end in zip(index.query(starts, ends), starts, ends):
+        inside = np.flatnonzero((arrays.time >= start) & (arrays.time <= end))
+        assert stats.bars == len(inside)
+        if not len(inside):
+            assert stats.high is None and stats.volume == 0
+            continue
+        high = inside[np.argmax(arrays.high[inside])]  # argmax keeps the earliest tie
+        low = inside[np.argmin(arrays.low[inside])]
+        assert (stats.high, stats.high_time) == (arrays.high[high], arrays.time[high])
+        assert (stats.low, stats.low_time) == (arrays.low[low], arrays.time[low])
+        assert stats.volume == arrays.volume[inside].sum()
+        assert (stats.open, stats.close) == (arrays.open[inside[0]], arrays.close[inside[-1]])
+
+
+def test_range_stats_endpoint_builds_the_index_off_the_event_loop(client, store, monkeypatch):
+    store.write("AAA", "15m", random_bars(300, seed=1))
+    calls = []
+    build = data_service.get_range_index
+    
+    def recording_build(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            calls.append(False)
+        except RuntimeError:
+            calls.append(True)
+        return build(*args, **kwargs)
+    
+    monkeypatch.setattr(data_service, "get_range_index", recording_build)
+    response = client.get("/api/v1/pairs/AAA/range-stats", params={"start_time": START, "end_time": START + 99 * 900})
+    assert response.status_code == 200
+    assert response.json()["bars"] == 100
+    response = client.post("/api/v1/pairs/AAA/range-stats", json={
+        "ranges": [{"start_time": START, "end_time": START + 9 * 900}],
+    })
+    assert response.status_code == 200
+    assert response.json()["items"][0]["bars"] == 10
+    assert calls == [True, True]
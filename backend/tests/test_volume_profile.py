@@ -0,0 +1,82 @@
+import asyncio
+import numpy as np
+import pytest
+from app.services.candle_store import CandleArrays
+from app.services.volume_profile_service import VolumeProfileIndex, volume_profile_service
+
+START = 1_700_000_000
+BIN = 0.0005
+
+
+def random_bars(n: int, seed: int) -> CandleArrays:
+    rng = np.random.default_rng(seed)
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0005, n))
+    spread = rng.exponential(0.0008, n)
+    # Some bars have no range at all
+    spread[rng.random(n) < 0.05] = 0.0
+    low = close - spread * rng.random(n)
+    return CandleArrays(
+        time=START + np.arange(n, dtype=np.int64) * 900,
+        open=close,
+        high=low + spread,
+        low=low,
+        close=close,
+        volume=rng.integers(1, 100, n).astype(np.int64),
+    )
+
+
+def brute_force(arrays: CandleArrays, lo: int, hi: int, base: int, n_bins: int) -> np.ndarray:
+    """Spread each bar's volume over its range by the overlap with every bin"""
+    profile = np.zeros(n_bins)
+    edges = np.arange(n_bins + 1)
+    for i in range(lo, hi):
+        u = arrays.low[i] / BIN - base
+        w = arrays.high[i] / BIN - base
+        if u == w:
+            profile[min(int(np.floor(u)), n_bins - 1)] += arrays.volume[i]
+            continue
+        overlap = np.clip(np.minimum(edges[1:], w) - np.maximum(edges[:-1], u), 0.0, None)
+        profile += arrays.volume[i] * overlap / (w - u)
+    return profile
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_windows_match_brute_force(seed):
+    arrays = random_bars(1500, seed)
+    index = VolumeProfileIndex(arrays, BIN)
+    assert index.step < len(arrays)  # Windows cross checkpoints
+    rng = np.random.default_rng(seed)
+    for lo, hi in [(0, len(arrays)), (0, 1), *np.sort(rng.integers(0, len(arrays), (30, 2)), axis=1)]:
+        expected = brute_force(arrays, lo, hi, index.base, index.n_bins)
+        assert np.allclose(index.window(lo, hi), expected, atol=1e-6)
+
+
+def test_profile_is_trimmed_and_built_off_the_event_loop(client, store, monkeypatch):
+    store.write("AAA", "15m", random_bars(600, seed=4))
+    calls = []
+    get_index = volume_profile_service.get_index
+    
+    def recording_get_index(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            calls.append(False)
+        except RuntimeError:
+            calls.append(True)
+        return get_index(*args, **kwargs)
+    
+    monkeypatch.setattr(volume_profile_service, "get_index", recording_get_index)
+    response = client.get("/api/v1/pairs/AAA/volume-profile", params={
+        "start_time": START + 100 * 900, "end_time": START + 299 * 900, "bin_size": BIN,
+    })
+    assert response.status_code == 200
+    assert calls == [True]
+    
+    body = response.json()
+    index = get_index("AAA", BIN)
+    arrays = index.arrays
+    expected = brute_force(arrays, 100, 300, index.base, index.n_bins)
+    first = int(np.floor(arrays.low[100:300].min() / BIN)) - index.base
+    volumes = [item["volume"] for item in body["bins"]]
+    assert np.allclose(volumes, expected[first:first + len(volumes)], atol=1e-6)
+    assert body["total_volume"] == pytest.approx(arrays.volume[100:300].sum())
+    assert body["poc_price"] == pytest.approx(body["bins"][int(np.argmax(volumes))]["price_low"] + BIN / 2)
@@ -0,0 +1,78 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+import pytest
+from app.core.config import settings
+from app.services.data_service import data_service
+from app.services.warmup_service import warmup_service
+from tests.test_data_service import bars
+
+
+def wait_until_ready(client, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            return response.json()
+        time.sleep(0.01)
+    raise AssertionError("warm-up did not finish")
+
+
+@pytest.fixture
+def targets(store, monkeypatch):
+    store.write("AAA", "15m", bars([1.0, 1.1, 1.2]))
+    store.write("BBB", "15m", bars([2.0, 2.1]))
+    monkeypatch.setattr(settings, "WARMUP_TIMEFRAMES", ["15m"])
+    return monkeypatch
+
+
+def test_ready_waits_for_the_warm_up(client, targets):
+    targets.setattr(settings, "WARMUP_SYMBOLS", ["aaa", "MISSING"])
+    release = threading.Event()
+    load = warmup_service._load
+
+    def blocked_load(symbol, timeframe):
+        release.wait(5)
+        load(symbol, timeframe)
+    targets.setattr(warmup_service, "_load", blocked_load)
+
+    with client:
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "warming_up" and response.json()["total"] == 2
+        assert client.get("/health").status_code == 200
+
+        release.set()
+        status = wait_until_ready(client)
+    assert status["status"] == "ready"
+    assert (status["total"], status["loaded"]) == (2, 1)
+    assert list(status["failed"]) == ["MISSING:15m"]
+
+
+def test_warm_up_builds_the_caches(client, targets):
+    targets.setattr(settings, "WARMUP_SYMBOLS", ["*"])
+    with client:
+        status = wait_until_ready(client)
+    assert status["loaded"] == len(data_service.list_symbols())
+    for symbol in ("AAA", "BBB"):
+        assert (symbol, "15m") in data_service._array_cache
+        assert (symbol, "15m") in data_service._range_index_cache
+
+
+def test_restart_reports_only_its_own_run(client, targets):
+    targets.setattr(settings, "WARMUP_SYMBOLS", ["AAA"])
+    for _ in range(2):
+        with client:
+            status = wait_until_ready(client)
+        assert (status["total"], status["loaded"]) == (1, 1)
+
+
+def test_app_import_does_not_load_pandas():
+    # Only the CSV fallback and the ingest CLI need pandas
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; sys.exit('pandas' in sys.modules)"],
+        cwd=Path(__file__).parent.parent,
+    )
+    assert result.returncode == 0